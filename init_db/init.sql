@@ -1,15 +1,4 @@
--- Create statusType enum if it doesn't exist
-DO $$ BEGIN
-    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'statustypes') THEN
-        CREATE TYPE statustypes AS ENUM ('PENDING', 'IN_PROGRESS', 'DONE');
-    END IF;
-END $$;
-
--- Create table if it doesn't exist
-CREATE TABLE IF NOT EXISTS "Tasks" (
-    id SERIAL PRIMARY KEY,
-    title VARCHAR NOT NULL,
-    description TEXT,
-    status statustypes NOT NULL DEFAULT 'PENDING',
-    due_date TIMESTAMPTZ NOT NULL
-);
\ No newline at end of file
+-- The schema is created and upgraded by the migrations in src/migrations, which the app's container
+-- runs with 'alembic upgrade head' before starting. This script only enables the extensions they use,
+-- as creating an extension may require superuser rights.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
@@ -0,0 +1,111 @@
+import math
+
+
+def percentile(SORTED_VALUES: list[float], PERCENT: float) -> float:
+    """
+    Retrieve a percentile of some values using the nearest-rank method.
+
+    Args:
+        SORTED_VALUES (list[float]): The values, sorted in ascending order.
+        PERCENT (float): The percentile to retrieve, between 0 and 100.
+
+    Returns:
+        float: The percentile, or 0.0 if there are no values.
+    """
+    if not SORTED_VALUES:
+        return 0.0
+    RANK = max(1, math.ceil(PERCENT / 100 * len(SORTED_VALUES)))
+    return SORTED_VALUES[RANK - 1]
+
+
+def summarise(LATENCIES: list[float], ERRORS: int, WALL_SECONDS: float) -> dict:
+    """
+    Summarise the latencies recorded for one scenario.
+
+    Args:
+        LATENCIES (list[float]): The latency of each request, in seconds.
+        ERRORS (int): The number of requests that failed or returned an unexpected status code.
+        WALL_SECONDS (float): The time taken to send every request.
+
+    Returns:
+        dict: The request and error counts, latency percentiles in milliseconds and throughput.
+    """
+    SORTED_LATENCIES = sorted(LATENCIES)
+    return {
+        "requests": len(LATENCIES),
+        "errors": ERRORS,
+        "mean_ms": sum(LATENCIES) / len(LATENCIES) * 1000 if LATENCIES else 0.0,
+        "p50_ms": percentile(SORTED_LATENCIES, 50) * 1000,
+        "p95_ms": percentile(SORTED_LATENCIES, 95) * 1000,
+        "p99_ms": percentile(SORTED_LATENCIES, 99) * 1000,
+        "max_ms": SORTED_LATENCIES[-1] * 1000 if SORTED_LATENCIES else 0.0,
+        "throughput_rps": len(LATENCIES) / WALL_SECONDS if WALL_SECONDS else 0.0
+    }
+
+
+def compare(BASELINE: dict, CURRENT: dict, THRESHOLD_PERCENT: float) -> list[dict]:
+    """
+    Compare a benchmark run against a saved baseline.
+
+    A scenario regresses when its p95 latency rises, or its throughput falls, by more than
+    'THRESHOLD_PERCENT' relative to the baseline. Scenarios missing from either run are skipped.
+
+    Args:
+        BASELINE (dict): The baseline report.
+        CURRENT (dict): The report to compare.
+        THRESHOLD_PERCENT (float): The change tolerated before a scenario is flagged.
+
+    Returns:
+        list[dict]: One entry per scenario present in both runs, with the relative changes and
+                    whether the scenario regressed.
+    """
+    COMPARISON = []
+    for TRANSPORT, SCENARIOS in CURRENT["results"].items():
+        for NAME, RESULT in SCENARIOS.items():
+            BEFORE = BASELINE.get("results", {}).get(TRANSPORT, {}).get(NAME)
+            if not BEFORE:
+                continue
+            P95_CHANGE = relative_change(BEFORE["p95_ms"], RESULT["p95_ms"])
+            THROUGHPUT_CHANGE = relative_change(BEFORE["throughput_rps"], RESULT["throughput_rps"])
+            COMPARISON.append({
+                "transport": TRANSPORT,
+                "scenario": NAME,
+                "p95_ms": [BEFORE["p95_ms"], RESULT["p95_ms"]],
+                "p95_change_percent": P95_CHANGE,
+                "throughput_rps": [BEFORE["throughput_rps"], RESULT["throughput_rps"]],
+                "throughput_change_percent": THROUGHPUT_CHANGE,
+                "regressed": P95_CHANGE > THRESHOLD_PERCENT or THROUGHPUT_CHANGE < -THRESHOLD_PERCENT
+            })
+    return COMPARISON
+
+
+def relative_change(BEFORE: float, AFTER: float) -> float:
+    """
+    Retrieve the change from 'BEFORE' to 'AFTER' as a percentage of 'BEFORE'.
+
+    Args:
+        BEFORE (float): The baseline value.
+        AFTER (float): The new value.
+
+    Returns:
+        float: The percentage change, or 0.0 if the baseline value is zero.
+    """
+    return (AFTER - BEFORE) / BEFORE * 100 if BEFORE else 0.0
+
+
+def format_table(REPORT: dict) -> str:
+    """
+    Format a benchmark report as a plain text table.
+
+    Args:
+        REPORT (dict): The report to format.
+
+    Returns:
+        str: One line per transport and scenario.
+    """
+    LINES = [f"{'transport':<10}{'scenario':<24}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"]
+    for TRANSPORT, SCENARIOS in REPORT["results"].items():
+        for NAME, RESULT in SCENARIOS.items():
+            LINES.append(f"{TRANSPORT:<10}{NAME:<24}{RESULT['requests']:>9}{RESULT['errors']:>8}"
+                         f"{RESULT['p50_ms']:>10.2f}{RESULT['p95_ms']:>10.2f}{RESULT['p99_ms']:>10.2f}{RESULT['throughput_rps']:>10.1f}")
+    return "\n".join(LINES)
@@ -0,0 +1,411 @@
+"""
+Load-test and micro-benchmark the task API.
+
+Seeds the database with a fixed number of tasks, then drives every endpoint through an in-process
+ASGITransport and/or a real uvicorn server at the requested concurrency. Latency percentiles,
+throughput and peak RSS are written as JSON, and can be compared against a saved baseline.
+
+Run from the src/ directory, for example:
+
+    python -m benchmarks.run_benchmarks --tasks 100000 --concurrency 20 --output baseline.json
+    python -m benchmarks.run_benchmarks --tasks 100000 --concurrency 20 --baseline baseline.json
+
+The comparison exits with status 1 if any scenario regressed by more than --threshold percent.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+import httpx
+from benchmarks.report import summarise, compare, format_table
+
+SRC_DIRECTORY = Path(__file__).resolve().parent.parent
+
+# The number of rows inserted by each statement while seeding
+SEED_BATCH_SIZE = 10000
+
+# The number of tasks sent or targeted by each bulk request
+BULK_SIZE = 100
+
+
+class BenchmarkContext:
+    """
+    State shared by the scenarios of one benchmark run.
+
+    Attributes:
+        MIN_ID (int): The lowest seeded task ID.
+        MAX_ID (int): The highest seeded task ID.
+        RANDOM (random.Random): Seeded random number generator, so runs send the same requests.
+        DISPOSABLE_IDS (list[int]): IDs of tasks created for the delete scenarios to consume.
+    """
+    def __init__(self, MIN_ID: int, MAX_ID: int):
+        self.MIN_ID = MIN_ID
+        self.MAX_ID = MAX_ID
+        self.RANDOM = random.Random(0)
+        self.DISPOSABLE_IDS = []
+
+    def random_id(self) -> int:
+        return self.RANDOM.randint(self.MIN_ID, self.MAX_ID)
+
+    def random_ids(self, COUNT: int) -> list[int]:
+        return [self.random_id() for _ in range(COUNT)]
+
+
+class Scenario:
+    """
+    A single benchmarked request type.
+
+    Attributes:
+        NAME (str): The name the scenario is reported under.
+        SEND (Callable): Coroutine sending one request with a client and context, returning the status code.
+        EXPECTED (tuple[int, ...]): Status codes that count as a success.
+        MAX_REQUESTS (int | None): Upper bound on the scenario's requests, for expensive requests.
+        SETUP (Callable | None): Coroutine run before the scenario (untimed) with the client, context and request count.
+        STREAMING (bool): Whether the response never completes, so the scenario only runs against uvicorn.
+    """
+    def __init__(self, NAME: str, SEND: Callable[[httpx.AsyncClient, BenchmarkContext], Awaitable[int]],
+                 EXPECTED: tuple[int, ...] = (200,), MAX_REQUESTS: int | None = None,
+                 SETUP: Callable[[httpx.AsyncClient, BenchmarkContext, int], Awaitable[None]] | None = None,
+                 STREAMING: bool = False):
+        self.NAME = NAME
+        self.SEND = SEND
+        self.EXPECTED = EXPECTED
+        self.MAX_REQUESTS = MAX_REQUESTS
+        self.SETUP = SETUP
+        self.STREAMING = STREAMING
+
+
+def new_task(CONTEXT: BenchmarkContext) -> dict:
+    return {
+        "title": f"Benchmark task {CONTEXT.RANDOM.random()}",
+        "description": "Created by the benchmark suite",
+        "status": "Pending",
+        "due_date": (datetime.now(timezone.utc) + timedelta(days=CONTEXT.RANDOM.randint(1, 365))).isoformat()
+    }
+
+
+def request(METHOD: str, PATH: Callable[[BenchmarkContext], str], JSON: Callable[[BenchmarkContext], object] | None = None):
+    """
+    Build a scenario's SEND coroutine for a plain request/response endpoint.
+
+    Args:
+        METHOD (str): The HTTP method.
+        PATH (Callable): Builds the request path from the context.
+        JSON (Callable | None): Builds the JSON body from the context.
+
+    Returns:
+        Callable: The SEND coroutine.
+    """
+    async def send(CLIENT: httpx.AsyncClient, CONTEXT: BenchmarkContext) -> int:
+        BODY = JSON(CONTEXT) if JSON else None
+        RESPONSE = await CLIENT.request(METHOD, PATH(CONTEXT), json=BODY)
+        return RESPONSE.status_code
+    return send
+
+
+async def open_event_stream(CLIENT: httpx.AsyncClient, CONTEXT: BenchmarkContext) -> int:
+    # Time to the first chunk of the stream (the reconnection delay), after which the stream is closed
+    async with CLIENT.stream("GET", "/tasks/events") as RESPONSE:
+        async for _ in RESPONSE.aiter_raw():
+            break
+        return RESPONSE.status_code
+
+
+async def create_disposable_tasks(CLIENT: httpx.AsyncClient, CONTEXT: BenchmarkContext, COUNT: int) -> None:
+    # Create the tasks the delete scenarios consume, so the seeded tasks are left untouched
+    for START in range(0, COUNT, 1000):
+        BATCH = [new_task(CONTEXT) for _ in range(min(1000, COUNT - START))]
+        RESPONSE = await CLIENT.post("/tasks/bulk", json=BATCH)
+        RESPONSE.raise_for_status()
+        CONTEXT.DISPOSABLE_IDS.extend(TASK["id"] for TASK in RESPONSE.json())
+
+
+def build_scenarios() -> list[Scenario]:
+    """
+    Build a scenario for every router endpoint.
+
+    Returns:
+        list[Scenario]: The scenarios, in the order they are run.
+    """
+    return [
+        Scenario("root", request("GET", lambda CONTEXT: "/")),
+        Scenario("get_task", request("GET", lambda CONTEXT: f"/tasks/{CONTEXT.random_id()}/")),
+        Scenario("list_tasks", request("GET", lambda CONTEXT: "/tasks/?limit=100")),
+        Scenario("list_tasks_by_status", request("GET", lambda CONTEXT: "/tasks/?limit=100&status=Pending")),
+        Scenario("list_tasks_due_before", request(
+            "GET", lambda CONTEXT: f"/tasks/?limit=100&due_before={datetime.now(timezone.utc).isoformat().replace('+', '%2B')}")),
+        Scenario("create_task", request("POST", lambda CONTEXT: "/tasks/", new_task)),
+        Scenario("create_tasks_bulk", request("POST", lambda CONTEXT: "/tasks/bulk",
+                                              lambda CONTEXT: [new_task(CONTEXT) for _ in range(BULK_SIZE)]), MAX_REQUESTS=100),
+        Scenario("update_task", request("PATCH", lambda CONTEXT: f"/tasks/{CONTEXT.random_id()}/",
+                                        lambda CONTEXT: {"status": CONTEXT.RANDOM.choice(["Pending", "In Progress", "Done"])})),
+        Scenario("update_tasks_bulk", request("PATCH", lambda CONTEXT: "/tasks/bulk",
+                                              lambda CONTEXT: {"ids": CONTEXT.random_ids(BULK_SIZE), "status": "In Progress"}),
+                 MAX_REQUESTS=100),
+        Scenario("delete_task", request("DELETE", lambda CONTEXT: f"/tasks/{CONTEXT.DISPOSABLE_IDS.pop()}/"),
+                 SETUP=create_disposable_tasks),
+        Scenario("delete_tasks_bulk", request("DELETE", lambda CONTEXT: "/tasks/bulk",
+                                              lambda CONTEXT: {"ids": [CONTEXT.DISPOSABLE_IDS.pop() for _ in range(BULK_SIZE)]}),
+                 MAX_REQUESTS=100, SETUP=lambda CLIENT, CONTEXT, COUNT: create_disposable_tasks(CLIENT, CONTEXT, COUNT * BULK_SIZE)),
+        Scenario("export_ndjson", request("GET", lambda CONTEXT: "/tasks/export?format=ndjson"), MAX_REQUESTS=5),
+        Scenario("export_csv", request("GET", lambda CONTEXT: "/tasks/export?format=csv"), MAX_REQUESTS=5),
+        Scenario("events_connect", open_event_stream, STREAMING=True),
+        Scenario("pool_metrics", request("GET", lambda CONTEXT: "/metrics/pool")),
+        Scenario("metrics", request("GET", lambda CONTEXT: "/metrics")),
+    ]
+
+
+async def seed_tasks(DATABASE_URL: str, COUNT: int, RESEED: bool) -> tuple[int, int]:
+    """
+    Ensure the database holds exactly 'COUNT' tasks, migrating its schema to the latest revision first.
+
+    An existing dataset of the right size is reused unless 'RESEED' is set, so large datasets
+    only need to be inserted once.
+
+    Args:
+        DATABASE_URL (str): The database to seed.
+        COUNT (int): The number of tasks to seed.
+        RESEED (bool): Whether to replace the tasks even if the right number already exist.
+
+    Returns:
+        tuple[int, int]: The lowest and highest task IDs.
+    """
+    from sqlalchemy import delete, func, insert, select
+    from alembic import command
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from db.schema_version import get_alembic_config
+    from db.tables.task import Task
+    from utils.global_constants import StatusTypes
+
+    # Migrations run their own event loop, so they are run from another thread
+    await asyncio.to_thread(command.upgrade, get_alembic_config(DATABASE_URL), "head")
+
+    ENGINE = create_async_engine(DATABASE_URL)
+    try:
+        async with ENGINE.begin() as CONNECTION:
+            EXISTING = (await CONNECTION.execute(select(func.count()).select_from(Task))).scalar_one()
+
+            if EXISTING != COUNT or RESEED:
+                await CONNECTION.execute(delete(Task))
+                NOW = datetime.now(timezone.utc)
+                STATUSES = list(StatusTypes)
+                for START in range(0, COUNT, SEED_BATCH_SIZE):
+                    await CONNECTION.execute(insert(Task), [{
+                        "title": f"Seeded task {INDEX}",
+                        "description": f"Seeded by the benchmark suite ({INDEX})",
+                        "status": STATUSES[INDEX % len(STATUSES)],
+                        "due_date": NOW + timedelta(minutes=INDEX % 525600 - 262800)
+                    } for INDEX in range(START, min(COUNT, START + SEED_BATCH_SIZE))])
+                    print(f"Seeded {min(COUNT, START + SEED_BATCH_SIZE)}/{COUNT} tasks", file=sys.stderr)
+
+            MIN_ID, MAX_ID = (await CONNECTION.execute(select(func.min(Task.id), func.max(Task.id)))).one()
+    finally:
+        await ENGINE.dispose()
+    return MIN_ID or 1, MAX_ID or 1
+
+
+async def run_scenario(CLIENT: httpx.AsyncClient, SCENARIO: Scenario, CONTEXT: BenchmarkContext,
+                       REQUESTS: int, CONCURRENCY: int) -> dict:
+    """
+    Send a scenario's requests from 'CONCURRENCY' concurrent workers and summarise their latencies.
+
+    Args:
+        CLIENT (httpx.AsyncClient): The client to send the requests with.
+        SCENARIO (Scenario): The scenario to run.
+        CONTEXT (BenchmarkContext): State shared by the scenarios.
+        REQUESTS (int): The number of requests to send.
+        CONCURRENCY (int): The number of requests in flight at once.
+
+    Returns:
+        dict: The scenario's summary (see benchmarks.report.summarise).
+    """
+    if SCENARIO.SETUP:
+        await SCENARIO.SETUP(CLIENT, CONTEXT, REQUESTS)
+
+    LATENCIES = []
+    ERRORS = 0
+    REMAINING = iter(range(REQUESTS))
+
+    async def worker() -> None:
+        nonlocal ERRORS
+        # Every worker draws from the same iterator, so exactly 'REQUESTS' requests are sent
+        for _ in REMAINING:
+            START = time.perf_counter()
+            try:
+                SUCCEEDED = await SCENARIO.SEND(CLIENT, CONTEXT) in SCENARIO.EXPECTED
+            except httpx.HTTPError:
+                SUCCEEDED = False
+            LATENCIES.append(time.perf_counter() - START)
+            ERRORS += not SUCCEEDED
+
+    START = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return summarise(LATENCIES, ERRORS, time.perf_counter() - START)
+
+
+async def run_scenarios(CLIENT: httpx.AsyncClient, SCENARIOS: list[Scenario], CONTEXT: BenchmarkContext,
+                        ARGS: argparse.Namespace) -> dict:
+    RESULTS = {}
+    for SCENARIO in SCENARIOS:
+        REQUESTS = min(ARGS.requests, SCENARIO.MAX_REQUESTS or ARGS.requests)
+        RESULTS[SCENARIO.NAME] = await run_scenario(CLIENT, SCENARIO, CONTEXT, REQUESTS, ARGS.concurrency)
+        print(f"{SCENARIO.NAME}: p95 {RESULTS[SCENARIO.NAME]['p95_ms']:.2f} ms", file=sys.stderr)
+    return RESULTS
+
+
+def peak_rss_mb(WHO: int) -> float:
+    """
+    Retrieve the peak resident set size of this process or its reaped children.
+
+    Args:
+        WHO (int): resource.RUSAGE_SELF or resource.RUSAGE_CHILDREN.
+
+    Returns:
+        float: The peak RSS in megabytes.
+    """
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    MAX_RSS = resource.getrusage(WHO).ru_maxrss
+    return MAX_RSS / (1024 * 1024) if platform.system() == "Darwin" else MAX_RSS / 1024
+
+
+async def benchmark_asgi(SCENARIOS: list[Scenario], CONTEXT: BenchmarkContext, ARGS: argparse.Namespace) -> dict:
+    """
+    Benchmark the app in this process through httpx's ASGITransport, with no network or server overhead.
+
+    Streaming scenarios are skipped, as ASGITransport waits for the whole response body.
+    """
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as CLIENT:
+            return await run_scenarios(CLIENT, [SCENARIO for SCENARIO in SCENARIOS if not SCENARIO.STREAMING], CONTEXT, ARGS)
+
+
+async def wait_until_ready(CLIENT: httpx.AsyncClient, PROCESS: subprocess.Popen, TIMEOUT_SECONDS: float = 30.0) -> None:
+    DEADLINE = time.monotonic() + TIMEOUT_SECONDS
+    while time.monotonic() < DEADLINE:
+        if PROCESS.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {PROCESS.returncode} before it was ready.")
+        try:
+            if (await CLIENT.get("/metrics/pool")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready in time.")
+
+
+async def benchmark_uvicorn(SCENARIOS: list[Scenario], CONTEXT: BenchmarkContext, ARGS: argparse.Namespace) -> dict:
+    """
+    Benchmark the app served by a uvicorn subprocess over real TCP connections.
+    """
+    PROCESS = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(ARGS.port),
+         "--workers", str(ARGS.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=SRC_DIRECTORY, env={**os.environ, "DATABASE_URL": ARGS.database_url}
+    )
+    try:
+        LIMITS = httpx.Limits(max_connections=ARGS.concurrency, max_keepalive_connections=ARGS.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{ARGS.port}", limits=LIMITS, timeout=60.0) as CLIENT:
+            await wait_until_ready(CLIENT, PROCESS)
+            return await run_scenarios(CLIENT, SCENARIOS, CONTEXT, ARGS)
+    finally:
+        PROCESS.terminate()
+        PROCESS.wait(timeout=30)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIRECTORY, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(ARGS: argparse.Namespace) -> dict:
+    MIN_ID, MAX_ID = await seed_tasks(ARGS.database_url, ARGS.tasks, ARGS.reseed)
+    SCENARIOS = [SCENARIO for SCENARIO in build_scenarios() if not ARGS.scenario or SCENARIO.NAME in ARGS.scenario]
+
+    REPORT = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": ARGS.database_url.split("://", 1)[0],
+            "tasks": ARGS.tasks,
+            "requests": ARGS.requests,
+            "concurrency": ARGS.concurrency,
+            "workers": ARGS.workers
+        },
+        "results": {},
+        "peak_rss_mb": {}
+    }
+
+    if ARGS.transport in ("asgi", "both"):
+        REPORT["results"]["asgi"] = await benchmark_asgi(SCENARIOS, BenchmarkContext(MIN_ID, MAX_ID), ARGS)
+        # Includes the benchmark client, which runs in the same process
+        REPORT["peak_rss_mb"]["asgi"] = peak_rss_mb(resource.RUSAGE_SELF)
+    if ARGS.transport in ("uvicorn", "both"):
+        REPORT["results"]["uvicorn"] = await benchmark_uvicorn(SCENARIOS, BenchmarkContext(MIN_ID, MAX_ID), ARGS)
+        REPORT["peak_rss_mb"]["uvicorn"] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return REPORT
+
+
+def parse_args(ARGV: list[str] | None = None) -> argparse.Namespace:
+    PARSER = argparse.ArgumentParser(description="Benchmark the HMCTS Task Manager API.")
+    PARSER.add_argument("--database-url", default="sqlite+aiosqlite:///benchmark.db",
+                        help="Database to seed and benchmark against (default: a SQLite file in src/).")
+    PARSER.add_argument("--tasks", type=int, default=10000, help="Number of tasks to seed, e.g. 10000, 100000 or 1000000.")
+    PARSER.add_argument("--reseed", action="store_true", help="Replace the seeded tasks even if the right number already exist.")
+    PARSER.add_argument("--requests", type=int, default=1000, help="Requests sent per scenario.")
+    PARSER.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once.")
+    PARSER.add_argument("--transport", choices=("asgi", "uvicorn", "both"), default="both")
+    PARSER.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    PARSER.add_argument("--port", type=int, default=8765, help="Port the uvicorn server listens on.")
+    PARSER.add_argument("--scenario", action="append", help="Only run the named scenario. May be repeated.")
+    PARSER.add_argument("--output", type=Path, help="Write the JSON report here instead of standard output.")
+    PARSER.add_argument("--baseline", type=Path, help="Compare against a saved JSON report.")
+    PARSER.add_argument("--threshold", type=float, default=10.0,
+                        help="Percentage p95 or throughput change flagged as a regression (default: 10).")
+    return PARSER.parse_args(ARGV)
+
+
+def main(ARGV: list[str] | None = None) -> int:
+    ARGS = parse_args(ARGV)
+
+    # The app reads its settings and static files relative to src/ when it is first imported
+    os.chdir(SRC_DIRECTORY)
+    os.environ["DATABASE_URL"] = ARGS.database_url
+
+    REPORT = asyncio.run(run(ARGS))
+    print(format_table(REPORT), file=sys.stderr)
+
+    EXIT_CODE = 0
+    if ARGS.baseline:
+        REPORT["comparison"] = compare(json.loads(ARGS.baseline.read_text()), REPORT, ARGS.threshold)
+        for ENTRY in REPORT["comparison"]:
+            if ENTRY["regressed"]:
+                EXIT_CODE = 1
+                print(f"REGRESSION {ENTRY['transport']}/{ENTRY['scenario']}: p95 {ENTRY['p95_change_percent']:+.1f}%, "
+                      f"throughput {ENTRY['throughput_change_percent']:+.1f}%", file=sys.stderr)
+
+    OUTPUT = json.dumps(REPORT, indent=2)
+    if ARGS.output:
+        ARGS.output.write_text(OUTPUT)
+    else:
+        print(OUTPUT)
+    return EXIT_CODE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
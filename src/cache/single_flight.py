@@ -0,0 +1,131 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+from settings import SETTINGS
+
+
+class AbandonedFlightError(Exception):
+    """
+    Raised to the callers sharing a read when the caller running it is cancelled, so they run it themselves.
+    """
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads within a worker process.
+
+    The first caller for a key runs the read. Callers arriving while it is in flight, or within
+    'TTL_SECONDS' of it completing, share its result instead of issuing their own query, so a burst
+    of identical requests (e.g. every client reloading after a deploy or a cache flush) costs one
+    query rather than one per request.
+
+    The read runs in the first caller's own coroutine, on its session. If that caller is cancelled
+    (e.g. its client disconnects), the callers waiting on it run the read again rather than failing.
+    Failed reads are shared with the callers already waiting, but are never kept.
+
+    Attributes:
+        TTL_SECONDS (float): How long a completed read is shared with later callers. 0 only coalesces
+                             reads that overlap.
+        FLIGHTS (dict[Hashable, asyncio.Future]): The in-flight and recently completed reads, keyed by the read's key.
+        LED (int): The number of reads run.
+        SHARED (int): The number of reads served from another caller's read.
+
+    Methods:
+        do(KEY, READ): Run a read, or share the result of an identical one.
+        forget(KEY): Stop sharing a read with later callers.
+        forget_all(): Stop sharing every read with later callers.
+        stats(): Retrieve the run/shared counters.
+    """
+    def __init__(self, TTL_SECONDS: float = SETTINGS.SINGLE_FLIGHT_TTL_SECONDS):
+        """
+        Args:
+            TTL_SECONDS (float): How long a completed read is shared with later callers.
+        """
+        self.TTL_SECONDS = TTL_SECONDS
+        self.FLIGHTS: dict[Hashable, asyncio.Future] = {}
+        self.LED = 0
+        self.SHARED = 0
+
+    def __len__(self) -> int:
+        return len(self.FLIGHTS)
+
+    async def do(self, KEY: Hashable, READ: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a read, or share the result of an identical read that is in flight or has just completed.
+
+        Args:
+            KEY (Hashable): Identifies the read. Reads with equal keys must return the same result.
+            READ (Callable[[], Awaitable[Any]]): Runs the read.
+
+        Returns:
+            Any: The read's result. It is shared between callers, so it must not be modified.
+        """
+        while (FLIGHT := self.FLIGHTS.get(KEY)) is not None:
+            self.SHARED += 1
+            try:
+                # Shielded, so a cancelled caller does not cancel the read for everyone else
+                return await asyncio.shield(FLIGHT)
+            except AbandonedFlightError:
+                self.SHARED -= 1
+
+        FLIGHT = asyncio.get_running_loop().create_future()
+        self.FLIGHTS[KEY] = FLIGHT
+        self.LED += 1
+        try:
+            RESULT = await READ()
+        except BaseException as EXCEPTION:
+            self.discard(KEY, FLIGHT)
+            FLIGHT.set_exception(AbandonedFlightError() if isinstance(EXCEPTION, asyncio.CancelledError) else EXCEPTION)
+            # Mark the exception as retrieved, as there may be nobody waiting for it
+            FLIGHT.exception()
+            raise
+
+        FLIGHT.set_result(RESULT)
+        if self.TTL_SECONDS > 0 and self.FLIGHTS.get(KEY) is FLIGHT:
+            asyncio.get_running_loop().call_later(self.TTL_SECONDS, self.discard, KEY, FLIGHT)
+        else:
+            self.discard(KEY, FLIGHT)
+        return RESULT
+
+    def discard(self, KEY: Hashable, FLIGHT: asyncio.Future) -> None:
+        """
+        Stop sharing a read, unless it has already been replaced by a newer one.
+
+        Args:
+            KEY (Hashable): The read's key.
+            FLIGHT (asyncio.Future): The read's future.
+        """
+        if self.FLIGHTS.get(KEY) is FLIGHT:
+            del self.FLIGHTS[KEY]
+
+    def forget(self, KEY: Hashable) -> None:
+        """
+        Stop sharing a read with later callers, e.g. because a write has changed its result.
+
+        Callers already waiting on the read still receive its result, as their reads began before the write.
+
+        Args:
+            KEY (Hashable): The read's key.
+        """
+        self.FLIGHTS.pop(KEY, None)
+
+    def forget_all(self) -> None:
+        """
+        Stop sharing every read with later callers.
+        """
+        self.FLIGHTS.clear()
+
+    def stats(self) -> dict:
+        """
+        Retrieve the run/shared counters.
+
+        Returns:
+            dict: The number of reads run and shared.
+        """
+        return {"led": self.LED, "shared": self.SHARED}
+
+
+# Coalesces reads of single tasks, keyed by task ID and whether the read went to the replica
+TASK_READS = SingleFlight()
+
+# Coalesces reads of pages of tasks, keyed by the page's parameters and whether the read went to the replica
+PAGE_READS = SingleFlight()
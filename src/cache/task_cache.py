@@ -0,0 +1,343 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Iterable
+from logger import LOGGER
+from models.tasks import TaskResponseModel
+from settings import SETTINGS
+
+
+class TaskCache(ABC):
+    """
+    Base class for read-through caches of individual tasks, keyed by task ID.
+
+    Attributes:
+        HITS (int): The number of lookups served from the cache.
+        MISSES (int): The number of lookups that had to fall through to the database.
+
+    Methods:
+        get(ID): Retrieve a cached task.
+        set(TASK): Cache a task written to the database.
+        read_started(): Mark the start of a database read whose result may be cached.
+        fill(TASK, SINCE): Cache a task read from the database, unless it has changed since the read began.
+        invalidate(ID): Remove a task from the cache.
+        invalidate_many(IDS): Remove many tasks from the cache.
+        stats(): Retrieve the cache's hit/miss counters.
+        close(): Release any resources held by the cache.
+    """
+    def __init__(self):
+        self.HITS = 0
+        self.MISSES = 0
+
+    async def get(self, ID: int) -> TaskResponseModel | None:
+        """
+        Retrieve a cached task, recording a hit or a miss.
+
+        Args:
+            ID (int): The ID of the task to retrieve.
+
+        Returns:
+            TaskResponseModel | None: The cached task, or None if it is not cached or has expired.
+        """
+        TASK = await self.lookup(ID)
+        if TASK is None:
+            self.MISSES += 1
+        else:
+            self.HITS += 1
+        return TASK
+
+    def stats(self) -> dict:
+        """
+        Retrieve the cache's hit/miss counters.
+
+        Returns:
+            dict: The number of hits and misses, and the hit ratio.
+        """
+        LOOKUPS = self.HITS + self.MISSES
+        return {"hits": self.HITS, "misses": self.MISSES, "hit_ratio": self.HITS / LOOKUPS if LOOKUPS else 0.0}
+
+    async def close(self) -> None:
+        """
+        Release any resources held by the cache.
+        """
+
+    @abstractmethod
+    async def lookup(self, ID: int) -> TaskResponseModel | None:
+        """
+        Backend specific lookup of a cached task, without recording a hit or miss.
+
+        Args:
+            ID (int): The ID of the task to retrieve.
+
+        Returns:
+            TaskResponseModel | None: The cached task, or None if it is not cached or has expired.
+        """
+
+    @abstractmethod
+    async def set(self, TASK: TaskResponseModel) -> None:
+        """
+        Cache a task written to the database.
+
+        Args:
+            TASK (TaskResponseModel): The task to cache.
+        """
+
+    def read_started(self) -> int:
+        """
+        Mark the start of a database read whose result may be cached with `fill`.
+
+        Returns:
+            int: Token identifying when the read began.
+        """
+        return 0
+
+    @abstractmethod
+    async def fill(self, TASK: TaskResponseModel, SINCE: int) -> None:
+        """
+        Cache a task read from the database, unless a write has changed it since the read began.
+
+        A read can finish after a write that started later, so caching its row unconditionally could
+        replace the written task with the stale one.
+
+        Args:
+            TASK (TaskResponseModel): The task that was read.
+            SINCE (int): The token returned by `read_started` before the read.
+        """
+
+    @abstractmethod
+    async def invalidate(self, ID: int) -> None:
+        """
+        Remove a task from the cache.
+
+        Args:
+            ID (int): The ID of the task to remove.
+        """
+
+    async def invalidate_many(self, IDS: Iterable[int]) -> None:
+        """
+        Remove many tasks from the cache.
+
+        Args:
+            IDS (Iterable[int]): The IDs of the tasks to remove.
+        """
+        for ID in IDS:
+            await self.invalidate(ID)
+
+
+class LRUTaskCache(TaskCache):
+    """
+    In-process task cache bounded by both size and age.
+
+    Entries are evicted least recently used first once 'MAX_SIZE' is reached, and are treated as
+    missing once they are older than 'TTL_SECONDS'. As each worker process holds its own copy, the
+    TTL also bounds how long another worker may serve a task after it has been changed.
+
+    Every write (set or invalidation) is numbered once committed, and the number of the latest write
+    to each of the last 'MAX_SIZE' tasks written is kept, so a read is only cached if no write to its
+    task was recorded after the read began. A task is never replaced by an older version of itself.
+    """
+    def __init__(self, MAX_SIZE: int = SETTINGS.TASK_CACHE_MAX_SIZE, TTL_SECONDS: float = SETTINGS.TASK_CACHE_TTL_SECONDS,
+                 CLOCK: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            MAX_SIZE (int): The maximum number of tasks to hold.
+            TTL_SECONDS (float): How long a task may be served from the cache.
+            CLOCK (Callable[[], float]): Monotonic clock used to expire entries.
+        """
+        super().__init__()
+        self.MAX_SIZE = MAX_SIZE
+        self.TTL_SECONDS = TTL_SECONDS
+        self.CLOCK = CLOCK
+        self.ENTRIES: OrderedDict[int, tuple[float, TaskResponseModel]] = OrderedDict()
+        # The number of the latest write, the latest write to each recently written task, and the
+        # latest write whose record has been dropped
+        self.WRITES = 0
+        self.WRITTEN: OrderedDict[int, int] = OrderedDict()
+        self.FORGOTTEN = 0
+
+    def __len__(self) -> int:
+        return len(self.ENTRIES)
+
+    async def lookup(self, ID: int) -> TaskResponseModel | None:
+        ENTRY = self.ENTRIES.get(ID)
+        if ENTRY is None:
+            return None
+
+        EXPIRES_AT, TASK = ENTRY
+        if EXPIRES_AT <= self.CLOCK():
+            del self.ENTRIES[ID]
+            return None
+
+        self.ENTRIES.move_to_end(ID)
+        return TASK
+
+    def written(self, ID: int) -> None:
+        """
+        Record a write to a task, so reads that began before it are not cached.
+
+        Args:
+            ID (int): The ID of the task written.
+        """
+        self.WRITES += 1
+        self.WRITTEN[ID] = self.WRITES
+        self.WRITTEN.move_to_end(ID)
+        while len(self.WRITTEN) > self.MAX_SIZE:
+            _, self.FORGOTTEN = self.WRITTEN.popitem(last=False)
+
+    def store(self, TASK: TaskResponseModel) -> None:
+        """
+        Cache a task, unless a newer version of it is already cached.
+
+        Args:
+            TASK (TaskResponseModel): The task to cache.
+        """
+        ENTRY = self.ENTRIES.get(TASK.id)
+        if ENTRY is not None and ENTRY[1].version > TASK.version:
+            return
+        self.ENTRIES[TASK.id] = (self.CLOCK() + self.TTL_SECONDS, TASK)
+        self.ENTRIES.move_to_end(TASK.id)
+        while len(self.ENTRIES) > self.MAX_SIZE:
+            self.ENTRIES.popitem(last=False)
+
+    async def set(self, TASK: TaskResponseModel) -> None:
+        self.written(TASK.id)
+        self.store(TASK)
+
+    def read_started(self) -> int:
+        return self.WRITES
+
+    async def fill(self, TASK: TaskResponseModel, SINCE: int) -> None:
+        # A write may have begun after the read if its record has been dropped, so the read is not cached
+        if SINCE < self.FORGOTTEN or self.WRITTEN.get(TASK.id, 0) > SINCE:
+            return
+        self.store(TASK)
+
+    async def invalidate(self, ID: int) -> None:
+        self.written(ID)
+        self.ENTRIES.pop(ID, None)
+
+
+class RedisTaskCache(TaskCache):
+    """
+    Task cache shared between workers through a Redis-compatible store.
+
+    The client only needs the async `get`, `set` (with `ex` and `nx`) and `delete` commands, so a
+    `redis.asyncio.Redis` instance or any local stand-in exposing them can be used. Errors talking
+    to the store are logged and treated as misses, so an unavailable cache degrades to database reads.
+
+    Tasks read from the database are only cached if the key is still empty (SET NX). A read is only
+    made on a miss, so a value cached since then was written by a write that committed after the
+    read began (or by a concurrent read of the same row) and is kept. A read overlapping an
+    invalidation can still cache its row, until the TTL expires it.
+    """
+    def __init__(self, CLIENT, TTL_SECONDS: float = SETTINGS.TASK_CACHE_TTL_SECONDS, KEY_PREFIX: str = SETTINGS.TASK_CACHE_KEY_PREFIX):
+        """
+        Args:
+            CLIENT: The async Redis-compatible client.
+            TTL_SECONDS (float): How long a task may be served from the cache.
+            KEY_PREFIX (str): Prefix applied to every key written by this cache.
+        """
+        super().__init__()
+        self.CLIENT = CLIENT
+        self.TTL_SECONDS = TTL_SECONDS
+        self.KEY_PREFIX = KEY_PREFIX
+
+    def key(self, ID: int) -> str:
+        """
+        Build the store key for a task.
+
+        Args:
+            ID (int): The task ID.
+
+        Returns:
+            str: The prefixed key.
+        """
+        return f"{self.KEY_PREFIX}{ID}"
+
+    async def lookup(self, ID: int) -> TaskResponseModel | None:
+        try:
+            VALUE = await self.CLIENT.get(self.key(ID))
+        except Exception as EXCEPTION:
+            LOGGER.warning(f"Task cache lookup failed: {EXCEPTION}")
+            return None
+        return None if VALUE is None else TaskResponseModel.model_validate_json(VALUE)
+
+    async def set(self, TASK: TaskResponseModel) -> None:
+        try:
+            await self.CLIENT.set(self.key(TASK.id), TASK.model_dump_json(), ex=max(1, round(self.TTL_SECONDS)))
+        except Exception as EXCEPTION:
+            LOGGER.warning(f"Task cache write failed: {EXCEPTION}")
+
+    async def fill(self, TASK: TaskResponseModel, SINCE: int) -> None:
+        try:
+            await self.CLIENT.set(self.key(TASK.id), TASK.model_dump_json(), ex=max(1, round(self.TTL_SECONDS)), nx=True)
+        except Exception as EXCEPTION:
+            LOGGER.warning(f"Task cache write failed: {EXCEPTION}")
+
+    async def invalidate(self, ID: int) -> None:
+        await self.invalidate_many([ID])
+
+    async def invalidate_many(self, IDS: Iterable[int]) -> None:
+        KEYS = [self.key(ID) for ID in IDS]
+        if not KEYS:
+            return
+        try:
+            await self.CLIENT.delete(*KEYS)
+        except Exception as EXCEPTION:
+            LOGGER.warning(f"Task cache invalidation failed: {EXCEPTION}")
+
+    async def close(self) -> None:
+        await self.CLIENT.aclose()
+
+
+# The cache used by the CRUD layer. Replaced at startup by `configure_task_cache`.
+TASK_CACHE: TaskCache = LRUTaskCache()
+
+
+def configure_task_cache(CACHE: TaskCache) -> None:
+    """
+    Replace the cache used by the CRUD layer.
+
+    Args:
+        CACHE (TaskCache): The cache to use.
+    """
+    global TASK_CACHE
+    TASK_CACHE = CACHE
+
+
+def get_task_cache() -> TaskCache:
+    """
+    Retrieve the cache used by the CRUD layer.
+
+    Returns:
+        TaskCache: The configured cache.
+    """
+    return TASK_CACHE
+
+
+def create_task_cache(BACKEND: str, REDIS_URL: str | None = None) -> TaskCache:
+    """
+    Create a task cache for the named backend.
+
+    Args:
+        BACKEND (str): Either 'memory' or 'redis'.
+        REDIS_URL (str | None): The Redis connection URL, required for the 'redis' backend.
+
+    Returns:
+        TaskCache: The new cache.
+
+    Raises:
+        ValueError: If the backend is unknown or the Redis URL is missing.
+        RuntimeError: If the 'redis' backend is requested but the redis package is not installed.
+    """
+    if BACKEND == "memory":
+        return LRUTaskCache()
+    if BACKEND == "redis":
+        if not REDIS_URL:
+            raise ValueError("REDIS_URL must be set to use the 'redis' task cache backend.")
+        try:
+            import redis.asyncio as redis
+        except ImportError as EXCEPTION:
+            raise RuntimeError("The 'redis' package is required to use the 'redis' task cache backend.") from EXCEPTION
+        return RedisTaskCache(redis.from_url(REDIS_URL))
+    raise ValueError(f"Unknown task cache backend '{BACKEND}'.")
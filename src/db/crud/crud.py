@@ -1,11 +1,25 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update as sqlalchemy_update, delete as sqlalchemy_delete
+from sqlalchemy import (insert as sqlalchemy_insert, update as sqlalchemy_update, delete as sqlalchemy_delete, tuple_, any_,
+                        bindparam, Integer, func, case, column, literal, values)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import NoResultFound
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Collection, Iterable, Sequence
+from sqlalchemy import RowMapping
 from db.tables.task import Task
-from models.tasks import TaskCreationModel, TaskUpdateModel, TaskResponseModel
+from cache.task_cache import get_task_cache
+from cache.single_flight import TASK_READS, PAGE_READS
+from events.task_events import publish_task_events
+from metrics.prometheus import timed_crud
+from models.tasks import TaskCreationModel, TaskUpdateModel, TaskResponseModel, TaskBulkResultModel, TaskStatsModel
+from utils.cursor import encode_cursor, decode_cursor
+from utils.datetime_utils import ensure_utc
+from settings import SETTINGS
+from utils.global_constants import StatusTypes
 
 
+@timed_crud
 async def create_task(TASK: TaskCreationModel, SESSION: AsyncSession) -> TaskResponseModel:
     """
     Create a new task record in the database.
@@ -19,28 +33,225 @@ async def create_task(TASK: TaskCreationModel, SESSION: AsyncSession) -> TaskRes
     """
     NEW_TASK = Task(**TASK.model_dump())
     SESSION.add(NEW_TASK)
-    await SESSION.commit()
+    await SESSION.flush()
     await SESSION.refresh(NEW_TASK)
-    return TaskResponseModel.model_validate(NEW_TASK.to_dict())
+    CREATED_TASK = TaskResponseModel.model_validate(NEW_TASK.to_dict())
+    await publish_task_events("created", [CREATED_TASK], SESSION=SESSION)
+    await SESSION.commit()
+    await task_created(CREATED_TASK)
+    return CREATED_TASK
+
+async def task_created(CREATED_TASK: TaskResponseModel) -> None:
+    """
+    Share a newly created task with readers, once its creation has been committed.
+
+    Args:
+        CREATED_TASK (TaskResponseModel): The newly created task.
+    """
+    forget_reads([CREATED_TASK.id])
+    await get_task_cache().set(CREATED_TASK)
+
+def batched(ITEMS: Sequence, BATCH_SIZE: int) -> list[Sequence]:
+    """
+    Split a sequence into consecutive batches.
+
+    Args:
+        ITEMS (Sequence): The items to split.
+        BATCH_SIZE (int): The maximum number of items per batch.
+
+    Returns:
+        list[Sequence]: The batches, in order.
+    """
+    return [ITEMS[i:i + BATCH_SIZE] for i in range(0, len(ITEMS), BATCH_SIZE)]
+
+def match_ids(IDS: Sequence[int], SESSION: AsyncSession):
+    """
+    Build a WHERE clause matching tasks whose ID is in 'IDS'.
+
+    On PostgreSQL the IDs are bound as a single array parameter (`id = ANY(:ids)`), so every batch
+    shares one prepared statement. Other dialects fall back to an expanded `IN (...)` clause.
+
+    Args:
+        IDS (Sequence[int]): The IDs to match.
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+
+    Returns:
+        ColumnElement[bool]: The WHERE clause.
+    """
+    if SESSION.get_bind().dialect.name == "postgresql":
+        return Task.id == any_(bindparam("ids", list(IDS), type_=ARRAY(Integer)))
+    return Task.id.in_(IDS)
+
+def forget_reads(IDS: Iterable[int]) -> None:
+    """
+    Stop sharing reads made before a write with the reads that follow it.
+
+    Called once the write has been committed. Every page is forgotten, as a write can move a task
+    onto or off any page.
+
+    Args:
+        IDS (Iterable[int]): The IDs of the written tasks.
+    """
+    for ID in IDS:
+        TASK_READS.forget((ID, False))
+        TASK_READS.forget((ID, True))
+    PAGE_READS.forget_all()
+
+@timed_crud
+async def create_tasks(TASKS: list[TaskCreationModel], SESSION: AsyncSession,
+                       BATCH_SIZE: int = SETTINGS.BULK_BATCH_SIZE) -> list[TaskResponseModel]:
+    """
+    Create many task records in a single transaction.
+
+    Each batch is written with one multi-row `INSERT ... RETURNING` statement.
+
+    Args:
+        TASKS (list[TaskCreationModel]): The task data to be inserted.
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        BATCH_SIZE (int): The maximum number of rows inserted per statement.
+
+    Returns:
+        list[TaskResponseModel]: The newly created tasks, in the same order as 'TASKS'.
+    """
+    STATEMENT = sqlalchemy_insert(Task).returning(*Task.__table__.columns, sort_by_parameter_order=True)
+    CREATED_TASKS = []
+
+    for BATCH in batched(TASKS, BATCH_SIZE):
+        RESULT = await SESSION.execute(STATEMENT, [TASK.model_dump() for TASK in BATCH])
+        CREATED_TASKS.extend(TaskResponseModel.model_validate(dict(ROW)) for ROW in RESULT.mappings())
+
+    await publish_task_events("created", CREATED_TASKS, SESSION=SESSION)
+    await SESSION.commit()
+    forget_reads(TASK.id for TASK in CREATED_TASKS)
+    return CREATED_TASKS
+
+@timed_crud
+async def read_all_tasks(SESSION: AsyncSession, LIMIT: int, CURSOR: str | None = None, STATUS: StatusTypes | None = None,
+                         DUE_BEFORE: datetime | None = None, DUE_AFTER: datetime | None = None) -> dict:
+    """
+    Retrieve a page of tasks from the database, ordered by due date then ID.
+
+    Pagination is keyset based: the cursor encodes the (due_date, id) of the last task on the previous
+    page, so every page is a bounded index range scan regardless of how deep into the listing it is.
+
+    Only the task columns are selected and the rows are returned as plain dicts, with no ORM entities
+    or Pydantic models built, so the page can be serialised straight to JSON.
+
+    Concurrent requests for the same page share a single query (see `PAGE_READS`).
+
+    Args:
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        LIMIT (int): The maximum number of tasks to return.
+        CURSOR (str | None): Cursor returned with the previous page, or None for the first page.
+        STATUS (StatusTypes | None): Only return tasks with this status.
+        DUE_BEFORE (datetime | None): Only return tasks due strictly before this time.
+        DUE_AFTER (datetime | None): Only return tasks due strictly after this time.
+
+    Returns:
+        dict: The tasks on the requested page and the cursor for the next page, shaped like TaskPageModel.
+              It may be shared with other callers, so it must not be modified.
+
+    Raises:
+        ValueError: If 'CURSOR' is malformed.
+    """
+    KEY = (LIMIT, CURSOR, STATUS, DUE_BEFORE, DUE_AFTER, bool(SESSION.info.get("replica")))
+    return await PAGE_READS.do(KEY, lambda: query_task_page(SESSION, LIMIT, CURSOR, STATUS, DUE_BEFORE, DUE_AFTER))
+
+async def query_task_page(SESSION: AsyncSession, LIMIT: int, CURSOR: str | None, STATUS: StatusTypes | None,
+                          DUE_BEFORE: datetime | None, DUE_AFTER: datetime | None) -> dict:
+    """
+    Query a page of tasks. See `read_all_tasks`.
+    """
+    STATEMENT = select(*Task.__table__.columns)
+
+    if STATUS is not None:
+        STATEMENT = STATEMENT.where(Task.status == STATUS)
+    if DUE_BEFORE is not None:
+        STATEMENT = STATEMENT.where(Task.due_date < ensure_utc(DUE_BEFORE))
+    if DUE_AFTER is not None:
+        STATEMENT = STATEMENT.where(Task.due_date > ensure_utc(DUE_AFTER))
+    if CURSOR is not None:
+        STATEMENT = STATEMENT.where(tuple_(Task.due_date, Task.id) > tuple_(*decode_cursor(CURSOR)))
+
+    # Fetch one extra row to find out whether another page follows this one
+    STATEMENT = STATEMENT.order_by(Task.due_date, Task.id).limit(LIMIT + 1)
+    RESULT = await SESSION.execute(STATEMENT)
+    KEYS = tuple(RESULT.keys())
+    TASKS = [dict(zip(KEYS, ROW)) for ROW in RESULT.tuples()]
+
+    NEXT_CURSOR = None
+    if len(TASKS) > LIMIT:
+        TASKS = TASKS[:LIMIT]
+        NEXT_CURSOR = encode_cursor(TASKS[-1]["due_date"], TASKS[-1]["id"])
+
+    return {"items": TASKS, "next_cursor": NEXT_CURSOR}
+
+@timed_crud
+async def stream_tasks(SESSION: AsyncSession, BATCH_SIZE: int) -> AsyncIterator[Sequence[RowMapping]]:
+    """
+    Stream every task in the database in batches using a server-side cursor.
+
+    Only the task columns are selected (no ORM entities are built) and at most 'BATCH_SIZE' rows are
+    held in memory at once, so memory use stays flat regardless of the size of the table.
+
+    Args:
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        BATCH_SIZE (int): The number of rows fetched from the cursor per batch.
+
+    Yields:
+        Sequence[RowMapping]: The next batch of task rows, ordered by ID.
+    """
+    STATEMENT = select(*Task.__table__.columns).order_by(Task.id).execution_options(yield_per=BATCH_SIZE)
+    RESULT = await SESSION.stream(STATEMENT)
+    async for PARTITION in RESULT.mappings().partitions():
+        yield PARTITION
 
-async def read_all_tasks(SESSION: AsyncSession) -> list[TaskResponseModel]:
+@timed_crud
+async def read_task_stats(SESSION: AsyncSession, NOW: datetime | None = None) -> TaskStatsModel:
     """
-    Retrieve all tasks from the database.
+    Retrieve the number of tasks with each status, and how many are overdue or due within a week.
+
+    Every count comes from a single grouped query over (status, due_date), which the status/due date
+    index can answer without reading the table rows.
 
     Args:
         SESSION (AsyncSession): The active SQLAlchemy async session.
+        NOW (datetime | None): The time overdue and due soon are measured from. Defaults to the current time.
 
     Returns:
-        list[TaskResponseModel]: A list of all task records.
+        TaskStatsModel: The task counts.
     """
-    RESULT = await SESSION.execute(select(Task))
-    TASKS = RESULT.scalars().all()
-    return [TaskResponseModel.model_validate(task.to_dict()) for task in TASKS]
+    NOW = ensure_utc(NOW) if NOW is not None else datetime.now(timezone.utc)
+    NOT_DONE = Task.status != StatusTypes.DONE
+
+    STATEMENT = select(
+        Task.status,
+        func.count().label("total"),
+        func.count().filter(NOT_DONE, Task.due_date < NOW).label("overdue"),
+        func.count().filter(NOT_DONE, Task.due_date >= NOW, Task.due_date < NOW + timedelta(days=7)).label("due_within_week")
+    ).group_by(Task.status)
+    ROWS = (await SESSION.execute(STATEMENT)).all()
 
+    return TaskStatsModel(
+        total=sum(ROW.total for ROW in ROWS),
+        by_status={STATUS: 0 for STATUS in StatusTypes} | {ROW.status: ROW.total for ROW in ROWS},
+        overdue=sum(ROW.overdue for ROW in ROWS),
+        due_within_week=sum(ROW.due_within_week for ROW in ROWS)
+    )
+
+@timed_crud
 async def read_task(ID: int, SESSION: AsyncSession) -> TaskResponseModel | None:
     """
     Retrieve a single task by its ID.
 
+    Tasks are read through the task cache, so repeat reads of an unchanged task are served without
+    touching the database. Tasks read from a replica are not cached: a lagging replica could
+    otherwise put back a version the primary has already replaced, which would then be served
+    until it expired from the cache.
+
+    Concurrent cache misses for the same task share a single query (see `TASK_READS`), so a burst of
+    requests for a task that is not cached, e.g. after a deploy, costs one query.
+
     Args:
         ID (int): The ID of the task to retrieve.
         SESSION (AsyncSession): The active SQLAlchemy async session.
@@ -48,37 +259,101 @@ async def read_task(ID: int, SESSION: AsyncSession) -> TaskResponseModel | None:
     Returns:
         TaskResponseModel | None: The task if found, otherwise None.
     """
+    CACHE = get_task_cache()
+    CACHED_TASK = await CACHE.get(ID)
+    if CACHED_TASK is not None:
+        return CACHED_TASK
+    return await TASK_READS.do((ID, bool(SESSION.info.get("replica"))), lambda: query_task(ID, SESSION))
+
+async def query_task(ID: int, SESSION: AsyncSession) -> TaskResponseModel | None:
+    """
+    Query a single task by its ID, caching it if it was read from the primary. See `read_task`.
+    """
+    CACHE = get_task_cache()
+    SINCE = CACHE.read_started()
     RESULT = await SESSION.execute(select(Task).where(Task.id == ID))
     TASK = RESULT.scalar_one_or_none()
     if TASK:
-        return TaskResponseModel.model_validate(TASK.to_dict())
+        FOUND_TASK = TaskResponseModel.model_validate(TASK.to_dict())
+        if not SESSION.info.get("replica"):
+            # Skipped if the task has been written since the read began, as the row may predate the write
+            await CACHE.fill(FOUND_TASK, SINCE)
+        return FOUND_TASK
     return None
 
-async def update_task(ID: int, TASK_DATA: TaskUpdateModel, SESSION: AsyncSession) -> TaskResponseModel | None:
+class TaskVersionConflictError(Exception):
+    """
+    Raised when a conditional write finds the task at a different version than the client expected.
+
+    Attributes:
+        ID (int): The ID of the task.
+        CURRENT_VERSION (int): The task's current version.
+    """
+    def __init__(self, ID: int, CURRENT_VERSION: int):
+        super().__init__(f"Task with id '{ID}' has been modified; its current version is {CURRENT_VERSION}.")
+        self.ID = ID
+        self.CURRENT_VERSION = CURRENT_VERSION
+
+@timed_crud
+async def update_task(ID: int, TASK_DATA: TaskUpdateModel, SESSION: AsyncSession,
+                      EXPECTED_VERSIONS: Collection[int] | None = None) -> TaskResponseModel | None:
     """
     Update the status of a task identified by its ID.
 
+    The update and the read of the updated row are a single `UPDATE ... RETURNING` statement, and the
+    cached copy of the task is replaced with the updated row.
+
+    When 'EXPECTED_VERSIONS' is given the write is optimistic: the version check is part of the same
+    `UPDATE ... WHERE id = ? AND version = ?`, so concurrent writers never overwrite each other's
+    changes and no row lock is held beyond the statement itself.
+
     Args:
         ID (int): The ID of the task to update.
         TASK_DATA (TaskUpdateModel): The updated task data (status).
         SESSION (AsyncSession): The active SQLAlchemy async session.
+        EXPECTED_VERSIONS (Collection[int] | None): Only update the task if it is at one of these versions.
 
     Returns:
-        TaskResponseModel | None: The updated task if successful, otherwise None.
+        TaskResponseModel | None: The updated task if successful, otherwise None if the task does not exist.
+
+    Raises:
+        TaskVersionConflictError: If the task exists but is not at any of the expected versions.
     """
-    STATEMENT = sqlalchemy_update(Task).where(Task.id == ID).values(TASK_DATA.model_dump(exclude_unset=True))
+    STATEMENT = (
+        sqlalchemy_update(Task)
+        .where(Task.id == ID)
+        .values(**TASK_DATA.model_dump(exclude_unset=True), version=Task.version + 1)
+        .returning(*Task.__table__.columns)
+    )
+    if EXPECTED_VERSIONS is not None:
+        STATEMENT = STATEMENT.where(Task.version.in_(EXPECTED_VERSIONS))
     RESULT = await SESSION.execute(STATEMENT)
-    
-    if RESULT.rowcount == 0:
+    ROW = RESULT.mappings().one_or_none()
+
+    if ROW is None:
+        await SESSION.rollback()
+        if EXPECTED_VERSIONS is not None:
+            # Only failed conditional writes pay for this read, to tell a conflict from a missing task
+            CURRENT_VERSION = (await SESSION.execute(select(Task.version).where(Task.id == ID))).scalar_one_or_none()
+            if CURRENT_VERSION is not None:
+                raise TaskVersionConflictError(ID, CURRENT_VERSION)
         return None
 
+    UPDATED_TASK = TaskResponseModel.model_validate(dict(ROW))
+    await publish_task_events("updated", [UPDATED_TASK], SESSION=SESSION)
     await SESSION.commit()
-    return await read_task(ID, SESSION)
+    forget_reads([ID])
+    await get_task_cache().set(UPDATED_TASK)
+    return UPDATED_TASK
 
+@timed_crud
 async def delete_task(ID: int, SESSION: AsyncSession) -> bool:
     """
     Delete a task from the database by its ID.
 
+    The existence check and the delete are a single `DELETE ... RETURNING id` statement, and the
+    task is removed from the task cache.
+
     Args:
         ID (int): The ID of the task to delete.
         SESSION (AsyncSession): The active SQLAlchemy async session.
@@ -86,12 +361,155 @@ async def delete_task(ID: int, SESSION: AsyncSession) -> bool:
     Returns:
         bool: True if the task was deleted, False if not found.
     """
-    RESULT = await SESSION.execute(select(Task).where(Task.id == ID))
-    TASK = RESULT.scalar_one_or_none()
+    RESULT = await SESSION.execute(sqlalchemy_delete(Task).where(Task.id == ID).returning(Task.id))
 
-    if TASK is None:
+    if RESULT.scalar_one_or_none() is None:
+        await SESSION.rollback()
         return False
 
-    await SESSION.delete(TASK)
+    await publish_task_events("deleted", IDS=[ID], SESSION=SESSION)
+    await SESSION.commit()
+    forget_reads([ID])
+    await get_task_cache().invalidate(ID)
+    return True
+
+@timed_crud
+async def update_tasks(IDS: list[int], TASK_DATA: TaskUpdateModel, SESSION: AsyncSession,
+                       BATCH_SIZE: int = SETTINGS.BULK_BATCH_SIZE) -> list[TaskBulkResultModel]:
+    """
+    Update the status of many tasks in a single transaction.
+
+    Each batch of IDs is written with one `UPDATE ... WHERE id IN (...) RETURNING` statement.
+
+    Args:
+        IDS (list[int]): The IDs of the tasks to update.
+        TASK_DATA (TaskUpdateModel): The updated task data (status).
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        BATCH_SIZE (int): The maximum number of IDs updated per statement.
+
+    Returns:
+        list[TaskBulkResultModel]: One result per distinct ID, in the order the IDs were requested.
+    """
+    UNIQUE_IDS = list(dict.fromkeys(IDS))
+    VALUES = {**TASK_DATA.model_dump(exclude_unset=True), "version": Task.version + 1}
+    UPDATED_TASKS = {}
+
+    for BATCH in batched(UNIQUE_IDS, BATCH_SIZE):
+        STATEMENT = sqlalchemy_update(Task).where(match_ids(BATCH, SESSION)).values(VALUES).returning(*Task.__table__.columns)
+        RESULT = await SESSION.execute(STATEMENT)
+        for ROW in RESULT.mappings():
+            UPDATED_TASKS[ROW["id"]] = TaskResponseModel.model_validate(dict(ROW))
+
+    await publish_task_events("updated", list(UPDATED_TASKS.values()), SESSION=SESSION)
+    await SESSION.commit()
+    forget_reads(UPDATED_TASKS)
+    await get_task_cache().invalidate_many(UPDATED_TASKS)
+    return [
+        TaskBulkResultModel(id=ID, success=True, task=UPDATED_TASKS[ID]) if ID in UPDATED_TASKS
+        else TaskBulkResultModel(id=ID, success=False, detail=f"No task exists with an id of '{ID}'.")
+        for ID in UNIQUE_IDS
+    ]
+
+def status_update_statement(UPDATES: Sequence[tuple[int, StatusTypes, int]], SESSION: AsyncSession):
+    """
+    Build a single `UPDATE ... RETURNING` statement setting a different status on each of many tasks.
+
+    On PostgreSQL the new statuses are joined in with `UPDATE ... FROM (VALUES ...)`. Other dialects
+    fall back to `CASE` expressions keyed by ID.
+
+    Args:
+        UPDATES (Sequence[tuple[int, StatusTypes, int]]): The ID, new status and version increment of each task.
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+
+    Returns:
+        Update: The statement, returning every column of each updated task.
+    """
+    STATEMENT = sqlalchemy_update(Task).returning(*Task.__table__.columns)
+    if SESSION.get_bind().dialect.name == "postgresql":
+        UPDATE_VALUES = values(column("id", Integer), column("status", Task.status.type), column("increment", Integer),
+                               name="updates").data(list(UPDATES))
+        return (STATEMENT.where(Task.id == UPDATE_VALUES.c.id)
+                .values(status=UPDATE_VALUES.c.status, version=Task.version + UPDATE_VALUES.c.increment))
+
+    return (STATEMENT.where(Task.id.in_([ID for ID, _, _ in UPDATES]))
+            .values(status=case({ID: literal(STATUS, Task.status.type) for ID, STATUS, _ in UPDATES}, value=Task.id),
+                    version=Task.version + case({ID: INCREMENT for ID, _, INCREMENT in UPDATES}, value=Task.id)))
+
+@timed_crud
+async def update_task_statuses(UPDATES: Sequence[tuple[int, StatusTypes]], SESSION: AsyncSession,
+                               BATCH_SIZE: int = SETTINGS.BULK_BATCH_SIZE) -> list[TaskResponseModel | None]:
+    """
+    Apply many status updates, possibly several to the same task, in a single transaction.
+
+    The last update to each task wins, and each batch of tasks is written with one statement (see
+    `status_update_statement`). Each task's version is incremented once per update, and each update's
+    result is the task as it would have been had the updates been applied one after another, so
+    every caller receives the version (and ETag) its own update produced.
+
+    Args:
+        UPDATES (Sequence[tuple[int, StatusTypes]]): The ID and new status of each update, in the order they were made.
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        BATCH_SIZE (int): The maximum number of tasks updated per statement.
+
+    Returns:
+        list[TaskResponseModel | None]: One result per update, in order, or None where the task does not exist.
+    """
+    # The last status written to each task, and how many updates were made to it
+    LATEST: dict[int, tuple[StatusTypes, int]] = {}
+    for ID, STATUS in UPDATES:
+        LATEST[ID] = (STATUS, LATEST[ID][1] + 1 if ID in LATEST else 1)
+
+    ROWS = {}
+    for BATCH in batched(list(LATEST.items()), BATCH_SIZE):
+        STATEMENT = status_update_statement([(ID, STATUS, COUNT) for ID, (STATUS, COUNT) in BATCH], SESSION)
+        for ROW in (await SESSION.execute(STATEMENT)).mappings():
+            ROWS[ROW["id"]] = dict(ROW)
+
+    await publish_task_events("updated", [TaskResponseModel.model_validate(ROW) for ROW in ROWS.values()], SESSION=SESSION)
+    await SESSION.commit()
+    forget_reads(ROWS)
+    await get_task_cache().invalidate_many(ROWS)
+
+    # Work back from each task's final version to the version each of its updates produced
+    REMAINING = {ID: COUNT for ID, (_, COUNT) in LATEST.items()}
+    RESULTS = []
+    for ID, STATUS in UPDATES:
+        if ID not in ROWS:
+            RESULTS.append(None)
+            continue
+        REMAINING[ID] -= 1
+        RESULTS.append(TaskResponseModel.model_validate(ROWS[ID] | {"status": STATUS, "version": ROWS[ID]["version"] - REMAINING[ID]}))
+    return RESULTS
+
+@timed_crud
+async def delete_tasks(IDS: list[int], SESSION: AsyncSession,
+                       BATCH_SIZE: int = SETTINGS.BULK_BATCH_SIZE) -> list[TaskBulkResultModel]:
+    """
+    Delete many tasks in a single transaction.
+
+    Each batch of IDs is deleted with one `DELETE ... WHERE id IN (...) RETURNING id` statement.
+
+    Args:
+        IDS (list[int]): The IDs of the tasks to delete.
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        BATCH_SIZE (int): The maximum number of IDs deleted per statement.
+
+    Returns:
+        list[TaskBulkResultModel]: One result per distinct ID, in the order the IDs were requested.
+    """
+    UNIQUE_IDS = list(dict.fromkeys(IDS))
+    DELETED_IDS = set()
+
+    for BATCH in batched(UNIQUE_IDS, BATCH_SIZE):
+        RESULT = await SESSION.execute(sqlalchemy_delete(Task).where(match_ids(BATCH, SESSION)).returning(Task.id))
+        DELETED_IDS.update(RESULT.scalars())
+
+    await publish_task_events("deleted", IDS=list(DELETED_IDS), SESSION=SESSION)
     await SESSION.commit()
-    return True
\ No newline at end of file
+    forget_reads(DELETED_IDS)
+    await get_task_cache().invalidate_many(DELETED_IDS)
+    return [
+        TaskBulkResultModel(id=ID, success=True) if ID in DELETED_IDS
+        else TaskBulkResultModel(id=ID, success=False, detail=f"No task exists with an id of '{ID}'.")
+        for ID in UNIQUE_IDS
+    ]
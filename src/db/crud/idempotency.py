@@ -0,0 +1,155 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Row, insert as sqlalchemy_insert, delete as sqlalchemy_delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from db.crud.crud import task_created
+from db.tables.idempotency_key import IdempotencyKey
+from db.tables.task import Task
+from events.task_events import publish_task_events
+from metrics.prometheus import timed_crud
+from models.tasks import TaskCreationModel, TaskResponseModel
+from utils.datetime_utils import ensure_utc
+from settings import SETTINGS
+
+
+class IdempotencyKeyReusedError(Exception):
+    """
+    Raised when an idempotency key is sent with a different request than the one it was first used for.
+
+    Attributes:
+        KEY (str): The idempotency key.
+    """
+    def __init__(self, KEY: str):
+        super().__init__(f"Idempotency key '{KEY}' has already been used for a different request.")
+        self.KEY = KEY
+
+
+def hash_request(TASK: TaskCreationModel) -> str:
+    """
+    Hash a task creation request, so retries of it can be told apart from other requests reusing its key.
+
+    The validated model is hashed rather than the raw body, so formatting differences between retries
+    (e.g. key order or whitespace) do not matter.
+
+    Args:
+        TASK (TaskCreationModel): The task creation payload.
+
+    Returns:
+        str: The SHA-256 hex digest of the request.
+    """
+    return hashlib.sha256(TASK.model_dump_json().encode()).hexdigest()
+
+
+async def read_idempotency_key(KEY: str, SESSION: AsyncSession) -> Row | None:
+    """
+    Read the stored outcome of the request made with an idempotency key.
+
+    Args:
+        KEY (str): The idempotency key.
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+
+    Returns:
+        Row | None: The key's request hash, response and expiry, or None if the key has not been used.
+    """
+    QUERY = (select(IdempotencyKey.request_hash, IdempotencyKey.response, IdempotencyKey.expires_at)
+             .where(IdempotencyKey.key == KEY))
+    return (await SESSION.execute(QUERY)).one_or_none()
+
+
+def replay(KEY: str, STORED: Row, REQUEST_HASH: str) -> TaskResponseModel:
+    """
+    Rebuild the response to the request first made with an idempotency key.
+
+    Args:
+        KEY (str): The idempotency key.
+        STORED (Row): The key's stored outcome.
+        REQUEST_HASH (str): The hash of the request being retried.
+
+    Returns:
+        TaskResponseModel: The task returned to the original request.
+
+    Raises:
+        IdempotencyKeyReusedError: If the key was first used for a different request.
+    """
+    if STORED.request_hash != REQUEST_HASH:
+        raise IdempotencyKeyReusedError(KEY)
+    return TaskResponseModel.model_validate_json(STORED.response)
+
+
+@timed_crud
+async def create_task_idempotently(TASK: TaskCreationModel, KEY: str, SESSION: AsyncSession,
+                                   TTL_SECONDS: float = SETTINGS.IDEMPOTENCY_KEY_TTL_SECONDS) -> tuple[TaskResponseModel, bool]:
+    """
+    Create a new task, unless a request with the same idempotency key has already created one.
+
+    The task and the key's stored response are written in the same transaction, so a key is only
+    recorded for a task that was created, and a failed request can be retried with its key. Concurrent
+    requests with the same key are settled by the key's unique constraint rather than by locking: the
+    first to commit wins, and the others roll back their task and replay its response.
+
+    Args:
+        TASK (TaskCreationModel): The task data to be inserted.
+        KEY (str): The client's idempotency key.
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        TTL_SECONDS (float): How long the response is replayed to retries.
+
+    Returns:
+        tuple[TaskResponseModel, bool]: The task, and whether it was replayed from an earlier request.
+
+    Raises:
+        IdempotencyKeyReusedError: If the key was first used for a different request.
+    """
+    REQUEST_HASH = hash_request(TASK)
+    NOW = datetime.now(timezone.utc)
+
+    STORED = await read_idempotency_key(KEY, SESSION)
+    if STORED is not None:
+        if ensure_utc(STORED.expires_at) > NOW:
+            return replay(KEY, STORED, REQUEST_HASH), True
+        # The key has expired but not yet been purged, so it can be reused
+        await SESSION.execute(sqlalchemy_delete(IdempotencyKey)
+                              .where(IdempotencyKey.key == KEY, IdempotencyKey.expires_at <= NOW))
+
+    try:
+        NEW_TASK = Task(**TASK.model_dump())
+        SESSION.add(NEW_TASK)
+        await SESSION.flush()
+        await SESSION.refresh(NEW_TASK)
+        CREATED_TASK = TaskResponseModel.model_validate(NEW_TASK.to_dict())
+        await SESSION.execute(sqlalchemy_insert(IdempotencyKey).values(
+            key=KEY, request_hash=REQUEST_HASH, response=CREATED_TASK.model_dump_json(),
+            expires_at=NOW + timedelta(seconds=TTL_SECONDS)
+        ))
+        await publish_task_events("created", [CREATED_TASK], SESSION=SESSION)
+        await SESSION.commit()
+    except IntegrityError:
+        # A concurrent request with the same key committed first
+        await SESSION.rollback()
+        STORED = await read_idempotency_key(KEY, SESSION)
+        if STORED is None:
+            raise
+        return replay(KEY, STORED, REQUEST_HASH), True
+
+    await task_created(CREATED_TASK)
+    return CREATED_TASK, False
+
+
+@timed_crud
+async def purge_idempotency_keys(SESSION: AsyncSession, BEFORE: datetime, BATCH_SIZE: int) -> int:
+    """
+    Delete a batch of idempotency keys that expired before a given time.
+
+    Args:
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        BEFORE (datetime): Keys expiring at or before this time are deleted.
+        BATCH_SIZE (int): The maximum number of keys deleted.
+
+    Returns:
+        int: The number of keys deleted.
+    """
+    EXPIRED_KEYS = select(IdempotencyKey.key).where(IdempotencyKey.expires_at <= BEFORE).limit(BATCH_SIZE)
+    RESULT = await SESSION.execute(sqlalchemy_delete(IdempotencyKey).where(IdempotencyKey.key.in_(EXPIRED_KEYS)))
+    await SESSION.commit()
+    return RESULT.rowcount
@@ -0,0 +1,116 @@
+import re
+from sqlalchemy import Float, and_, case, cast, func, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.tables.task import Task
+from metrics.prometheus import timed_crud
+from utils.cursor import encode_search_cursor, decode_search_cursor
+from utils.global_constants import StatusTypes, SearchConstants
+
+TASK_COLUMNS = tuple(Task.__table__.columns)
+
+
+def postgres_search(QUERY: str) -> tuple:
+    """
+    Build the PostgreSQL match condition and rank for a search.
+
+    Tasks match when their search vector matches the query as parsed by websearch_to_tsquery, or when
+    the query appears anywhere in their title or description (served by the trigram index). The rank
+    adds the full-text rank to the query's trigram word similarity, so partial matches rank below
+    whole word matches.
+
+    Args:
+        QUERY (str): The user's search query.
+
+    Returns:
+        tuple: The match condition, the rank expression and the FROM clause to select from.
+    """
+    CONFIG = literal_column(f"'{SearchConstants.TEXT_SEARCH_CONFIG}'::regconfig")
+    VECTOR = literal_column(f'"Tasks".{SearchConstants.SEARCH_VECTOR_COLUMN}')
+    DOCUMENT = literal_column(f"({SearchConstants.SEARCH_DOCUMENT})")
+    TS_QUERY = func.websearch_to_tsquery(CONFIG, QUERY)
+
+    MATCH = or_(VECTOR.op("@@")(TS_QUERY), DOCUMENT.icontains(QUERY, autoescape=True))
+    RANK = cast(func.ts_rank(VECTOR, TS_QUERY) + func.word_similarity(QUERY, DOCUMENT), Float)
+    return MATCH, RANK, Task.__table__
+
+
+def sqlite_search(QUERY: str) -> tuple:
+    """
+    Build the SQLite match condition and rank for a search.
+
+    Each word of the query is matched as a prefix against the FTS5 index, and tasks whose title or
+    description contains the query as a substring also match. The rank is the negated BM25 score, and
+    zero for substring-only matches.
+
+    Args:
+        QUERY (str): The user's search query.
+
+    Returns:
+        tuple: The match condition, the rank expression and the FROM clause to select from.
+    """
+    CONTAINS = or_(Task.title.contains(QUERY, autoescape=True), Task.description.contains(QUERY, autoescape=True))
+
+    # Quote every word so FTS5 operators and punctuation in the query are matched literally
+    WORDS = re.findall(r"\w+", QUERY)
+    if not WORDS:
+        return CONTAINS, cast(0.0, Float), Task.__table__
+
+    FTS_QUERY = " ".join(f'"{WORD}"*' for WORD in WORDS)
+    MATCHES = select(literal_column("rowid").label("id"), literal_column("rank").label("rank")) \
+        .select_from(text(f'"{SearchConstants.FTS_TABLE}"')) \
+        .where(text(f'"{SearchConstants.FTS_TABLE}" MATCH :fts_query').bindparams(fts_query=FTS_QUERY)) \
+        .subquery()
+
+    MATCH = or_(MATCHES.c.id.is_not(None), CONTAINS)
+    RANK = cast(case((MATCHES.c.id.is_not(None), -MATCHES.c.rank), else_=0.0), Float)
+    return MATCH, RANK, Task.__table__.outerjoin(MATCHES, MATCHES.c.id == Task.id)
+
+
+@timed_crud
+async def search_tasks(SESSION: AsyncSession, QUERY: str, LIMIT: int, CURSOR: str | None = None,
+                       STATUS: StatusTypes | None = None) -> dict:
+    """
+    Retrieve a page of tasks whose title or description matches a search query, most relevant first.
+
+    Pagination is keyset based on (rank, id), so each page continues exactly where the previous one
+    ended. Ties in rank are broken by ID.
+
+    Args:
+        SESSION (AsyncSession): The active SQLAlchemy async session.
+        QUERY (str): The search query.
+        LIMIT (int): The maximum number of tasks to return.
+        CURSOR (str | None): Cursor returned with the previous page, or None for the first page.
+        STATUS (StatusTypes | None): Only return tasks with this status.
+
+    Returns:
+        dict: The matching tasks on the requested page and the cursor for the next page, shaped like TaskPageModel.
+
+    Raises:
+        ValueError: If 'CURSOR' is malformed.
+    """
+    if SESSION.get_bind().dialect.name == "postgresql":
+        MATCH, RANK, FROM = postgres_search(QUERY)
+    else:
+        MATCH, RANK, FROM = sqlite_search(QUERY)
+
+    STATEMENT = select(*TASK_COLUMNS, RANK.label("rank")).select_from(FROM).where(MATCH)
+
+    if STATUS is not None:
+        STATEMENT = STATEMENT.where(Task.status == STATUS)
+    if CURSOR is not None:
+        LAST_RANK, LAST_ID = decode_search_cursor(CURSOR)
+        STATEMENT = STATEMENT.where(or_(RANK < LAST_RANK, and_(RANK == LAST_RANK, Task.id > LAST_ID)))
+
+    # Fetch one extra row to find out whether another page follows this one
+    STATEMENT = STATEMENT.order_by(RANK.desc(), Task.id).limit(LIMIT + 1)
+    RESULT = await SESSION.execute(STATEMENT)
+    KEYS = tuple(COLUMN.key for COLUMN in TASK_COLUMNS)
+    ROWS = RESULT.all()
+
+    NEXT_CURSOR = None
+    if len(ROWS) > LIMIT:
+        ROWS = ROWS[:LIMIT]
+        NEXT_CURSOR = encode_search_cursor(ROWS[-1].rank, ROWS[-1].id)
+
+    # The rank is the last column, so it is left out of the tasks
+    return {"items": [dict(zip(KEYS, ROW)) for ROW in ROWS], "next_cursor": NEXT_CURSOR}
@@ -0,0 +1,150 @@
+import asyncio
+from sqlalchemy.orm import sessionmaker
+from db.crud.crud import update_task_statuses
+from logger import LOGGER
+from models.tasks import TaskResponseModel, TaskUpdateModel
+from settings import SETTINGS
+
+
+class StatusUpdateBatcher:
+    """
+    Write-behind batching of task status updates.
+
+    Updates are queued, and a background flusher waits 'DELAY_SECONDS' after the first queued update
+    before applying everything queued by then (up to 'MAX_BATCH_SIZE' updates) in a single
+    transaction with `update_task_statuses`. Under heavy write load, many updates share one commit
+    instead of each paying for its own. Updates queued while a batch is being written are applied
+    in the next one.
+
+    Each caller waits for the batch holding its update to commit, then receives its own result, so
+    a response is never sent for an update that has not been written.
+
+    Methods:
+        submit(ID, TASK_DATA): Queue a status update and wait for it to be written.
+        start(): Start the background flusher.
+        stop(): Write any queued updates and stop the background flusher.
+    """
+    def __init__(self, SESSION_FACTORY: sessionmaker, DELAY_SECONDS: float = SETTINGS.STATUS_BATCH_DELAY_SECONDS,
+                 MAX_BATCH_SIZE: int = SETTINGS.STATUS_BATCH_MAX_SIZE):
+        """
+        Args:
+            SESSION_FACTORY (sessionmaker): Creates sessions on the primary database.
+            DELAY_SECONDS (float): How long updates are accumulated before they are written.
+            MAX_BATCH_SIZE (int): The maximum number of updates written per transaction.
+        """
+        self.SESSION_FACTORY = SESSION_FACTORY
+        self.DELAY_SECONDS = DELAY_SECONDS
+        self.MAX_BATCH_SIZE = MAX_BATCH_SIZE
+        # Queued updates, followed by None once the batcher is stopping
+        self.QUEUE: asyncio.Queue[tuple[int, TaskUpdateModel, asyncio.Future] | None] = asyncio.Queue()
+        self.STOPPING = asyncio.Event()
+        self.TASK: asyncio.Task | None = None
+
+    async def submit(self, ID: int, TASK_DATA: TaskUpdateModel) -> TaskResponseModel | None:
+        """
+        Queue a status update and wait for it to be written.
+
+        Args:
+            ID (int): The ID of the task to update.
+            TASK_DATA (TaskUpdateModel): The new status.
+
+        Returns:
+            TaskResponseModel | None: The task as updated by this update, or None if the task does not exist.
+        """
+        FUTURE = asyncio.get_running_loop().create_future()
+        self.QUEUE.put_nowait((ID, TASK_DATA, FUTURE))
+        # Shielded, so a caller that goes away does not cancel its queued update
+        return await asyncio.shield(FUTURE)
+
+    async def run(self) -> None:
+        STOPPING = False
+        while not STOPPING:
+            UPDATE = await self.QUEUE.get()
+            if UPDATE is None:
+                return
+            BATCH = [UPDATE]
+            # Stopping cuts the wait short
+            try:
+                await asyncio.wait_for(self.STOPPING.wait(), self.DELAY_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            while len(BATCH) < self.MAX_BATCH_SIZE and not self.QUEUE.empty():
+                UPDATE = self.QUEUE.get_nowait()
+                if UPDATE is None:
+                    STOPPING = True
+                    break
+                BATCH.append(UPDATE)
+            await self.flush(BATCH)
+
+    async def flush(self, BATCH: list[tuple[int, TaskUpdateModel, asyncio.Future]]) -> None:
+        """
+        Write a batch of updates and resolve each caller's future with its result.
+
+        Args:
+            BATCH (list[tuple[int, TaskUpdateModel, asyncio.Future]]): The queued updates, in the order they were made.
+        """
+        try:
+            async with self.SESSION_FACTORY() as SESSION:
+                RESULTS = await update_task_statuses([(ID, TASK_DATA.status) for ID, TASK_DATA, _ in BATCH], SESSION)
+        except Exception as EXCEPTION:
+            LOGGER.warning(f"Failed to write a batch of {len(BATCH)} status updates: {EXCEPTION}")
+            for _, _, FUTURE in BATCH:
+                if not FUTURE.done():
+                    FUTURE.set_exception(EXCEPTION)
+            return
+
+        for (_, _, FUTURE), RESULT in zip(BATCH, RESULTS):
+            if not FUTURE.done():
+                FUTURE.set_result(RESULT)
+
+    def start(self) -> None:
+        """
+        Start the background flusher.
+        """
+        self.TASK = asyncio.create_task(self.run(), name="status-update-batcher")
+
+    async def stop(self) -> None:
+        """
+        Write any queued updates and stop the background flusher.
+        """
+        if self.TASK is not None:
+            # Rather than being cancelled mid-write, the flusher finishes the updates queued before this
+            self.STOPPING.set()
+            self.QUEUE.put_nowait(None)
+            await self.TASK
+            self.TASK = None
+
+        # Updates queued while the flusher was stopping
+        BATCH = []
+        while not self.QUEUE.empty():
+            UPDATE = self.QUEUE.get_nowait()
+            if UPDATE is not None:
+                BATCH.append(UPDATE)
+        for START in range(0, len(BATCH), self.MAX_BATCH_SIZE):
+            await self.flush(BATCH[START:START + self.MAX_BATCH_SIZE])
+
+
+# The batcher used for status updates, or None to write each update in its own transaction.
+# Set at startup by `configure_status_update_batcher` when STATUS_BATCH_ENABLED is set.
+STATUS_UPDATE_BATCHER: StatusUpdateBatcher | None = None
+
+
+def configure_status_update_batcher(BATCHER: StatusUpdateBatcher | None) -> None:
+    """
+    Replace the batcher used for status updates.
+
+    Args:
+        BATCHER (StatusUpdateBatcher | None): The batcher to use, or None to disable batching.
+    """
+    global STATUS_UPDATE_BATCHER
+    STATUS_UPDATE_BATCHER = BATCHER
+
+
+def get_status_update_batcher() -> StatusUpdateBatcher | None:
+    """
+    Retrieve the batcher used for status updates.
+
+    Returns:
+        StatusUpdateBatcher | None: The configured batcher, or None if batching is disabled.
+    """
+    return STATUS_UPDATE_BATCHER
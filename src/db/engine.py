@@ -0,0 +1,59 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from db.pool_metrics import PoolMetrics, InstrumentedAsyncAdaptedQueuePool
+
+
+def create_database_engine(URL: str, POOL_METRICS: PoolMetrics, POOL_SIZE: int, MAX_OVERFLOW: int, POOL_TIMEOUT: float,
+                           POOL_RECYCLE: int, POOL_PRE_PING: bool, STATEMENT_CACHE_SIZE: int, ECHO: bool | str) -> AsyncEngine:
+    """
+    Create an async SQLAlchemy engine with a tuned, instrumented connection pool.
+
+    Args:
+        URL (str): The database URL.
+        POOL_METRICS (PoolMetrics): Metrics the pool records checkouts, checkins and wait times into.
+        POOL_SIZE (int): The number of connections kept open in the pool.
+        MAX_OVERFLOW (int): The number of extra connections that may be opened when the pool is exhausted.
+        POOL_TIMEOUT (float): Seconds to wait for a connection before giving up.
+        POOL_RECYCLE (int): Seconds after which a connection is replaced. -1 disables recycling.
+        POOL_PRE_PING (bool): Whether to test connections for liveness when they are checked out.
+        STATEMENT_CACHE_SIZE (int): The number of prepared statements cached per asyncpg connection.
+        ECHO (bool | str): SQL statement logging, either False, True or 'debug'.
+
+    Returns:
+        AsyncEngine: The engine.
+    """
+    DATABASE_URL = make_url(URL)
+    CONNECT_ARGS = {}
+
+    if DATABASE_URL.get_driver_name() == "asyncpg":
+        # Size both SQLAlchemy's prepared statement cache and asyncpg's own statement cache
+        DATABASE_URL = DATABASE_URL.update_query_dict({"prepared_statement_cache_size": str(STATEMENT_CACHE_SIZE)})
+        CONNECT_ARGS["statement_cache_size"] = STATEMENT_CACHE_SIZE
+
+    return create_async_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedAsyncAdaptedQueuePool.bind(POOL_METRICS),
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=POOL_PRE_PING,
+        connect_args=CONNECT_ARGS,
+        echo=ECHO
+    )
+
+
+def parse_echo(VALUE: str) -> bool | str:
+    """
+    Parse the SQL statement logging setting.
+
+    Args:
+        VALUE (str): 'false', 'true' or 'debug' (case insensitive).
+
+    Returns:
+        bool | str: The value to pass as the engine's `echo` argument.
+    """
+    VALUE = VALUE.strip().lower()
+    if VALUE == "debug":
+        return "debug"
+    return VALUE == "true"
@@ -1,25 +1,114 @@
-from fastapi import Request
+import math
+import time
+from fastapi import Request, Response
 from typing import AsyncGenerator
+from sqlalchemy.orm import sessionmaker
+from settings import SETTINGS
+from utils.global_constants import ReplicaConstants
 
-async def get_async_session(REQUEST: Request) -> AsyncGenerator:
+async def get_async_session(REQUEST: Request, RESPONSE: Response) -> AsyncGenerator:
     """
-    Dependency that provides a SQLAlchemy AsyncSession for a request.
+    Dependency that provides a SQLAlchemy AsyncSession on the primary database for a request.
 
     This function retrieves the `AsyncSession` factory stored in the app state
     and yields a session instance for use in route handlers and services.
 
     The session is automatically closed after the request is completed.
 
+    When a read replica is configured, the response also sets a cookie that sends the client's
+    reads to the primary for READ_YOUR_WRITES_SECONDS, so the client sees its own writes even
+    if the replica has not caught up yet.
+
     Args:
         REQUEST (Request): The current FastAPI request object, which provides
                            access to the application state where the session factory is stored.
+        RESPONSE (Response): The outgoing response, used to set the read-your-writes cookie.
 
     Yields:
         AsyncSession: A SQLAlchemy asynchronous session object.
 
     Usage:
-        Add as a dependency in route handlers using `Depends(get_async_session)`.
+        Add as a dependency in route handlers that write, using `Depends(get_async_session)`.
     """
     async_session = REQUEST.app.state.ASYNC_SESSION
+    if has_read_replica(REQUEST) and SETTINGS.READ_YOUR_WRITES_SECONDS > 0:
+        RESPONSE.set_cookie(
+            ReplicaConstants.PRIMARY_COOKIE,
+            f"{time.time() + SETTINGS.READ_YOUR_WRITES_SECONDS:.3f}",
+            max_age=math.ceil(SETTINGS.READ_YOUR_WRITES_SECONDS),
+            httponly=True,
+            samesite="lax"
+        )
+    async with async_session() as SESSION:
+        yield SESSION
+
+async def get_async_read_session(REQUEST: Request) -> AsyncGenerator:
+    """
+    Dependency that provides a SQLAlchemy AsyncSession for a read-only request.
+
+    The session reads from the read replica when one is configured, unless the client wrote
+    recently (see `get_async_session`), in which case it reads from the primary.
+
+    Args:
+        REQUEST (Request): The current FastAPI request object, which provides
+                           access to the application state where the session factories are stored.
+
+    Yields:
+        AsyncSession: A SQLAlchemy asynchronous session object.
+
+    Usage:
+        Add as a dependency in read-only route handlers using `Depends(get_async_read_session)`.
+    """
+    async_session = get_async_read_session_factory(REQUEST)
     async with async_session() as SESSION:
-        yield SESSION
\ No newline at end of file
+        yield SESSION
+
+def get_async_read_session_factory(REQUEST: Request) -> sessionmaker:
+    """
+    Dependency that provides the SQLAlchemy AsyncSession factory for read-only requests.
+
+    Unlike `get_async_read_session`, the caller is responsible for opening and closing sessions. This is
+    required by streaming responses, whose bodies are generated after the request scoped session has
+    already been closed. Requests are routed like `get_async_read_session`.
+
+    Args:
+        REQUEST (Request): The current FastAPI request object, which provides
+                           access to the application state where the session factories are stored.
+
+    Returns:
+        sessionmaker: The replica's session factory, or the primary's if the client wrote recently
+                      or no replica is configured.
+
+    Usage:
+        Add as a dependency in read-only route handlers using `Depends(get_async_read_session_factory)`.
+    """
+    if not has_read_replica(REQUEST) or reads_from_primary(REQUEST):
+        return REQUEST.app.state.ASYNC_SESSION
+    return REQUEST.app.state.ASYNC_READ_SESSION
+
+def has_read_replica(REQUEST: Request) -> bool:
+    """
+    Retrieve whether a read replica is configured.
+
+    Args:
+        REQUEST (Request): The current FastAPI request object.
+
+    Returns:
+        bool: True if read-only requests may be served by a replica.
+    """
+    return getattr(REQUEST.app.state, "ASYNC_READ_SESSION", None) is not None
+
+def reads_from_primary(REQUEST: Request) -> bool:
+    """
+    Retrieve whether the client wrote recently enough that its reads must be served by the primary.
+
+    Args:
+        REQUEST (Request): The current FastAPI request object.
+
+    Returns:
+        bool: True if the client's read-your-writes cookie has not expired yet.
+    """
+    try:
+        return float(REQUEST.cookies.get(ReplicaConstants.PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
@@ -0,0 +1,168 @@
+import itertools
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """
+    Counters describing how a connection pool is being used.
+
+    Attributes:
+        CHECKOUTS (int): The number of connections handed out by the pool.
+        CHECKINS (int): The number of connections returned to the pool.
+        TIMEOUTS (int): The number of checkouts that gave up waiting for a connection.
+        WAIT_SECONDS_TOTAL (float): The total time spent waiting for connections.
+        WAIT_SECONDS_MAX (float): The longest time spent waiting for a single connection.
+        OVERFLOW_MAX (int): The highest number of overflow connections open at once.
+        WAITING (dict[int, float]): When each checkout still waiting for a connection started, oldest first.
+
+    Methods:
+        start_wait(): Record a checkout starting to wait for a connection.
+        end_wait(TOKEN): Record a checkout no longer waiting for a connection.
+        current_wait_seconds(): Retrieve how long the oldest waiting checkout has been waiting.
+        record_checkout(WAIT_SECONDS, OVERFLOW): Record a successful checkout.
+        record_checkin(): Record a connection being returned.
+        record_timeout(WAIT_SECONDS): Record a checkout that timed out.
+        snapshot(POOL): Retrieve the counters together with the pool's current state.
+    """
+    def __init__(self):
+        self.CHECKOUTS = 0
+        self.CHECKINS = 0
+        self.TIMEOUTS = 0
+        self.WAIT_SECONDS_TOTAL = 0.0
+        self.WAIT_SECONDS_MAX = 0.0
+        self.OVERFLOW_MAX = 0
+        self.WAITING: dict[int, float] = {}
+        self.WAIT_TOKENS = itertools.count()
+
+    def start_wait(self) -> int:
+        """
+        Record a checkout starting to wait for a connection.
+
+        Returns:
+            int: A token to pass to `end_wait` once the checkout is no longer waiting.
+        """
+        TOKEN = next(self.WAIT_TOKENS)
+        self.WAITING[TOKEN] = time.perf_counter()
+        return TOKEN
+
+    def end_wait(self, TOKEN: int) -> None:
+        """
+        Record a checkout no longer waiting for a connection, whether it got one or not.
+
+        Args:
+            TOKEN (int): The token returned by `start_wait`.
+        """
+        self.WAITING.pop(TOKEN, None)
+
+    def current_wait_seconds(self) -> float:
+        """
+        Retrieve how long the oldest checkout still waiting for a connection has been waiting.
+
+        Unlike the recorded wait times, this reflects the pool's state right now, and drops back to
+        0 as soon as the pool catches up.
+
+        Returns:
+            float: The wait so far, or 0.0 if no checkout is waiting.
+        """
+        # Checkouts start waiting in time order, so the first one left is the oldest
+        for STARTED in self.WAITING.values():
+            return time.perf_counter() - STARTED
+        return 0.0
+
+    def record_checkout(self, WAIT_SECONDS: float, OVERFLOW: int) -> None:
+        """
+        Record a successful checkout.
+
+        Args:
+            WAIT_SECONDS (float): How long the checkout waited for a connection.
+            OVERFLOW (int): The number of overflow connections open after the checkout.
+        """
+        self.CHECKOUTS += 1
+        self.WAIT_SECONDS_TOTAL += WAIT_SECONDS
+        self.WAIT_SECONDS_MAX = max(self.WAIT_SECONDS_MAX, WAIT_SECONDS)
+        self.OVERFLOW_MAX = max(self.OVERFLOW_MAX, OVERFLOW)
+
+    def record_checkin(self) -> None:
+        """
+        Record a connection being returned to the pool.
+        """
+        self.CHECKINS += 1
+
+    def record_timeout(self, WAIT_SECONDS: float) -> None:
+        """
+        Record a checkout that timed out.
+
+        Args:
+            WAIT_SECONDS (float): How long the checkout waited before timing out.
+        """
+        self.TIMEOUTS += 1
+        self.WAIT_SECONDS_TOTAL += WAIT_SECONDS
+        self.WAIT_SECONDS_MAX = max(self.WAIT_SECONDS_MAX, WAIT_SECONDS)
+
+    def snapshot(self, POOL) -> dict:
+        """
+        Retrieve the counters together with the pool's current state.
+
+        Args:
+            POOL: The pool the counters describe.
+
+        Returns:
+            dict: The pool's size, checked out and overflow connections, waiting checkouts, and the recorded counters.
+        """
+        ATTEMPTS = self.CHECKOUTS + self.TIMEOUTS
+        return {
+            "size": POOL.size(),
+            "checked_out": POOL.checkedout(),
+            "overflow": POOL.overflow(),
+            "overflow_max": self.OVERFLOW_MAX,
+            "waiting": len(self.WAITING),
+            "checkouts": self.CHECKOUTS,
+            "checkins": self.CHECKINS,
+            "timeouts": self.TIMEOUTS,
+            "wait_seconds_total": self.WAIT_SECONDS_TOTAL,
+            "wait_seconds_max": self.WAIT_SECONDS_MAX,
+            "wait_seconds_mean": self.WAIT_SECONDS_TOTAL / ATTEMPTS if ATTEMPTS else 0.0
+        }
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default asyncio connection pool, instrumented to record checkouts, checkins and wait times.
+
+    Use `bind` to create a subclass that records into a particular PoolMetrics instance. The
+    subclass (rather than the pool instance) holds the metrics so they survive the pool being
+    recreated by `engine.dispose()`.
+    """
+    METRICS: PoolMetrics
+
+    @classmethod
+    def bind(cls, METRICS: PoolMetrics) -> type["InstrumentedAsyncAdaptedQueuePool"]:
+        """
+        Create a pool class that records into 'METRICS'.
+
+        Args:
+            METRICS (PoolMetrics): The metrics to record into.
+
+        Returns:
+            type[InstrumentedAsyncAdaptedQueuePool]: The pool class to pass as `poolclass`.
+        """
+        return type(cls.__name__, (cls,), {"METRICS": METRICS})
+
+    def _do_get(self):
+        START = time.perf_counter()
+        TOKEN = self.METRICS.start_wait()
+        try:
+            CONNECTION = super()._do_get()
+        except PoolTimeoutError:
+            self.METRICS.record_timeout(time.perf_counter() - START)
+            raise
+        finally:
+            self.METRICS.end_wait(TOKEN)
+        self.METRICS.record_checkout(time.perf_counter() - START, self.overflow())
+        return CONNECTION
+
+    def _do_return_conn(self, RECORD) -> None:
+        super()._do_return_conn(RECORD)
+        self.METRICS.record_checkin()
@@ -0,0 +1,103 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from logger import LOGGER
+
+# The migrations' configuration, resolved relative to src/ so it is found from any working directory
+ALEMBIC_CONFIG_PATH = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+class SchemaVersionError(RuntimeError):
+    """
+    Raised at startup when the database schema is not at the revision the application expects.
+    """
+
+
+def get_alembic_config(DATABASE_URL: str | None = None) -> Config:
+    """
+    Load the migrations' configuration.
+
+    Args:
+        DATABASE_URL (str | None): The database to migrate. Defaults to the database configured by the app's settings.
+
+    Returns:
+        Config: The Alembic configuration, with logging left to the application.
+    """
+    CONFIG = Config(str(ALEMBIC_CONFIG_PATH))
+    CONFIG.attributes["configure_logger"] = False
+    if DATABASE_URL is not None:
+        CONFIG.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+    return CONFIG
+
+
+def upgrade_schema(CONNECTION: Connection, REVISION: str = "head") -> None:
+    """
+    Migrate a database over an open connection, e.g. an in-memory database that only exists on that connection.
+
+    Args:
+        CONNECTION (Connection): The synchronous connection, e.g. from `AsyncConnection.run_sync`.
+        REVISION (str): The revision to migrate to.
+    """
+    CONFIG = get_alembic_config()
+    CONFIG.attributes["connection"] = CONNECTION
+    command.upgrade(CONFIG, REVISION)
+
+
+def get_head_revisions() -> set[str]:
+    """
+    Retrieve the revisions the application's code expects the schema to be at.
+
+    Returns:
+        set[str]: The head revision of each migration branch.
+    """
+    return set(ScriptDirectory.from_config(get_alembic_config()).get_heads())
+
+
+async def get_current_revisions(ENGINE: AsyncEngine) -> set[str]:
+    """
+    Retrieve the revisions the database's schema has been migrated to.
+
+    Args:
+        ENGINE (AsyncEngine): The database engine.
+
+    Returns:
+        set[str]: The revisions recorded in the alembic_version table, or an empty set if the database
+                  has never been migrated.
+    """
+    async with ENGINE.connect() as CONNECTION:
+        return await CONNECTION.run_sync(
+            lambda SYNC_CONNECTION: set(MigrationContext.configure(SYNC_CONNECTION).get_current_heads())
+        )
+
+
+async def check_schema_version(ENGINE: AsyncEngine, MODE: str) -> None:
+    """
+    Check that the database schema has been migrated to the revision the application expects.
+
+    Serving requests against an older (or newer) schema fails in confusing ways, e.g. on missing
+    columns, so a mismatch is reported at startup instead.
+
+    Args:
+        ENGINE (AsyncEngine): The database engine.
+        MODE (str): 'error' to refuse to start on a mismatch, 'warn' to log it, or 'off' to skip the check.
+
+    Raises:
+        SchemaVersionError: If the revisions do not match and 'MODE' is 'error'.
+    """
+    if MODE == "off":
+        return
+
+    CURRENT = await get_current_revisions(ENGINE)
+    HEADS = get_head_revisions()
+    if CURRENT == HEADS:
+        return
+
+    MESSAGE = (f"The database schema is at revision {', '.join(sorted(CURRENT)) or 'none'} but the application "
+               f"requires revision {', '.join(sorted(HEADS))}. Run 'alembic upgrade head' in the src/ directory.")
+    if MODE == "error":
+        raise SchemaVersionError(MESSAGE)
+    LOGGER.warning(MESSAGE)
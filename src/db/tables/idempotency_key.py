@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Text, DateTime, Index
+from db.tables.task import Base
+from utils.global_constants import IdempotencyConstants
+
+
+class IdempotencyKey(Base):
+    """
+    SQLAlchemy model recording the response to a request made with an Idempotency-Key header.
+
+    The key is the primary key, so when two requests with the same key race, the database's unique
+    constraint lets exactly one of them commit.
+
+    Attributes:
+        key (str): The client's Idempotency-Key.
+        request_hash (str): SHA-256 hex digest of the request's validated body, so a key reused for a
+                            different request can be refused.
+        response (str): The JSON body returned to the original request.
+        expires_at (datetime): When the key may be forgotten and reused.
+    """
+    __tablename__ = "IdempotencyKeys"
+    __table_args__ = (
+        # Backs the scheduler's purge of expired keys
+        Index("ix_IdempotencyKeys_expires_at", "expires_at"),
+    )
+
+    key = Column(String(IdempotencyConstants.MAX_KEY_LENGTH), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
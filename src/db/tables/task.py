@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, DateTime
+from sqlalchemy import Column, Integer, String, Text, Enum, DateTime, Index, text
 from sqlalchemy.ext.declarative import declarative_base
-from utils.global_constants import StatusTypes
+from utils.global_constants import StatusTypes, SchedulerConstants
 
 
 Base = declarative_base()
@@ -15,17 +15,31 @@ class Task(Base):
         description (str | None): Optional detailed description of the task.
         status (StatusTypes): The current status of the task, constrained by an Enum.
         due_date (datetime): The deadline by which the task should be completed.
+        version (int): Incremented on every write to the task. Used to build the task's ETag.
     
     Methods:
         to_dict(): Convert the model to a dictionary.
     """
     __tablename__ = "Tasks"
+    # The full-text search objects are not declared here. They are created by the migrations only
+    # (see migrations/versions/0004_task_search.py), so ORM and column selects never load them.
+    __table_args__ = (
+        # Composite indexes backing keyset pagination on (due_date, id), optionally filtered by status
+        Index("ix_Tasks_due_date_id", "due_date", "id"),
+        Index("ix_Tasks_status_due_date_id", "status", "due_date", "id"),
+        # Partial index over tasks that are not done, backing the scheduler's due date scans. It stays
+        # small, as completed tasks (usually the majority) are left out.
+        Index("ix_Tasks_open_due_date_id", "due_date", "id",
+              postgresql_where=text(SchedulerConstants.OPEN_TASK_CONDITION),
+              sqlite_where=text(SchedulerConstants.OPEN_TASK_CONDITION)),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(Enum(StatusTypes), nullable=False, default=StatusTypes.PENDING)
     due_date = Column(DateTime(timezone=True), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     def to_dict(self) -> dict:
         """
@@ -39,5 +53,7 @@ class Task(Base):
             "title": self.title,
             "description": self.description,
             "status": self.status,
-            "due_date": self.due_date
-        }
\ No newline at end of file
+            "due_date": self.due_date,
+            "version": self.version
+        }
+
@@ -0,0 +1,411 @@
+import asyncio
+import json
+import time
+from typing import Callable
+from sqlalchemy import Text, bindparam, event, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from logger import LOGGER
+from models.tasks import TaskResponseModel
+from settings import SETTINGS
+from utils.global_constants import EventConstants
+
+# SESSION.info key holding the callbacks to run when the session's transaction commits
+ON_COMMIT_KEY = "on_commit"
+
+
+def run_on_commit(SYNC_SESSION) -> None:
+    """
+    'after_commit' listener. Runs, in order, the callbacks queued by `on_commit` once the session's
+    outermost transaction has committed to the database, and empties the queue.
+
+    Args:
+        SYNC_SESSION (Session): The synchronous session behind the committed AsyncSession.
+    """
+    CALLBACKS = SYNC_SESSION.info.pop(ON_COMMIT_KEY, [])
+    for CALLBACK in CALLBACKS:
+        CALLBACK()
+
+
+def discard_on_commit(SYNC_SESSION) -> None:
+    """
+    'after_rollback' listener. Discards the callbacks queued by `on_commit` without running them, once
+    the session's transaction has been rolled back on the database. Soft rollbacks that do not reach
+    the database (e.g. of a transaction already rolled back) do not fire it, and leave nothing queued.
+
+    Args:
+        SYNC_SESSION (Session): The synchronous session behind the rolled back AsyncSession.
+    """
+    SYNC_SESSION.info.pop(ON_COMMIT_KEY, None)
+
+
+def on_commit(SESSION: AsyncSession, CALLBACK: Callable[[], None]) -> None:
+    """
+    Run a callback once the session's current transaction commits. It is discarded if the transaction rolls back.
+
+    Args:
+        SESSION (AsyncSession): The session.
+        CALLBACK (Callable[[], None]): The callback. It runs within the commit, so must not block or raise.
+    """
+    if not event.contains(SESSION.sync_session, "after_commit", run_on_commit):
+        event.listen(SESSION.sync_session, "after_commit", run_on_commit)
+        event.listen(SESSION.sync_session, "after_rollback", discard_on_commit)
+    SESSION.info.setdefault(ON_COMMIT_KEY, []).append(CALLBACK)
+
+
+class TaskEventBroker:
+    """
+    Fans task change events out to every subscriber in this worker process.
+
+    Each subscriber owns a bounded queue. A subscriber that falls too far behind has its queue
+    emptied and receives a single 'resync' event, telling it to re-fetch the task list rather
+    than letting it hold up publishers or grow without bound.
+
+    Methods:
+        subscribe(): Register a new subscriber.
+        unsubscribe(QUEUE): Remove a subscriber.
+        deliver(EVENT): Deliver an event to every subscriber in this process.
+        publish(EVENTS, SESSION): Publish events to every subscriber in every worker.
+        start(): Start receiving events from other workers.
+        stop(): Stop receiving events from other workers.
+    """
+    def __init__(self, QUEUE_SIZE: int = SETTINGS.EVENT_QUEUE_SIZE):
+        """
+        Args:
+            QUEUE_SIZE (int): The number of undelivered events buffered per subscriber.
+        """
+        self.QUEUE_SIZE = QUEUE_SIZE
+        self.SUBSCRIBERS: set[asyncio.Queue] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Register a new subscriber.
+
+        Returns:
+            asyncio.Queue: The queue the subscriber's events are delivered to.
+        """
+        QUEUE = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self.SUBSCRIBERS.add(QUEUE)
+        return QUEUE
+
+    def unsubscribe(self, QUEUE: asyncio.Queue) -> None:
+        """
+        Remove a subscriber.
+
+        Args:
+            QUEUE (asyncio.Queue): The queue returned by `subscribe`.
+        """
+        self.SUBSCRIBERS.discard(QUEUE)
+
+    def deliver(self, EVENT: dict) -> None:
+        """
+        Deliver an event to every subscriber in this process without blocking.
+
+        Args:
+            EVENT (dict): The event to deliver.
+        """
+        for QUEUE in self.SUBSCRIBERS:
+            try:
+                QUEUE.put_nowait(EVENT)
+            except asyncio.QueueFull:
+                # The subscriber is too far behind to catch up incrementally
+                while not QUEUE.empty():
+                    QUEUE.get_nowait()
+                QUEUE.put_nowait({"type": "resync"})
+
+    async def publish(self, EVENTS: list[dict], SESSION: AsyncSession | None = None) -> None:
+        """
+        Publish events to every subscriber in every worker.
+
+        Given the session of the write the events describe, the events are part of its transaction:
+        they are delivered once it commits, and never if it rolls back. A single process broker
+        delivers them directly, or as the session commits.
+
+        Args:
+            EVENTS (list[dict]): The events to publish, in order.
+            SESSION (AsyncSession | None): The session of the uncommitted write, or None to publish at once.
+        """
+        def deliver_all() -> None:
+            for EVENT in EVENTS:
+                self.deliver(EVENT)
+
+        if SESSION is None:
+            deliver_all()
+        else:
+            on_commit(SESSION, deliver_all)
+
+    async def start(self) -> None:
+        """
+        Start receiving events from other workers. A no-op for a single process broker.
+        """
+
+    async def stop(self) -> None:
+        """
+        Stop receiving events from other workers. A no-op for a single process broker.
+        """
+
+
+class PostgresTaskEventBroker(TaskEventBroker):
+    """
+    Task event broker that fans events out across worker processes with PostgreSQL LISTEN/NOTIFY.
+
+    Published events are sent with `pg_notify` and are only delivered locally when they come back
+    through the LISTEN connection, so every worker (including the publisher) delivers each event
+    exactly once.
+
+    The LISTEN connection is held for the lifetime of the broker, so it is opened outside the app's
+    connection pool. If it drops (e.g. the database restarts or fails over), it is re-established with
+    exponential backoff and subscribers are sent a 'resync' event, as they missed any events sent
+    in the meantime.
+
+    All of a write's events are sent with one statement on the write's own connection, before it
+    commits. PostgreSQL only delivers them if the transaction commits, and in order.
+    """
+    def __init__(self, ENGINE: AsyncEngine, CHANNEL: str = EventConstants.CHANNEL, QUEUE_SIZE: int = SETTINGS.EVENT_QUEUE_SIZE,
+                 CHECK_SECONDS: float = EventConstants.LISTEN_CHECK_SECONDS,
+                 RECONNECT_MIN_SECONDS: float = EventConstants.RECONNECT_MIN_SECONDS,
+                 RECONNECT_MAX_SECONDS: float = EventConstants.RECONNECT_MAX_SECONDS):
+        """
+        Args:
+            ENGINE (AsyncEngine): The asyncpg backed engine used to notify. Its URL is used to listen.
+            CHANNEL (str): The NOTIFY channel.
+            QUEUE_SIZE (int): The number of undelivered events buffered per subscriber.
+            CHECK_SECONDS (float): How often the LISTEN connection is checked.
+            RECONNECT_MIN_SECONDS (float): The first delay before re-establishing a lost LISTEN connection.
+            RECONNECT_MAX_SECONDS (float): The longest delay between attempts to re-establish it.
+        """
+        super().__init__(QUEUE_SIZE)
+        self.ENGINE = ENGINE
+        self.CHANNEL = CHANNEL
+        self.CHECK_SECONDS = CHECK_SECONDS
+        self.RECONNECT_MIN_SECONDS = RECONNECT_MIN_SECONDS
+        self.RECONNECT_MAX_SECONDS = RECONNECT_MAX_SECONDS
+        # Opens a new connection each time, which is closed (rather than returned to a pool) when released
+        self.LISTEN_ENGINE = create_async_engine(ENGINE.url, poolclass=NullPool)
+        self.LISTEN_CONNECTION: AsyncConnection | None = None
+        self.CONNECTION_LOST = asyncio.Event()
+        self.TASK: asyncio.Task | None = None
+
+    def on_notification(self, CONNECTION, PID: int, CHANNEL: str, PAYLOAD: str) -> None:
+        """
+        asyncpg notification callback. Delivers the notified event to local subscribers.
+
+        Args:
+            CONNECTION: The asyncpg connection the notification arrived on.
+            PID (int): The ID of the PostgreSQL backend that sent the notification.
+            CHANNEL (str): The notification channel.
+            PAYLOAD (str): The JSON encoded event.
+        """
+        try:
+            self.deliver(json.loads(PAYLOAD))
+        except json.JSONDecodeError as EXCEPTION:
+            LOGGER.warning(f"Discarded malformed task event: {EXCEPTION}")
+
+    # pg_notify is volatile, so it is evaluated after the sort and the events are sent in order
+    NOTIFY_STATEMENT = text(
+        "SELECT pg_notify(:channel, EVENTS.payload) FROM unnest(:payloads) WITH ORDINALITY AS EVENTS(payload, position) "
+        "ORDER BY EVENTS.position"
+    ).bindparams(bindparam("payloads", type_=ARRAY(Text)))
+
+    async def publish(self, EVENTS: list[dict], SESSION: AsyncSession | None = None) -> None:
+        if not EVENTS:
+            return
+        PARAMETERS = {"channel": self.CHANNEL,
+                      "payloads": [json.dumps(EVENT, separators=(",", ":")) for EVENT in EVENTS]}
+        if SESSION is not None:
+            await SESSION.execute(self.NOTIFY_STATEMENT, PARAMETERS)
+            return
+        async with self.ENGINE.connect() as CONNECTION:
+            await CONNECTION.execute(self.NOTIFY_STATEMENT, PARAMETERS)
+            await CONNECTION.commit()
+
+    def on_termination(self, CONNECTION) -> None:
+        """
+        asyncpg termination callback. Wakes the listener up to re-establish the LISTEN connection.
+
+        Args:
+            CONNECTION: The asyncpg connection that was closed.
+        """
+        self.CONNECTION_LOST.set()
+
+    async def connect(self) -> None:
+        """
+        Open the LISTEN connection and start listening on the channel.
+        """
+        CONNECTION = await self.LISTEN_ENGINE.connect()
+        try:
+            RAW_CONNECTION = await CONNECTION.get_raw_connection()
+            RAW_CONNECTION.driver_connection.add_termination_listener(self.on_termination)
+            await RAW_CONNECTION.driver_connection.add_listener(self.CHANNEL, self.on_notification)
+        except BaseException:
+            await self.disconnect(CONNECTION)
+            raise
+        self.CONNECTION_LOST.clear()
+        self.LISTEN_CONNECTION = CONNECTION
+
+    async def disconnect(self, CONNECTION: AsyncConnection) -> None:
+        """
+        Discard a LISTEN connection, which may already have been closed by the database.
+
+        Args:
+            CONNECTION (AsyncConnection): The connection.
+        """
+        try:
+            await CONNECTION.invalidate()
+            await CONNECTION.close()
+        except Exception as EXCEPTION:
+            # The connection is gone either way
+            LOGGER.debug(f"Failed to close the task event LISTEN connection: {EXCEPTION}")
+
+    async def wait_until_lost(self) -> str:
+        """
+        Wait for the LISTEN connection to drop, checking it every CHECK_SECONDS in case a drop closed no socket.
+
+        Returns:
+            str: Why the connection is considered lost.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self.CONNECTION_LOST.wait(), self.CHECK_SECONDS)
+                return "the connection was closed"
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(self.check(), self.CHECK_SECONDS)
+            except Exception as EXCEPTION:
+                return f"the connection check failed: {EXCEPTION!r}"
+
+    async def check(self) -> None:
+        """
+        Run a trivial query on the LISTEN connection, raising if it is no longer usable.
+        """
+        await self.LISTEN_CONNECTION.execute(text("SELECT 1"))
+        await self.LISTEN_CONNECTION.commit()
+
+    async def listen(self) -> None:
+        """
+        Keep the LISTEN connection open, re-establishing it with exponential backoff whenever it drops.
+        """
+        while True:
+            REASON = await self.wait_until_lost()
+            LOGGER.warning(f"Task event LISTEN connection lost ({REASON}). Events from other workers are not delivered until it is re-established.")
+            await self.disconnect(self.LISTEN_CONNECTION)
+            self.LISTEN_CONNECTION = None
+            LOST_AT = time.monotonic()
+
+            DELAY = self.RECONNECT_MIN_SECONDS
+            while True:
+                try:
+                    await self.connect()
+                    break
+                except Exception as EXCEPTION:
+                    LOGGER.warning(f"Failed to re-establish the task event LISTEN connection, retrying in {DELAY:g}s: {EXCEPTION}")
+                await asyncio.sleep(DELAY)
+                DELAY = min(DELAY * 2, self.RECONNECT_MAX_SECONDS)
+
+            LOGGER.info(f"Task event LISTEN connection re-established after {time.monotonic() - LOST_AT:.1f}s")
+            # Subscribers missed any events sent while the connection was down
+            self.deliver({"type": "resync"})
+
+    async def start(self) -> None:
+        await self.connect()
+        self.TASK = asyncio.create_task(self.listen(), name="task-event-listener")
+
+    async def stop(self) -> None:
+        if self.TASK is not None:
+            self.TASK.cancel()
+            try:
+                await self.TASK
+            except asyncio.CancelledError:
+                pass
+            self.TASK = None
+
+        if self.LISTEN_CONNECTION is not None:
+            try:
+                RAW_CONNECTION = await self.LISTEN_CONNECTION.get_raw_connection()
+                await RAW_CONNECTION.driver_connection.remove_listener(self.CHANNEL, self.on_notification)
+            except Exception as EXCEPTION:
+                LOGGER.warning(f"Failed to stop listening for task events: {EXCEPTION}")
+            await self.disconnect(self.LISTEN_CONNECTION)
+            self.LISTEN_CONNECTION = None
+        await self.LISTEN_ENGINE.dispose()
+
+
+def task_event(TYPE: str, TASK: TaskResponseModel) -> dict:
+    """
+    Build a 'created' or 'updated' event carrying the task.
+
+    Events that would exceed the NOTIFY payload limit are sent without the task body, and
+    subscribers re-fetch the task by its ID instead.
+
+    Args:
+        TYPE (str): The event type.
+        TASK (TaskResponseModel): The created or updated task.
+
+    Returns:
+        dict: The event.
+    """
+    EVENT = {"type": TYPE, "id": TASK.id, "task": TASK.model_dump(mode="json")}
+    if len(json.dumps(EVENT)) > EventConstants.MAX_PAYLOAD_BYTES:
+        del EVENT["task"]
+    return EVENT
+
+
+# The broker used by the CRUD layer. Replaced at startup by `configure_task_event_broker`.
+TASK_EVENT_BROKER: TaskEventBroker = TaskEventBroker()
+
+
+def configure_task_event_broker(BROKER: TaskEventBroker) -> None:
+    """
+    Replace the broker used by the CRUD layer.
+
+    Args:
+        BROKER (TaskEventBroker): The broker to use.
+    """
+    global TASK_EVENT_BROKER
+    TASK_EVENT_BROKER = BROKER
+
+
+def get_task_event_broker() -> TaskEventBroker:
+    """
+    Retrieve the broker used by the CRUD layer.
+
+    Returns:
+        TaskEventBroker: The configured broker.
+    """
+    return TASK_EVENT_BROKER
+
+
+async def publish_task_events(TYPE: str, TASKS: list[TaskResponseModel] | None = None, IDS: list[int] | None = None,
+                              SESSION: AsyncSession | None = None) -> None:
+    """
+    Publish the change events for a write to one or more tasks.
+
+    Writes touching more than `SETTINGS.EVENT_MAX_BULK_EVENTS` tasks publish a single 'resync' event.
+
+    Writes pass their session before committing, so the events are published with the write, in the
+    same transaction, and a failure to publish fails the write. Without a session, the events are
+    published at once, and failures are logged rather than raised.
+
+    Args:
+        TYPE (str): 'created', 'updated' or 'deleted'.
+        TASKS (list[TaskResponseModel] | None): The created or updated tasks.
+        IDS (list[int] | None): The IDs of the deleted tasks.
+        SESSION (AsyncSession | None): The session of the uncommitted write.
+    """
+    if len(TASKS if TASKS is not None else IDS) > SETTINGS.EVENT_MAX_BULK_EVENTS:
+        EVENTS = [{"type": "resync"}]
+    elif TASKS is not None:
+        EVENTS = [task_event(TYPE, TASK) for TASK in TASKS]
+    else:
+        EVENTS = [{"type": TYPE, "id": ID} for ID in IDS]
+
+    if SESSION is not None:
+        await get_task_event_broker().publish(EVENTS, SESSION)
+        return
+
+    try:
+        await get_task_event_broker().publish(EVENTS)
+    except Exception as EXCEPTION:
+        LOGGER.warning(f"Failed to publish task events: {EXCEPTION}")
@@ -1,24 +1,118 @@
+import atexit
+import copy
+import json
 import logging
-import inspect
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from settings import SETTINGS
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each log record as a single line of JSON.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        ENTRY = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName
+        }
+        if record.exc_info:
+            ENTRY["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            ENTRY["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(ENTRY, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves all formatting to the listener thread.
+
+    The standard QueueHandler formats the record, including any traceback, in the thread that
+    logged it. This handler only merges the message arguments, which is cheap, and keeps the
+    exception info so the traceback is rendered by the listener's handlers instead.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        RECORD = copy.copy(record)
+        RECORD.msg = record.getMessage()
+        RECORD.args = None
+        return RECORD
+
+
+def create_formatter() -> logging.Formatter:
+    """
+    Create the formatter selected by the LOG_FORMAT setting.
+
+    Returns:
+        logging.Formatter: A JSON formatter, or a plain text one.
+    """
+    if SETTINGS.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
 
 # Set up the base logger
 LOGGER = logging.getLogger(__name__)
-LOGGER.setLevel(logging.INFO)
+LOGGER.setLevel(SETTINGS.LOG_LEVEL)
 
 # Create a formatter
-FORMATTER = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+FORMATTER = create_formatter()
 
 # Create a console handler (for printing to terminal)
 CONSOLE_HANDLER = logging.StreamHandler()
 CONSOLE_HANDLER.setFormatter(FORMATTER)
 
-# Create a file handler (for writing to a file)
-FILE_HANDLER = logging.FileHandler('app.log')  # <-- 'app.log' is the file name
+# Create a file handler (for writing to a file), rotated once it reaches LOG_MAX_BYTES
+FILE_HANDLER = RotatingFileHandler(SETTINGS.LOG_FILE, maxBytes=SETTINGS.LOG_MAX_BYTES,
+                                   backupCount=SETTINGS.LOG_BACKUP_COUNT, encoding="utf-8", delay=True)
 FILE_HANDLER.setFormatter(FORMATTER)
 
-# Add handlers to the logger
-LOGGER.addHandler(CONSOLE_HANDLER)
-LOGGER.addHandler(FILE_HANDLER)
+# Logging calls only put the record on this queue. The listener's thread formats the records and
+# does the console and file I/O, so logging never blocks the event loop.
+LOG_QUEUE = queue.SimpleQueue()
+QUEUE_HANDLER = DeferredQueueHandler(LOG_QUEUE)
+HANDLERS = (CONSOLE_HANDLER, FILE_HANDLER)
+LISTENER = QueueListener(LOG_QUEUE, *HANDLERS, respect_handler_level=True)
+
+# Add the queue handler to the logger
+LOGGER.addHandler(QUEUE_HANDLER)
+
+def stop_listener() -> None:
+    """
+    Stop the current listener, writing out any records still on the queue.
+    """
+    LISTENER.stop()
+
+# Start the listener, and drain the queue when the process exits
+LISTENER.start()
+atexit.register(stop_listener)
+
+def restart_listener() -> None:
+    """
+    Start a new log queue and listener in a forked worker process.
+
+    Threads do not survive fork(), so without this a worker forked from a process that has already
+    imported this module (see server.py) would queue its records without ever writing them. The
+    inherited listener is replaced rather than restarted, so anything importing LISTENER after the
+    fork gets the child's own.
+    """
+    global LOG_QUEUE, LISTENER
+    LOG_QUEUE = queue.SimpleQueue()
+    QUEUE_HANDLER.queue = LOG_QUEUE
+    LISTENER = QueueListener(LOG_QUEUE, *HANDLERS, respect_handler_level=True)
+    LISTENER.start()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=restart_listener)
 
 def log_internal_server_error(EXCEPTION):
     """
@@ -27,4 +121,7 @@ def log_internal_server_error(EXCEPTION):
     Parameters:
         EXCEPTION (Exception): The exception to log.
     """
-    LOGGER.exception(f'An Internal Server Error was thrown as a result of an exception in "{inspect.stack()[1].function}": {EXCEPTION}')
+    # sys._getframe reads the caller's frame directly, without building the whole stack like inspect.stack()
+    CALLER = sys._getframe(1).f_code.co_name
+    LOGGER.exception(f'An Internal Server Error was thrown as a result of an exception in "{CALLER}": {EXCEPTION}',
+                     exc_info=EXCEPTION, stacklevel=2)
@@ -1,17 +1,30 @@
-from dotenv import load_dotenv, find_dotenv
-import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 
-from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware
 from http import HTTPStatus
+from pathlib import Path
 from logger import log_internal_server_error
 from routers import tasks
 from db.tables.task import Base
+from db.engine import create_database_engine, parse_echo
+from db.schema_version import check_schema_version
+from db.pool_metrics import PoolMetrics
+from cache.task_cache import configure_task_cache, create_task_cache
+from events.task_events import TaskEventBroker, PostgresTaskEventBroker, configure_task_event_broker
+from db.crud.status_batcher import StatusUpdateBatcher, configure_status_update_batcher
+from scheduler.task_scheduler import TaskScheduler, DueDateScanner, IdempotencyKeyPurger
+from middleware.rate_limit import RateLimitMiddleware, configure_rate_limiter, create_rate_limiter
+from metrics.prometheus import PrometheusMiddleware, build_registry, instrument_engine, mark_worker_dead
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from settings import SETTINGS
+from utils.global_constants import IdempotencyConstants
+from utils.static_assets import StaticAssets, render_index
+from utils.json_response import show_error
 
 
 @asynccontextmanager
@@ -27,55 +40,117 @@ async def lifespan(app: FastAPI):
         None: Executes the application lifecycle and ensures cleanup at the end.
     
     Notes:
-        - The method loads environment variables from a .env file.
+        - Configuration is read from SETTINGS, which is loaded and validated once at import.
+        - The schema is owned by the migrations in 'migrations/'. Startup fails if the database has not
+          been migrated to the latest revision, unless relaxed by the SCHEMA_VERSION_CHECK setting.
         - The PostgreSQL engine and session are created and disposed of within this context.
+        - The connection pool is sized and tuned by the DB_* settings. With several uvicorn workers,
+          each worker opens up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections, which must fit within
+          PostgreSQL's max_connections.
+        - The task cache backend is selected by the TASK_CACHE_BACKEND setting, and the rate limiter's
+          by RATE_LIMIT_BACKEND.
+        - Task change events are fanned out between workers with PostgreSQL LISTEN/NOTIFY.
+        - When DATABASE_READ_URL is set, read-only endpoints are served by that replica (with its own
+          pool, sized like the primary's), except for clients that wrote within READ_YOUR_WRITES_SECONDS.
+        - One worker, elected with a PostgreSQL advisory lock, runs the background jobs every
+          SCHEDULER_INTERVAL_SECONDS, publishing 'overdue' and 'due_soon' events as tasks reach them
+          and purging expired idempotency keys.
+        - When STATUS_BATCH_ENABLED is set, status updates are written in batches by a background
+          flusher, which writes any queued updates before the engine is disposed of.
     """
-    # Load environment variables
-    load_dotenv(find_dotenv())
+    # Everything started below is stopped in reverse order when the app shuts down (or fails to start).
+    # A step that fails is raised once the others have run, so it cannot skip them.
+    async with AsyncExitStack() as SHUTDOWN:
+        SHUTDOWN.callback(mark_worker_dead)
 
-    POSTGRES_URI_PREFIX = os.getenv("POSTGRES_URI_PREFIX")
-    POSTGRES_USER = os.getenv("POSTGRES_USER")
-    POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
-    POSTGRES_HOST = os.getenv("POSTGRES_HOST")
-    POSTGRES_PORT = os.getenv("POSTGRES_CONTAINER_PORT")
-    POSTGRES_DB = os.getenv("POSTGRES_DB")
+        # Create async SQLAlchemy engine with an instrumented connection pool
+        POOL_METRICS = PoolMetrics()
+        POSTGRES_ENGINE = create_engine_from_settings(SETTINGS.get_database_url(), POOL_METRICS)
+        SHUTDOWN.push_async_callback(POSTGRES_ENGINE.dispose)
 
-    # Create async SQLAlchemy engine
-    POSTGRES_ENGINE = create_async_engine(f"{POSTGRES_URI_PREFIX}{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}", echo=True)
+        # Refuse to serve requests against a schema the migrations have not brought up to date
+        await check_schema_version(POSTGRES_ENGINE, SETTINGS.SCHEMA_VERSION_CHECK)
 
-    # Create session maker for asynchronous database access
-    AsyncSessionLocal = sessionmaker(
-        bind=POSTGRES_ENGINE, class_=AsyncSession, expire_on_commit=False
-    )
+        # Create session maker for asynchronous database access
+        AsyncSessionLocal = sessionmaker(
+            bind=POSTGRES_ENGINE, class_=AsyncSession, expire_on_commit=False
+        )
+
+        # Store engine and session in FastAPI app state for access throughout the app
+        app.state.POSTGRES_ENGINE = POSTGRES_ENGINE
+        app.state.ASYNC_SESSION = AsyncSessionLocal
+        app.state.POOL_METRICS = POOL_METRICS
+
+        # Create the read replica's engine and session maker, used by read-only endpoints
+        app.state.ASYNC_READ_SESSION = None
+        if SETTINGS.DATABASE_READ_URL:
+            app.state.REPLICA_POOL_METRICS = PoolMetrics()
+            REPLICA_ENGINE = create_engine_from_settings(SETTINGS.DATABASE_READ_URL, app.state.REPLICA_POOL_METRICS)
+            SHUTDOWN.push_async_callback(REPLICA_ENGINE.dispose)
+            app.state.REPLICA_ENGINE = REPLICA_ENGINE
+            app.state.ASYNC_READ_SESSION = sessionmaker(
+                bind=REPLICA_ENGINE, class_=AsyncSession, expire_on_commit=False, info={"replica": True}
+            )
+
+        # Create the read-through cache used by the CRUD layer
+        TASK_CACHE = create_task_cache(SETTINGS.TASK_CACHE_BACKEND, SETTINGS.REDIS_URL)
+        configure_task_cache(TASK_CACHE)
+        SHUTDOWN.push_async_callback(TASK_CACHE.close)
+
+        # Create the rate limiter used by RateLimitMiddleware
+        RATE_LIMITER = create_rate_limiter(SETTINGS.RATE_LIMIT_BACKEND, SETTINGS.REDIS_URL)
+        configure_rate_limiter(RATE_LIMITER)
+        SHUTDOWN.push_async_callback(RATE_LIMITER.close)
 
-    # Store engine and session in FastAPI app state for access throughout the app
-    app.state.POSTGRES_ENGINE = POSTGRES_ENGINE
-    app.state.ASYNC_SESSION = AsyncSessionLocal
+        # Create the broker that fans task change events out to subscribers in every worker
+        EVENT_BROKER = PostgresTaskEventBroker(POSTGRES_ENGINE) if POSTGRES_ENGINE.dialect.name == "postgresql" else TaskEventBroker()
+        await EVENT_BROKER.start()
+        SHUTDOWN.push_async_callback(EVENT_BROKER.stop)
+        configure_task_event_broker(EVENT_BROKER)
 
-    # Yield control back to FastAPI for processing requests
-    yield
- 
-    # Dispose of engine and close connections when the app shuts down
-    await POSTGRES_ENGINE.dispose()
+        # Start batching status updates, if enabled. Queued updates are written before the engine is disposed of.
+        if SETTINGS.STATUS_BATCH_ENABLED:
+            STATUS_BATCHER = StatusUpdateBatcher(AsyncSessionLocal)
+            STATUS_BATCHER.start()
+            SHUTDOWN.push_async_callback(STATUS_BATCHER.stop)
+            configure_status_update_batcher(STATUS_BATCHER)
+            SHUTDOWN.callback(configure_status_update_batcher, None)
 
+        # Start the background jobs, which only run in the worker holding the scheduler's lock
+        if SETTINGS.SCHEDULER_ENABLED:
+            SCHEDULER = TaskScheduler(POSTGRES_ENGINE, [DueDateScanner(AsyncSessionLocal), IdempotencyKeyPurger(AsyncSessionLocal)])
+            SCHEDULER.start()
+            SHUTDOWN.push_async_callback(SCHEDULER.stop)
 
-def show_error(STATUS_CODE: int, DESCRIPTION: str, DETAIL: str) -> JSONResponse:
+        # Yield control back to FastAPI for processing requests
+        yield
+
+
+def create_engine_from_settings(URL: str, POOL_METRICS: PoolMetrics) -> AsyncEngine:
     """
-    Generates a standardised error response for HTTP exceptions.
+    Create an instrumented database engine whose connection pool is tuned by the DB_* settings.
 
     Args:
-        STATUS_CODE (int): The HTTP status code.
-        DESCRIPTION (str): A brief description of the error.
-        DETAIL (str): Detailed information about the error.
+        URL (str): The database URL.
+        POOL_METRICS (PoolMetrics): Metrics the pool records checkouts, checkins and wait times into.
 
     Returns:
-        JSONResponse: A formatted error response to be returned by FastAPI.
+        AsyncEngine: The engine.
     """
-    return JSONResponse(status_code=STATUS_CODE, content={
-        "status_code": STATUS_CODE,
-        "description": DESCRIPTION,
-        "detail": DETAIL
-    })
+    ENGINE = create_database_engine(
+        URL,
+        POOL_METRICS,
+        POOL_SIZE=SETTINGS.DB_POOL_SIZE,
+        MAX_OVERFLOW=SETTINGS.DB_MAX_OVERFLOW,
+        POOL_TIMEOUT=SETTINGS.DB_POOL_TIMEOUT,
+        POOL_RECYCLE=SETTINGS.DB_POOL_RECYCLE,
+        POOL_PRE_PING=SETTINGS.DB_POOL_PRE_PING,
+        STATEMENT_CACHE_SIZE=SETTINGS.DB_STATEMENT_CACHE_SIZE,
+        ECHO=parse_echo(SETTINGS.DB_ECHO)
+    )
+    instrument_engine(ENGINE)
+    return ENGINE
+
 
 # Initialise the FastAPI application
 app = FastAPI(title="HMCTS Task Manager Backend", lifespan=lifespan)
@@ -83,17 +158,31 @@ app = FastAPI(title="HMCTS Task Manager Backend", lifespan=lifespan)
 # Include the task router from the 'routers' module
 app.include_router(tasks.router)
 
-# Serve static files from the "static" directory
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Serve static files from the "static" directory under fingerprinted URLs, and keep the frontend's
+# index page in memory with its links rewritten to those URLs
+STATIC_ASSETS = StaticAssets("static")
+INDEX_PAGE = render_index(STATIC_ASSETS, Path("static/index.html"))
+app.mount("/static", STATIC_ASSETS, name="static")
+
+# Refuse requests from clients over their rate limit, and new requests while the worker is overloaded,
+# before they reach the app (and the database). Added before CORS, so refusals carry CORS headers too.
+app.add_middleware(RateLimitMiddleware)
 
 # Add CORS middleware to allow cross-origin requests from the frontend
 app.add_middleware(CORSMiddleware, 
     allow_origins=["http://localhost:3000"], 
     allow_credentials=True, 
     allow_methods=["*"], 
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", IdempotencyConstants.REPLAYED_HEADER]
 )
 
+# Compress large responses, such as pages of tasks and exports, for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=SETTINGS.GZIP_MINIMUM_SIZE, compresslevel=SETTINGS.GZIP_COMPRESS_LEVEL)
+
+# Record request counts, latencies and in-flight requests for the /metrics endpoint
+app.add_middleware(PrometheusMiddleware)
+
 @app.exception_handler(HTTPException)
 def http_exception_handler(REQUEST: Request, EXCEPTION: HTTPException) -> JSONResponse:
     """
@@ -106,7 +195,7 @@ def http_exception_handler(REQUEST: Request, EXCEPTION: HTTPException) -> JSONRe
     Returns:
         JSONResponse: A formatted JSON response containing the status code, description, and detail of the exception.
     """
-    return show_error(EXCEPTION.status_code, HTTPStatus(EXCEPTION.status_code).phrase, EXCEPTION.detail)
+    return show_error(EXCEPTION.status_code, HTTPStatus(EXCEPTION.status_code).phrase, EXCEPTION.detail, EXCEPTION.headers)
 
 @app.exception_handler(404)
 def http_404_handler(REQUEST: Request, EXCEPTION) -> JSONResponse:
@@ -140,14 +229,55 @@ def general_exception_handler(REQUEST: Request, EXCEPTION: Exception):
 @app.get("/", 
          summary="Root endpoint. Retrieve's the app's frontend.", 
          description="Root endpoint. Retrieve's the app's frontend.",
+         response_class=HTMLResponse
 )
-def read_root(response_class=HTMLResponse) -> dict:
+def read_root(REQUEST: Request) -> Response:
     """
     Root endpoint to serve up the frontend application web page.
 
+    The page is loaded and compressed once at startup, so requests never touch the disk.
+
+    Args:
+        REQUEST (Request): The incoming request object.
+
+    Returns:
+        Response: The frontend application web page, or an empty 304 (Not Modified) response if
+                  the client's copy is current.
+    """
+    return INDEX_PAGE.response(REQUEST)
+
+
+@app.get("/metrics/pool",
+         summary="Connection pool metrics.",
+         description="Retrieve the database connection pool's current state and checkout, overflow and wait time counters for this worker.",
+)
+def read_pool_metrics(REQUEST: Request) -> dict:
+    """
+    Endpoint to retrieve this worker's database connection pool metrics.
+
+    Args:
+        REQUEST (Request): The incoming request object.
+
+    Returns:
+        dict: The pool's size, checked out and overflow connections, and checkout counters.
+    """
+    return REQUEST.app.state.POOL_METRICS.snapshot(REQUEST.app.state.POSTGRES_ENGINE.pool)
+
+
+@app.get("/metrics",
+         summary="Prometheus metrics.",
+         description="Retrieve request, database query, connection pool and task cache metrics in the Prometheus text exposition format.",
+         response_class=Response,
+)
+def read_metrics(REQUEST: Request) -> Response:
+    """
+    Endpoint to retrieve the application's metrics for Prometheus to scrape.
+
+    Args:
+        REQUEST (Request): The incoming request object.
+
     Returns:
-        HTMLResponse: The frontend application web page.
+        Response: The metrics in the Prometheus text exposition format. Request and query metrics are
+                  aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set.
     """
-    with open("static/index.html") as f:
-        content = f.read()
-    return HTMLResponse(content=content)
\ No newline at end of file
+    return Response(generate_latest(build_registry(REQUEST.app)), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,253 @@
+import functools
+import inspect
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from cache.task_cache import get_task_cache
+from cache.single_flight import TASK_READS, PAGE_READS
+
+# prometheus_client reads this variable itself when the metrics below are created. When it is set
+# (it must be an empty directory shared by every worker), each worker writes its samples to
+# memory-mapped files there and a scrape of any worker aggregates them.
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Requests that match no route share one label value so unknown paths cannot grow the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Routes whose responses stay open for as long as the client is connected. Their requests are counted,
+# but kept out of the latency histogram and in-flight gauge, which they would otherwise dominate.
+STREAMING_ROUTES = frozenset({"/tasks/events"})
+
+HTTP_REQUESTS = Counter(
+    "hmcts_http_requests_total", "HTTP requests handled, by method, route template and status code.",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "hmcts_http_request_duration_seconds", "Time taken to handle HTTP requests, by method and route template.",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "hmcts_http_requests_in_progress", "HTTP requests currently being handled, by method.",
+    ["method"], multiprocess_mode="livesum"
+)
+HTTP_STREAMS_OPEN = Gauge(
+    "hmcts_http_streams_open", "Streaming responses (e.g. the task event stream) currently open, by route template.",
+    ["route"], multiprocess_mode="livesum"
+)
+DB_QUERY_DURATION = Histogram(
+    "hmcts_db_query_duration_seconds", "Time taken to execute SQL statements, by the CRUD function that issued them.",
+    ["function"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+# The CRUD function currently running in this task, used to label the statements it executes
+CURRENT_FUNCTION: ContextVar[str] = ContextVar("CURRENT_FUNCTION", default="other")
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware recording request counts, latencies and in-flight requests.
+
+    Requests are labelled with the template of the route that handled them (e.g. '/tasks/{ID}/')
+    rather than the raw path, which FastAPI leaves in `scope["route"]` once routing has happened.
+
+    Requests to STREAMING_ROUTES are counted, and tracked by the open streams gauge instead of the
+    latency histogram and in-flight gauge.
+    """
+    def __init__(self, APP: ASGIApp):
+        self.APP = APP
+
+    async def __call__(self, SCOPE: Scope, RECEIVE: Receive, SEND: Send) -> None:
+        if SCOPE["type"] != "http":
+            await self.APP(SCOPE, RECEIVE, SEND)
+            return
+
+        METHOD = SCOPE["method"]
+        STATUS_CODE = 500
+
+        async def send_wrapper(MESSAGE: Message) -> None:
+            nonlocal STATUS_CODE
+            if MESSAGE["type"] == "http.response.start":
+                STATUS_CODE = MESSAGE["status"]
+            await SEND(MESSAGE)
+
+        # Streaming routes have no path parameters, so the path is their template
+        STREAMING = SCOPE["path"] in STREAMING_ROUTES
+        IN_PROGRESS = HTTP_STREAMS_OPEN.labels(SCOPE["path"]) if STREAMING else HTTP_REQUESTS_IN_PROGRESS.labels(METHOD)
+        IN_PROGRESS.inc()
+        START = time.perf_counter()
+        try:
+            await self.APP(SCOPE, RECEIVE, send_wrapper)
+        finally:
+            DURATION = time.perf_counter() - START
+            IN_PROGRESS.dec()
+            ROUTE = SCOPE.get("route")
+            ROUTE_TEMPLATE = getattr(ROUTE, "path", UNMATCHED_ROUTE)
+            HTTP_REQUESTS.labels(METHOD, ROUTE_TEMPLATE, str(STATUS_CODE)).inc()
+            if not STREAMING:
+                HTTP_REQUEST_DURATION.labels(METHOD, ROUTE_TEMPLATE).observe(DURATION)
+
+
+def timed_crud(FUNCTION: Callable) -> Callable:
+    """
+    Decorator labelling the SQL statements issued by a CRUD function with the function's name.
+
+    Works with coroutine functions and async generator functions.
+
+    Args:
+        FUNCTION (Callable): The CRUD function to label.
+
+    Returns:
+        Callable: The wrapped function.
+    """
+    NAME = FUNCTION.__name__
+
+    if inspect.isasyncgenfunction(FUNCTION):
+        @functools.wraps(FUNCTION)
+        async def generator_wrapper(*args, **kwargs):
+            # Label only the steps of the generator, not the caller's code between them
+            GENERATOR = FUNCTION(*args, **kwargs)
+            try:
+                while True:
+                    TOKEN = CURRENT_FUNCTION.set(NAME)
+                    try:
+                        ITEM = await GENERATOR.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        CURRENT_FUNCTION.reset(TOKEN)
+                    yield ITEM
+            finally:
+                await GENERATOR.aclose()
+        return generator_wrapper
+
+    @functools.wraps(FUNCTION)
+    async def wrapper(*args, **kwargs):
+        TOKEN = CURRENT_FUNCTION.set(NAME)
+        try:
+            return await FUNCTION(*args, **kwargs)
+        finally:
+            CURRENT_FUNCTION.reset(TOKEN)
+    return wrapper
+
+
+def record_query_start(CONNECTION, CURSOR, STATEMENT, PARAMETERS, CONTEXT, EXECUTEMANY) -> None:
+    """
+    'before_cursor_execute' listener. Records when a statement starts on its execution context.
+
+    The start time lives and dies with the statement's context, so statements that raise (and
+    never reach 'after_cursor_execute') leave nothing behind on the connection.
+
+    Args:
+        CONNECTION (Connection): The connection executing the statement.
+        CURSOR: The DBAPI cursor.
+        STATEMENT (str): The SQL statement.
+        PARAMETERS: The statement's parameters.
+        CONTEXT (ExecutionContext | None): The statement's execution context. None for statements run
+                                           outside of one, which are not timed.
+        EXECUTEMANY (bool): Whether the statement is run with executemany().
+    """
+    if CONTEXT is not None:
+        CONTEXT._query_start = time.perf_counter()
+
+
+def record_query_duration(CONNECTION, CURSOR, STATEMENT, PARAMETERS, CONTEXT, EXECUTEMANY) -> None:
+    """
+    'after_cursor_execute' listener. Observes a successful statement's duration, labelled with the
+    CRUD function that issued it.
+
+    Args:
+        CONNECTION (Connection): The connection that executed the statement.
+        CURSOR: The DBAPI cursor.
+        STATEMENT (str): The SQL statement.
+        PARAMETERS: The statement's parameters.
+        CONTEXT (ExecutionContext | None): The statement's execution context.
+        EXECUTEMANY (bool): Whether the statement was run with executemany().
+    """
+    START = getattr(CONTEXT, "_query_start", None)
+    if START is not None:
+        DB_QUERY_DURATION.labels(CURRENT_FUNCTION.get()).observe(time.perf_counter() - START)
+
+
+def instrument_engine(ENGINE: AsyncEngine) -> None:
+    """
+    Time every SQL statement executed through 'ENGINE' into the DB query duration histogram.
+
+    Args:
+        ENGINE (AsyncEngine): The engine to instrument.
+    """
+    event.listen(ENGINE.sync_engine, "before_cursor_execute", record_query_start)
+    event.listen(ENGINE.sync_engine, "after_cursor_execute", record_query_duration)
+
+
+class AppStateCollector:
+    """
+    Collector reporting the connection pool, task cache and read coalescing counters of the worker being scraped.
+
+    These are read from the existing counters when scraped, so they cost nothing per request. In
+    multiprocess mode they describe only the worker serving the scrape and carry a 'pid' label.
+    """
+    def __init__(self, APP):
+        self.APP = APP
+
+    def collect(self):
+        LABELS = {"pid": str(os.getpid())} if MULTIPROCESS_DIR else {}
+        STATE = self.APP.state
+
+        if hasattr(STATE, "POOL_METRICS"):
+            POOL = STATE.POOL_METRICS.snapshot(STATE.POSTGRES_ENGINE.pool)
+            for NAME in ("size", "checked_out", "overflow", "overflow_max"):
+                GAUGE = GaugeMetricFamily(f"hmcts_db_pool_{NAME}", f"Connection pool {NAME.replace('_', ' ')}.", labels=LABELS)
+                GAUGE.add_metric(list(LABELS.values()), POOL[NAME])
+                yield GAUGE
+            for NAME in ("checkouts", "checkins", "timeouts", "wait_seconds"):
+                COUNTER = CounterMetricFamily(f"hmcts_db_pool_{NAME}", f"Connection pool {NAME.replace('_', ' ')}.", labels=LABELS)
+                COUNTER.add_metric(list(LABELS.values()), POOL["wait_seconds_total" if NAME == "wait_seconds" else NAME])
+                yield COUNTER
+
+        STATS = get_task_cache().stats()
+        for NAME in ("hits", "misses"):
+            COUNTER = CounterMetricFamily(f"hmcts_task_cache_{NAME}", f"Task cache {NAME}.", labels=LABELS)
+            COUNTER.add_metric(list(LABELS.values()), STATS[NAME])
+            yield COUNTER
+
+        for NAME, DESCRIPTION in (("led", "Reads run against the database"), ("shared", "Reads served by an identical concurrent read")):
+            COUNTER = CounterMetricFamily(f"hmcts_single_flight_{NAME}", f"{DESCRIPTION}.", labels=[*LABELS, "read"])
+            for READ, FLIGHTS in (("task", TASK_READS), ("page", PAGE_READS)):
+                COUNTER.add_metric([*LABELS.values(), READ], FLIGHTS.stats()[NAME])
+            yield COUNTER
+
+
+def build_registry(APP) -> CollectorRegistry:
+    """
+    Build the registry to expose for a scrape.
+
+    Args:
+        APP: The application whose pool and cache counters should be included.
+
+    Returns:
+        CollectorRegistry: A registry holding the request and query metrics (aggregated across
+                           workers in multiprocess mode) and this worker's pool and cache counters.
+    """
+    REGISTRY_FOR_SCRAPE = CollectorRegistry()
+    if MULTIPROCESS_DIR:
+        multiprocess.MultiProcessCollector(REGISTRY_FOR_SCRAPE)
+    else:
+        REGISTRY_FOR_SCRAPE.register(REGISTRY)
+    REGISTRY_FOR_SCRAPE.register(AppStateCollector(APP))
+    return REGISTRY_FOR_SCRAPE
+
+
+def mark_worker_dead() -> None:
+    """
+    Discard this worker's live gauge samples when it exits. Does nothing outside multiprocess mode.
+    """
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
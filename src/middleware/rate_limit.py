@@ -0,0 +1,272 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Callable
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from logger import LOGGER
+from metrics.prometheus import UNMATCHED_ROUTE
+from settings import SETTINGS
+from utils.global_constants import RateLimitConstants
+from utils.json_response import show_error
+
+
+class RateLimiter(ABC):
+    """
+    Base class for token bucket rate limiters, keyed by client and route.
+
+    Each key has a bucket holding up to 'BURST' tokens, refilled at 'RATE' tokens per second. Every
+    request takes a token, and requests finding the bucket empty are refused.
+
+    Methods:
+        acquire(KEY, RATE, BURST): Take a token from a bucket.
+        close(): Release any resources held by the limiter.
+    """
+    @abstractmethod
+    async def acquire(self, KEY: str, RATE: float, BURST: int) -> float:
+        """
+        Take a token from a bucket.
+
+        Args:
+            KEY (str): Identifies the bucket.
+            RATE (float): The tokens added to the bucket per second.
+            BURST (int): The bucket's capacity.
+
+        Returns:
+            float: 0.0 if a token was taken, otherwise the seconds until one will be available.
+        """
+
+    async def close(self) -> None:
+        """
+        Release any resources held by the limiter.
+        """
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """
+    Token bucket rate limiter held in this worker process.
+
+    Each worker limits independently, so with several workers a client may make up to one bucket's
+    worth of requests per worker. At most 'MAX_KEYS' buckets are held; the least recently used
+    bucket is dropped first, which only ever lets its client through sooner.
+    """
+    def __init__(self, MAX_KEYS: int = SETTINGS.RATE_LIMIT_MAX_KEYS, CLOCK: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            MAX_KEYS (int): The maximum number of buckets held.
+            CLOCK (Callable[[], float]): Monotonic clock used to refill buckets.
+        """
+        self.MAX_KEYS = MAX_KEYS
+        self.CLOCK = CLOCK
+        self.BUCKETS: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.BUCKETS)
+
+    async def acquire(self, KEY: str, RATE: float, BURST: int) -> float:
+        NOW = self.CLOCK()
+        TOKENS, UPDATED_AT = self.BUCKETS.get(KEY, (BURST, NOW))
+        TOKENS = min(BURST, TOKENS + (NOW - UPDATED_AT) * RATE)
+
+        RETRY_AFTER = 0.0
+        if TOKENS >= 1:
+            TOKENS -= 1
+        else:
+            RETRY_AFTER = (1 - TOKENS) / RATE
+
+        self.BUCKETS[KEY] = (TOKENS, NOW)
+        self.BUCKETS.move_to_end(KEY)
+        while len(self.BUCKETS) > self.MAX_KEYS:
+            self.BUCKETS.popitem(last=False)
+        return RETRY_AFTER
+
+
+class SharedStoreRateLimiter(RateLimiter):
+    """
+    Rate limiter shared between workers (and instances) through a Redis-compatible store.
+
+    The token bucket is approximated with one counter per fixed window of BURST / RATE seconds, so
+    each request costs a single atomic INCR (plus an EXPIRE for the window's first request). A
+    client may make up to BURST requests per window, which averages out to RATE per second.
+
+    The client only needs the async `incr` and `expire` commands, so a `redis.asyncio.Redis` instance
+    or any local stand-in exposing them can be used. Errors talking to the store are logged and the
+    request is let through, so an unavailable store never takes the API down with it.
+    """
+    def __init__(self, CLIENT, KEY_PREFIX: str = SETTINGS.RATE_LIMIT_KEY_PREFIX, CLOCK: Callable[[], float] = time.time):
+        """
+        Args:
+            CLIENT: The async Redis-compatible client.
+            KEY_PREFIX (str): Prefix applied to every key written by this limiter.
+            CLOCK (Callable[[], float]): Wall clock shared by every worker, used to number the windows.
+        """
+        self.CLIENT = CLIENT
+        self.KEY_PREFIX = KEY_PREFIX
+        self.CLOCK = CLOCK
+
+    async def acquire(self, KEY: str, RATE: float, BURST: int) -> float:
+        WINDOW_SECONDS = BURST / RATE
+        NOW = self.CLOCK()
+        WINDOW = math.floor(NOW / WINDOW_SECONDS)
+        STORE_KEY = f"{self.KEY_PREFIX}{KEY}:{WINDOW}"
+        try:
+            COUNT = await self.CLIENT.incr(STORE_KEY)
+            if COUNT == 1:
+                await self.CLIENT.expire(STORE_KEY, math.ceil(WINDOW_SECONDS))
+        except Exception as EXCEPTION:
+            LOGGER.warning(f"Rate limit check failed: {EXCEPTION}")
+            return 0.0
+        return 0.0 if COUNT <= BURST else (WINDOW + 1) * WINDOW_SECONDS - NOW
+
+    async def close(self) -> None:
+        await self.CLIENT.aclose()
+
+
+def create_rate_limiter(BACKEND: str, REDIS_URL: str | None = None) -> RateLimiter:
+    """
+    Create a rate limiter for the named backend.
+
+    Args:
+        BACKEND (str): Either 'memory' or 'redis'.
+        REDIS_URL (str | None): The Redis connection URL, required for the 'redis' backend.
+
+    Returns:
+        RateLimiter: The new rate limiter.
+
+    Raises:
+        ValueError: If the backend is unknown or the Redis URL is missing.
+        RuntimeError: If the 'redis' backend is requested but the redis package is not installed.
+    """
+    if BACKEND == "memory":
+        return InMemoryRateLimiter()
+    if BACKEND == "redis":
+        if not REDIS_URL:
+            raise ValueError("REDIS_URL must be set to use the 'redis' rate limit backend.")
+        try:
+            import redis.asyncio as redis
+        except ImportError as EXCEPTION:
+            raise RuntimeError("The 'redis' package is required to use the 'redis' rate limit backend.") from EXCEPTION
+        return SharedStoreRateLimiter(redis.from_url(REDIS_URL))
+    raise ValueError(f"Unknown rate limit backend '{BACKEND}'.")
+
+
+# The limiter used by RateLimitMiddleware. Replaced at startup by `configure_rate_limiter`.
+RATE_LIMITER: RateLimiter = InMemoryRateLimiter()
+
+
+def configure_rate_limiter(LIMITER: RateLimiter) -> None:
+    """
+    Replace the limiter used by RateLimitMiddleware.
+
+    Args:
+        LIMITER (RateLimiter): The limiter to use.
+    """
+    global RATE_LIMITER
+    RATE_LIMITER = LIMITER
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Retrieve the limiter used by RateLimitMiddleware.
+
+    Returns:
+        RateLimiter: The configured limiter.
+    """
+    return RATE_LIMITER
+
+
+def route_template(SCOPE: Scope) -> str:
+    """
+    Find the template of the route a request will be handled by, e.g. '/tasks/{ID}/'.
+
+    Middleware runs before routing, so the app's routes are matched here, in the same order the router tries them.
+
+    Args:
+        SCOPE (Scope): The request's ASGI scope.
+
+    Returns:
+        str: The route template, or a shared placeholder if no route matches, so unknown paths cannot
+             create unlimited buckets.
+    """
+    for ROUTE in SCOPE["app"].router.routes:
+        MATCH, _ = ROUTE.matches(SCOPE)
+        if MATCH == Match.FULL:
+            return ROUTE.path
+    return UNMATCHED_ROUTE
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware that limits each client's request rate per route, and sheds load when the
+    worker is overloaded.
+
+    Requests are refused before they reach the app, and so before they take a database connection:
+
+    - 503 (Service Unavailable) while the oldest request waiting for a database connection has waited
+      longer than SHED_POOL_WAIT_SECONDS, or while more than SHED_MAX_IN_FLIGHT requests are being
+      handled. Refusing new work at once keeps latency bounded for the requests already admitted,
+      rather than letting every request queue until the pool times out.
+    - 429 (Too Many Requests) when the client's token bucket for the route is empty. Buckets are
+      keyed by the client's address (see uvicorn's --proxy-headers behind a proxy) and the route
+      template, and are sized by RATE_LIMIT_PER_SECOND and RATE_LIMIT_BURST, or the route's entry in
+      RATE_LIMIT_ROUTES. The limiter is selected by the RATE_LIMIT_BACKEND setting (see `configure_rate_limiter`).
+
+    Both carry a Retry-After header and the app's standard error body. Paths starting with one of
+    RateLimitConstants.EXEMPT_PATH_PREFIXES, such as metrics scrapes and the long-lived event stream,
+    are never limited.
+    """
+    def __init__(self, APP: ASGIApp):
+        self.APP = APP
+        self.IN_FLIGHT = 0
+
+    def is_overloaded(self, SCOPE: Scope) -> bool:
+        """
+        Retrieve whether new requests should be refused to protect those already being handled.
+
+        Args:
+            SCOPE (Scope): The request's ASGI scope.
+
+        Returns:
+            bool: True if too many requests are in flight, or requests are queueing for database connections.
+        """
+        if SETTINGS.SHED_MAX_IN_FLIGHT and self.IN_FLIGHT >= SETTINGS.SHED_MAX_IN_FLIGHT:
+            return True
+        if SETTINGS.SHED_POOL_WAIT_SECONDS:
+            STATE = SCOPE["app"].state
+            for NAME in ("POOL_METRICS", "REPLICA_POOL_METRICS"):
+                POOL_METRICS = getattr(STATE, NAME, None)
+                if POOL_METRICS is not None and POOL_METRICS.current_wait_seconds() > SETTINGS.SHED_POOL_WAIT_SECONDS:
+                    return True
+        return False
+
+    async def __call__(self, SCOPE: Scope, RECEIVE: Receive, SEND: Send) -> None:
+        if SCOPE["type"] != "http" or SCOPE["path"].startswith(RateLimitConstants.EXEMPT_PATH_PREFIXES):
+            await self.APP(SCOPE, RECEIVE, SEND)
+            return
+
+        if self.is_overloaded(SCOPE):
+            RESPONSE = show_error(HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.SERVICE_UNAVAILABLE.phrase,
+                                  "The server is overloaded. Please try again shortly.",
+                                  {"Retry-After": str(RateLimitConstants.SHED_RETRY_AFTER_SECONDS)})
+            await RESPONSE(SCOPE, RECEIVE, SEND)
+            return
+
+        if SETTINGS.RATE_LIMIT_ENABLED:
+            ROUTE = f"{SCOPE['method']} {route_template(SCOPE)}"
+            RATE, BURST = SETTINGS.RATE_LIMIT_ROUTES.get(ROUTE, (SETTINGS.RATE_LIMIT_PER_SECOND, SETTINGS.RATE_LIMIT_BURST))
+            CLIENT = SCOPE["client"][0] if SCOPE.get("client") else "unknown"
+            RETRY_AFTER = await get_rate_limiter().acquire(f"{CLIENT}:{ROUTE}", RATE, BURST)
+            if RETRY_AFTER > 0:
+                RESPONSE = show_error(HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.TOO_MANY_REQUESTS.phrase,
+                                      f"Rate limit of {RATE:g} requests per second exceeded for '{ROUTE}'.",
+                                      {"Retry-After": str(math.ceil(RETRY_AFTER))})
+                await RESPONSE(SCOPE, RECEIVE, SEND)
+                return
+
+        self.IN_FLIGHT += 1
+        try:
+            await self.APP(SCOPE, RECEIVE, SEND)
+        finally:
+            self.IN_FLIGHT -= 1
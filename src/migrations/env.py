@@ -0,0 +1,69 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+from db.tables.task import Base
+# Registers the table with Base.metadata
+import db.tables.idempotency_key  # noqa: F401
+from migrations.helpers import include_object
+from settings import SETTINGS
+
+CONFIG = context.config
+
+# Configure logging for the alembic command line. Loggers created by the app are left enabled, so
+# running migrations from within the app (or its tests) does not silence its logging.
+if CONFIG.config_file_name is not None and CONFIG.attributes.get("configure_logger", True):
+    fileConfig(CONFIG.config_file_name, disable_existing_loggers=False)
+
+
+def do_run_migrations(CONNECTION: Connection) -> None:
+    """
+    Run the pending migrations over an open connection.
+
+    Each migration runs in its own transaction, so a migration can step outside of it with
+    autocommit_block() (e.g. to build an index concurrently) without affecting the others.
+
+    Args:
+        CONNECTION (Connection): The synchronous connection wrapped by the async engine.
+    """
+    context.configure(
+        connection=CONNECTION,
+        target_metadata=Base.metadata,
+        include_object=include_object,
+        transaction_per_migration=True,
+        # SQLite can only alter most columns by copying the table
+        render_as_batch=CONNECTION.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """
+    Run the pending migrations against the database configured by the app's settings.
+
+    The URL can be overridden with the 'sqlalchemy.url' option, e.g. by the tests and benchmarks.
+    """
+    URL = CONFIG.get_main_option("sqlalchemy.url") or SETTINGS.get_database_url()
+    ENGINE = create_async_engine(URL, poolclass=pool.NullPool)
+    try:
+        async with ENGINE.connect() as CONNECTION:
+            await CONNECTION.run_sync(do_run_migrations)
+    finally:
+        await ENGINE.dispose()
+
+
+if context.is_offline_mode():
+    # The migration helpers inspect the live database (e.g. for invalid indexes left behind by a failed
+    # concurrent build), so migrations cannot be rendered to a SQL script.
+    raise RuntimeError("Offline (--sql) migrations are not supported. Run the migrations against a database.")
+
+# A connection may be passed in by the caller, e.g. the tests' in-memory database, which only exists
+# on its one connection
+CONNECTION = CONFIG.attributes.get("connection")
+if CONNECTION is not None:
+    do_run_migrations(CONNECTION)
+else:
+    asyncio.run(run_async_migrations())
@@ -0,0 +1,161 @@
+import sqlalchemy as sa
+from alembic import op
+from utils.global_constants import SearchConstants
+
+# Search objects are only created by migration 0004 rather than declared on the Task model, so
+# autogenerate and the schema drift test must not treat them as differences
+UNMAPPED_INDEXES = {"ix_Tasks_search_vector", "ix_Tasks_search_trgm"}
+UNMAPPED_COLUMNS = {SearchConstants.SEARCH_VECTOR_COLUMN}
+
+
+def include_object(OBJECT, NAME: str | None, TYPE: str, REFLECTED: bool, COMPARE_TO) -> bool:
+    """
+    Decide whether autogenerate compares a database object against the models.
+
+    Args:
+        OBJECT: The schema object.
+        NAME (str | None): The object's name.
+        TYPE (str): The kind of object, e.g. 'table', 'column' or 'index'.
+        REFLECTED (bool): Whether the object was reflected from the database.
+        COMPARE_TO: The matching model object, or None.
+
+    Returns:
+        bool: False for the search objects managed outside of the models, True otherwise.
+    """
+    if TYPE == "table" and NAME and NAME.startswith(SearchConstants.FTS_TABLE):
+        return False
+    if TYPE == "index" and NAME in UNMAPPED_INDEXES:
+        return False
+    if TYPE == "column" and NAME in UNMAPPED_COLUMNS:
+        return False
+    return True
+
+
+def is_postgres() -> bool:
+    """
+    Retrieve whether the migration is running against PostgreSQL.
+
+    Returns:
+        bool: True for PostgreSQL, False otherwise (SQLite).
+    """
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def create_index_concurrently(NAME: str, TABLE: str, EXPRESSION: str, USING: str | None = None,
+                              WHERE: str | None = None) -> None:
+    """
+    Create an index without blocking writes to the table.
+
+    On PostgreSQL the index is built with CREATE INDEX CONCURRENTLY, which cannot run inside a
+    transaction, so it is built in an autocommit block. A failed concurrent build leaves an invalid
+    index behind, which is dropped and rebuilt. Other databases create the index normally.
+
+    Args:
+        NAME (str): The index name.
+        TABLE (str): The table name.
+        EXPRESSION (str): The indexed columns or expressions, e.g. 'due_date, id'.
+        USING (str | None): The index method, e.g. 'GIN'. Defaults to the database's default method.
+        WHERE (str | None): The predicate of a partial index.
+    """
+    USING_CLAUSE = f" USING {USING}" if USING else ""
+    WHERE_CLAUSE = f" WHERE {WHERE}" if WHERE else ""
+
+    if not is_postgres():
+        op.execute(f'CREATE INDEX IF NOT EXISTS "{NAME}" ON "{TABLE}" ({EXPRESSION}){WHERE_CLAUSE}')
+        return
+
+    with op.get_context().autocommit_block():
+        INVALID = op.get_bind().execute(
+            sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+            {"name": f'"{NAME}"'}
+        ).scalar()
+        if INVALID:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{NAME}"')
+        op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{NAME}" ON "{TABLE}"{USING_CLAUSE} ({EXPRESSION}){WHERE_CLAUSE}')
+
+
+def drop_index_concurrently(NAME: str) -> None:
+    """
+    Drop an index without blocking reads and writes to its table.
+
+    Args:
+        NAME (str): The index name.
+    """
+    if not is_postgres():
+        op.execute(f'DROP INDEX IF EXISTS "{NAME}"')
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{NAME}"')
+
+
+def batched_backfill(TABLE: str, SET: str, WHERE: str | None = None, BATCH_SIZE: int = 1000) -> int:
+    """
+    Update every row matching 'WHERE' in batches of at most 'BATCH_SIZE' rows.
+
+    The table is walked once in ascending ranges of 'id', each found from the end of the previous
+    one with the primary key index, so every batch costs the same however far into the table it is.
+    Each batch is committed on its own, so row locks are only held for one batch at a time and a
+    large table is never locked by a single long running UPDATE.
+
+    Args:
+        TABLE (str): The table name. The table must have an 'id' primary key.
+        SET (str): The SET clause, e.g. 'version = 1'.
+        WHERE (str | None): The condition matching rows that still need updating, e.g. 'version IS NULL'.
+                            Rows outside it are skipped. Defaults to every row.
+        BATCH_SIZE (int): The maximum number of rows updated per statement.
+
+    Returns:
+        int: The number of rows updated.
+    """
+    NEXT_RANGE = sa.text(f'SELECT max(id) FROM (SELECT id FROM "{TABLE}" WHERE id > :after ORDER BY id LIMIT :batch_size) AS "batch"')
+    WHERE_CLAUSE = f" AND ({WHERE})" if WHERE else ""
+    STATEMENT = sa.text(f'UPDATE "{TABLE}" SET {SET} WHERE id > :after AND id <= :until{WHERE_CLAUSE}')
+    UPDATED = 0
+    AFTER = 0
+    with op.get_context().autocommit_block():
+        while True:
+            UNTIL = op.get_bind().execute(NEXT_RANGE, {"after": AFTER, "batch_size": BATCH_SIZE}).scalar()
+            if UNTIL is None:
+                return UPDATED
+            UPDATED += op.get_bind().execute(STATEMENT, {"after": AFTER, "until": UNTIL}).rowcount
+            AFTER = UNTIL
+
+
+def add_column_with_backfill(TABLE: str, COLUMN: sa.Column, BACKFILL: str, BATCH_SIZE: int = 1000) -> None:
+    """
+    Add a NOT NULL column with a server default to a table that may already hold many rows.
+
+    The column is added as nullable without a default, which does not rewrite the table. New rows
+    then receive the default, existing rows are backfilled in batches, and the NOT NULL constraint
+    is added last. On PostgreSQL the constraint is first added as an unvalidated CHECK constraint
+    and validated separately, so SET NOT NULL does not hold an exclusive lock while scanning the table.
+
+    Args:
+        TABLE (str): The table name.
+        COLUMN (sa.Column): The column. Must be declared with nullable=False and a server_default.
+        BACKFILL (str): The SQL expression existing rows are backfilled with, e.g. '1'.
+        BATCH_SIZE (int): The maximum number of rows updated per statement.
+    """
+    NAME = COLUMN.name
+    SERVER_DEFAULT = COLUMN.server_default.arg
+    op.add_column(TABLE, sa.Column(NAME, COLUMN.type, nullable=True))
+    if is_postgres():
+        op.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN {NAME} SET DEFAULT {SERVER_DEFAULT}')
+
+    # The backfill's autocommit block commits the new column first, releasing its brief exclusive lock
+    batched_backfill(TABLE, f"{NAME} = {BACKFILL}", f"{NAME} IS NULL", BATCH_SIZE)
+
+    if is_postgres():
+        # Each statement commits on its own, so the brief exclusive locks are not held while validating
+        CONSTRAINT = f"{TABLE}_{NAME}_not_null"
+        with op.get_context().autocommit_block():
+            op.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{CONSTRAINT}" CHECK ({NAME} IS NOT NULL) NOT VALID')
+            op.execute(f'ALTER TABLE "{TABLE}" VALIDATE CONSTRAINT "{CONSTRAINT}"')
+            # PostgreSQL 12+ uses the validated constraint to skip the table scan
+            op.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN {NAME} SET NOT NULL')
+            op.execute(f'ALTER TABLE "{TABLE}" DROP CONSTRAINT "{CONSTRAINT}"')
+    else:
+        # SQLite cannot alter a column in place, so the table is copied
+        with op.batch_alter_table(TABLE) as BATCH:
+            BATCH.alter_column(NAME, existing_type=COLUMN.type, nullable=False, server_default=SERVER_DEFAULT)
@@ -0,0 +1,39 @@
+"""Create the Tasks table.
+
+Databases created by the original init.sql script already have the table, so it is only created
+when it is missing. Those databases are then brought up to date by the following revisions.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-01 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLAlchemy stores the names of StatusTypes' members, not their values
+STATUS_TYPES = sa.Enum("PENDING", "IN_PROGRESS", "DONE", name="statustypes")
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("Tasks"):
+        return
+
+    op.create_table(
+        "Tasks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("status", STATUS_TYPES, nullable=False),
+        sa.Column("due_date", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("Tasks")
+    STATUS_TYPES.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,25 @@
+"""Add the indexes backing keyset pagination on (due_date, id), optionally filtered by status.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-05-01 00:00:01
+"""
+from typing import Sequence, Union
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_concurrently("ix_Tasks_id", "Tasks", "id")
+    create_index_concurrently("ix_Tasks_due_date_id", "Tasks", "due_date, id")
+    create_index_concurrently("ix_Tasks_status_due_date_id", "Tasks", "status, due_date, id")
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_Tasks_status_due_date_id")
+    drop_index_concurrently("ix_Tasks_due_date_id")
+    drop_index_concurrently("ix_Tasks_id")
@@ -0,0 +1,31 @@
+"""Add the per-row version, incremented on every write and used to build the task's ETag.
+
+Existing tasks are backfilled with version 1 in batches before the column is made NOT NULL.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-05-01 00:00:02
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import add_column_with_backfill
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases created by the original init.sql script already have the column
+    COLUMNS = {COLUMN["name"] for COLUMN in sa.inspect(op.get_bind()).get_columns("Tasks")}
+    if "version" in COLUMNS:
+        return
+
+    add_column_with_backfill("Tasks", sa.Column("version", sa.Integer(), nullable=False, server_default="1"), "1")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("Tasks") as BATCH:
+        BATCH.drop_column("version")
@@ -0,0 +1,91 @@
+"""Add the full-text search indexes over each task's title and description.
+
+PostgreSQL: a weighted tsvector column with a GIN index for ranked word matches, and a trigram GIN
+index over the same text for partial (substring) matches. The column is added as a plain nullable
+column, which does not rewrite the table, and is kept up to date by a trigger. Existing tasks are
+backfilled in batches, then both indexes are built concurrently.
+
+SQLite: an external content FTS5 table kept in sync with the task table by triggers, and built
+from the existing tasks.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-05-01 00:00:03
+"""
+from typing import Sequence, Union
+from alembic import op
+from migrations.helpers import batched_backfill, create_index_concurrently, drop_index_concurrently, is_postgres
+from utils.global_constants import SearchConstants
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONFIG = SearchConstants.TEXT_SEARCH_CONFIG
+VECTOR = SearchConstants.SEARCH_VECTOR_COLUMN
+FTS_TABLE = SearchConstants.FTS_TABLE
+
+
+def search_vector(ROW: str = "") -> str:
+    """
+    Build the expression computing a task's search vector.
+
+    Args:
+        ROW (str): Prefix qualifying the columns, e.g. 'NEW.' within a trigger.
+
+    Returns:
+        str: The title weighted 'A' and the description weighted 'B'.
+    """
+    return (f"setweight(to_tsvector('{CONFIG}', coalesce({ROW}title, '')), 'A') || "
+            f"setweight(to_tsvector('{CONFIG}', coalesce({ROW}description, '')), 'B')")
+
+
+def upgrade() -> None:
+    if is_postgres():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f'ALTER TABLE "Tasks" ADD COLUMN IF NOT EXISTS {VECTOR} tsvector')
+        op.execute(f"""CREATE OR REPLACE FUNCTION "Tasks_search_vector_update"() RETURNS trigger AS $$
+        BEGIN
+            NEW.{VECTOR} := {search_vector("NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql""")
+        op.execute('DROP TRIGGER IF EXISTS "Tasks_search_vector_update" ON "Tasks"')
+        op.execute("""CREATE TRIGGER "Tasks_search_vector_update" BEFORE INSERT OR UPDATE OF title, description
+        ON "Tasks" FOR EACH ROW EXECUTE FUNCTION "Tasks_search_vector_update"()""")
+        # Tasks written from here on are indexed by the trigger, so only existing tasks need backfilling
+        batched_backfill("Tasks", f"{VECTOR} = {search_vector()}", f"{VECTOR} IS NULL")
+        create_index_concurrently("ix_Tasks_search_vector", "Tasks", VECTOR, USING="GIN")
+        create_index_concurrently("ix_Tasks_search_trgm", "Tasks", f"({SearchConstants.SEARCH_DOCUMENT}) gin_trgm_ops",
+                                  USING="GIN")
+        return
+
+    op.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS "{FTS_TABLE}" USING fts5(
+        title, description, content='Tasks', content_rowid='id', tokenize='porter unicode61'
+    )""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS "Tasks_fts_insert" AFTER INSERT ON "Tasks" BEGIN
+        INSERT INTO "{FTS_TABLE}" (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS "Tasks_fts_delete" AFTER DELETE ON "Tasks" BEGIN
+        INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}", rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS "Tasks_fts_update" AFTER UPDATE OF title, description ON "Tasks" BEGIN
+        INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}", rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO "{FTS_TABLE}" (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""")
+    op.execute(f"""INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}") VALUES ('rebuild')""")
+
+
+def downgrade() -> None:
+    if is_postgres():
+        drop_index_concurrently("ix_Tasks_search_trgm")
+        drop_index_concurrently("ix_Tasks_search_vector")
+        op.execute('DROP TRIGGER IF EXISTS "Tasks_search_vector_update" ON "Tasks"')
+        op.execute('DROP FUNCTION IF EXISTS "Tasks_search_vector_update"()')
+        op.execute(f'ALTER TABLE "Tasks" DROP COLUMN IF EXISTS {VECTOR}')
+        return
+
+    for TRIGGER in ("Tasks_fts_update", "Tasks_fts_delete", "Tasks_fts_insert"):
+        op.execute(f'DROP TRIGGER IF EXISTS "{TRIGGER}"')
+    op.execute(f'DROP TABLE IF EXISTS "{FTS_TABLE}"')
@@ -0,0 +1,23 @@
+"""Add the partial index over the due dates of tasks that are not done, backing the scheduler's scans.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-05-01 00:00:04
+"""
+from typing import Sequence, Union
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+from utils.global_constants import SchedulerConstants
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_concurrently("ix_Tasks_open_due_date_id", "Tasks", "due_date, id",
+                              WHERE=SchedulerConstants.OPEN_TASK_CONDITION)
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_Tasks_open_due_date_id")
@@ -0,0 +1,32 @@
+"""Add the IdempotencyKeys table, recording the responses replayed to retried task creation requests.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-05-01 00:00:05
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from utils.global_constants import IdempotencyConstants
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A new table, so its index can be created normally rather than concurrently
+    op.create_table(
+        "IdempotencyKeys",
+        sa.Column("key", sa.String(IdempotencyConstants.MAX_KEY_LENGTH), primary_key=True),
+        sa.Column("request_hash", sa.String(64), nullable=False),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_IdempotencyKeys_expires_at", "IdempotencyKeys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_IdempotencyKeys_expires_at", table_name="IdempotencyKeys")
+    op.drop_table("IdempotencyKeys")
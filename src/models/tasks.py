@@ -1,7 +1,9 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Literal
 from datetime import datetime, timezone
+from settings import SETTINGS
 from utils.global_constants import StatusTypes
+from utils.datetime_utils import ensure_utc
 
 class TaskUpdateModel(BaseModel):
     """
@@ -46,12 +48,8 @@ class TaskCreationModel(TaskUpdateModel):
         Raises:
             ValidationError: If 'VALUE' is not a datetime set in the future.
         """
-        if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:
-            # Assume naive datetime is in UTC
-            value = value.replace(tzinfo=timezone.utc)
-        else:
-            # Convert all timezone aware datetimes to the correct time in UTC
-            value = value.astimezone(timezone.utc)
+        # Assume naive datetimes are in UTC and convert timezone aware datetimes to UTC
+        value = ensure_utc(value)
 
         # Compare against the current time in UTC
         if value <= datetime.now(timezone.utc):
@@ -70,6 +68,7 @@ class TaskResponseModel(TaskUpdateModel):
         title (str): The title of the task. Required.
         description (Optional[str]): An optional description of the task.
         due_date (datetime): The due date and time of the task (must be set in the future).
+        version (int): The task's version, incremented on every write.
     
     Notes:
         - We inherit from TaskUpdateModel rather than TaskCreationModel to prevent incorrect validation of
@@ -78,4 +77,89 @@ class TaskResponseModel(TaskUpdateModel):
     id: int
     title: str
     description: Optional[str] = None
-    due_date: datetime
\ No newline at end of file
+    due_date: datetime
+    version: int
+
+    @field_validator("due_date")
+    @classmethod
+    def normalise_due_date(cls, value: datetime) -> datetime:
+        """
+        Normalises the due date to UTC.
+
+        Parameters:
+            value (datetime): The datetime to normalise.
+
+        Returns:
+            datetime: The datetime in UTC.
+
+        Notes:
+            - SQLite returns naive datetimes, which are stored in UTC. Normalising them here means a
+              task serialises the same way whichever database it was read from.
+        """
+        return ensure_utc(value)
+
+class TaskPageModel(BaseModel):
+    """
+    Schema for returning a single page of tasks in API responses.
+
+    Attributes:
+        items (list[TaskResponseModel]): The tasks on this page, ordered by due date then ID.
+        next_cursor (Optional[str]): Opaque cursor used to request the next page.
+                                     None when there are no further pages.
+    """
+    items: list[TaskResponseModel]
+    next_cursor: Optional[str] = None
+
+
+class TaskBulkUpdateModel(TaskUpdateModel):
+    """
+    Schema for updating the status of many tasks at once.
+
+    Inherits from TaskUpdateModel.
+
+    Attributes:
+        ids (list[int]): The IDs of the tasks to update.
+    """
+    ids: list[int] = Field(min_length=1, max_length=SETTINGS.BULK_MAX_ITEMS)
+
+
+class TaskBulkDeleteModel(BaseModel):
+    """
+    Schema for deleting many tasks at once.
+
+    Attributes:
+        ids (list[int]): The IDs of the tasks to delete.
+    """
+    ids: list[int] = Field(min_length=1, max_length=SETTINGS.BULK_MAX_ITEMS)
+
+
+class TaskBulkResultModel(BaseModel):
+    """
+    Schema for the outcome of a single item in a bulk update or delete.
+
+    Attributes:
+        id (int): The ID of the task the result refers to.
+        success (bool): Whether the operation was applied to the task.
+        task (Optional[TaskResponseModel]): The updated task, for successful bulk updates.
+        detail (Optional[str]): The reason the operation failed, for unsuccessful items.
+    """
+    id: int
+    success: bool
+    task: Optional[TaskResponseModel] = None
+    detail: Optional[str] = None
+
+
+class TaskStatsModel(BaseModel):
+    """
+    Schema for the summary counts shown on the task dashboard.
+
+    Attributes:
+        total (int): The number of tasks.
+        by_status (dict[StatusTypes, int]): The number of tasks with each status.
+        overdue (int): The number of tasks that are not done and whose due date has passed.
+        due_within_week (int): The number of tasks that are not done and are due in the next 7 days.
+    """
+    total: int
+    by_status: dict[StatusTypes, int]
+    overdue: int
+    due_within_week: int
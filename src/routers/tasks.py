@@ -1,9 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Body, Header, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 from http import HTTPStatus
-from models.tasks import TaskCreationModel, TaskResponseModel, TaskUpdateModel
-from db.crud.crud import create_task, read_all_tasks, read_task, update_task, delete_task
-from db.get_async_session import get_async_session
+from datetime import datetime
+from typing import AsyncIterator, Literal
+import asyncio
+import json
+from models.tasks import (TaskCreationModel, TaskResponseModel, TaskUpdateModel, TaskPageModel,
+                          TaskBulkUpdateModel, TaskBulkDeleteModel, TaskBulkResultModel, TaskStatsModel)
+from db.crud.crud import (create_task, create_tasks, read_all_tasks, stream_tasks, read_task, read_task_stats, update_task,
+                          update_tasks, delete_task, delete_tasks, TaskVersionConflictError)
+from db.crud.idempotency import create_task_idempotently, IdempotencyKeyReusedError
+from db.crud.search import search_tasks
+from db.crud.status_batcher import get_status_update_batcher
+from db.get_async_session import get_async_session, get_async_read_session, get_async_read_session_factory
+from events.task_events import TaskEventBroker, get_task_event_broker
+from utils.etag import task_etag, page_etag, etag_matches, if_match_versions
+from utils.export import encode_csv, encode_ndjson
+from utils.json_response import FastJSONResponse
+from settings import SETTINGS
+from utils.global_constants import StatusTypes, IdempotencyConstants
 
 
 def raise_bad_request(REQUEST_ID: int):
@@ -19,6 +36,69 @@ def raise_bad_request(REQUEST_ID: int):
     raise HTTPException(status_code=400, detail=f"No task exists with an id of '{REQUEST_ID}'.")
 
 
+async def generate_export(SESSION_FACTORY: sessionmaker, FORMAT: str) -> AsyncIterator[str]:
+    """
+    Generate the body of a task export chunk by chunk.
+
+    A dedicated session is opened for the lifetime of the stream, as the body is generated after the
+    request scoped session has been closed.
+
+    Args:
+        SESSION_FACTORY (sessionmaker): Factory used to open the session the export is read through.
+        FORMAT (str): The export format, either 'ndjson' or 'csv'.
+
+    Yields:
+        str: The next encoded chunk of the export.
+    """
+    if FORMAT == "csv":
+        yield encode_csv([], INCLUDE_HEADER=True)
+
+    async with SESSION_FACTORY() as SESSION:
+        async for ROWS in stream_tasks(SESSION, SETTINGS.EXPORT_BATCH_SIZE):
+            yield encode_csv(ROWS) if FORMAT == "csv" else encode_ndjson(ROWS)
+
+
+async def generate_task_events(BROKER: TaskEventBroker) -> AsyncIterator[str]:
+    """
+    Generate a Server-Sent Events stream of task changes.
+
+    The subscription is removed when the client disconnects and the stream is cancelled.
+
+    Args:
+        BROKER (TaskEventBroker): The broker to subscribe to.
+
+    Yields:
+        str: The next SSE frame, either an event or a keep-alive comment.
+    """
+    QUEUE = BROKER.subscribe()
+    try:
+        # Ask clients to wait 5 seconds before reconnecting if the stream drops
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                EVENT = await asyncio.wait_for(QUEUE.get(), timeout=SETTINGS.EVENT_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keep idle connections open through proxies
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {EVENT['type']}\ndata: {json.dumps(EVENT, separators=(',', ':'))}\n\n"
+    finally:
+        BROKER.unsubscribe(QUEUE)
+
+
+def not_modified(ETAG: str) -> Response:
+    """
+    Build a 304 Not Modified response for a conditional GET whose ETag matched.
+
+    Args:
+        ETAG (str): The resource's current ETag.
+
+    Returns:
+        Response: An empty 304 response carrying the ETag.
+    """
+    return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": ETAG, "Cache-Control": "no-cache"})
+
+
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
@@ -29,50 +109,325 @@ router = APIRouter(prefix="/tasks", tags=["Tasks"])
                  HTTPStatus.OK: {"description": "Successful Response",
                         "content": {
                             "application/json": {
-                                "example": {"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z"}
+                                "example": {"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z", "version": 1}
                                 }
                             }},
+                            HTTPStatus.UNPROCESSABLE_ENTITY: {"description": "The 'Idempotency-Key' was already used for a different request"},
                             HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
              }
              )
-async def post_task(TASK: TaskCreationModel, SESSION: AsyncSession = Depends(get_async_session)) -> TaskResponseModel:
+async def post_task(TASK: TaskCreationModel, RESPONSE: Response,
+                    IDEMPOTENCY_KEY: str | None = Header(None, alias=IdempotencyConstants.KEY_HEADER, min_length=1,
+                                                         max_length=IdempotencyConstants.MAX_KEY_LENGTH),
+                    SESSION: AsyncSession = Depends(get_async_session)) -> TaskResponseModel:
     """
     Endpoint to create a new task.
 
+    Requests sent with an 'Idempotency-Key' header may be safely retried: a retry with the same key and
+    body receives the original response, marked with an 'Idempotent-Replayed' header, rather than
+    creating another task.
+
     Args:
         TASK (TaskCreationModel): Task creation payload.
+        RESPONSE (Response): The outgoing response, used to mark replayed responses.
+        IDEMPOTENCY_KEY (str | None): Client-generated key identifying the request across retries.
         SESSION (AsyncSession): Injected SQLAlchemy async session.
 
     Returns:
         TaskResponseModel: The newly created task.
+
+    Raises:
+        HTTPException: 422 if the idempotency key was already used for a different request.
+    """
+    if IDEMPOTENCY_KEY is None:
+        return await create_task(TASK, SESSION)
+
+    try:
+        CREATED_TASK, REPLAYED = await create_task_idempotently(TASK, IDEMPOTENCY_KEY, SESSION)
+    except IdempotencyKeyReusedError as EXCEPTION:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail=str(EXCEPTION))
+
+    if REPLAYED:
+        RESPONSE.headers[IdempotencyConstants.REPLAYED_HEADER] = "true"
+    return CREATED_TASK
+
+
+@router.post("/bulk", response_model=list[TaskResponseModel],
+             summary="Create many tasks",
+             description="Create many tasks in a single transaction. Tasks are returned in the order they were submitted.",
+             responses={
+                 HTTPStatus.OK: {"description": "Successful Response",
+                        "content": {
+                            "application/json": {
+                                "example": [{"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z", "version": 1}]
+                                }
+                            }},
+                            HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
+             }
+             )
+async def post_tasks(TASKS: list[TaskCreationModel] = Body(min_length=1, max_length=SETTINGS.BULK_MAX_ITEMS),
+                     SESSION: AsyncSession = Depends(get_async_session)) -> list[TaskResponseModel]:
+    """
+    Endpoint to create many tasks at once.
+
+    Args:
+        TASKS (list[TaskCreationModel]): Task creation payloads.
+        SESSION (AsyncSession): Injected SQLAlchemy async session.
+
+    Returns:
+        list[TaskResponseModel]: The newly created tasks.
+    """
+    return await create_tasks(TASKS, SESSION)
+
+
+@router.patch("/bulk", response_model=list[TaskBulkResultModel],
+              summary="Update the status of many tasks",
+              description="Apply one status to many tasks in a single transaction. One result is returned per distinct ID.",
+             responses={
+                 HTTPStatus.OK: {"description": "Successful Response",
+                        "content": {
+                            "application/json": {
+                                "example": [{"id": 1, "success": True, "task": {"id": 1, "title": "string", "description": "string", "status": "Done", "due_date": "2025-04-23T16:19:35.730Z", "version": 1}, "detail": None},
+                                            {"id": 2, "success": False, "task": None, "detail": "No task exists with an id of '2'."}]
+                                }
+                            }},
+                            HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
+             })
+async def patch_statuses(TASKS: TaskBulkUpdateModel, SESSION: AsyncSession = Depends(get_async_session)) -> list[TaskBulkResultModel]:
+    """
+    Endpoint to update the status of many tasks at once.
+
+    Args:
+        TASKS (TaskBulkUpdateModel): The IDs of the tasks to update and the new status to apply.
+        SESSION (AsyncSession): Injected SQLAlchemy async session.
+
+    Returns:
+        list[TaskBulkResultModel]: The outcome for each task.
+    """
+    return await update_tasks(TASKS.ids, TaskUpdateModel(status=TASKS.status), SESSION)
+
+
+@router.delete("/bulk", response_model=list[TaskBulkResultModel],
+               summary="Delete many tasks",
+               description="Delete many tasks in a single transaction. One result is returned per distinct ID.",
+             responses={
+                 HTTPStatus.OK: {"description": "Successful Response",
+                        "content": {
+                            "application/json": {
+                                "example": [{"id": 1, "success": True, "task": None, "detail": None},
+                                            {"id": 2, "success": False, "task": None, "detail": "No task exists with an id of '2'."}]
+                                }
+                            }},
+                            HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
+             })
+async def remove_tasks(TASKS: TaskBulkDeleteModel, SESSION: AsyncSession = Depends(get_async_session)) -> list[TaskBulkResultModel]:
+    """
+    Endpoint to delete many tasks at once.
+
+    Args:
+        TASKS (TaskBulkDeleteModel): The IDs of the tasks to delete.
+        SESSION (AsyncSession): Injected SQLAlchemy async session.
+
+    Returns:
+        list[TaskBulkResultModel]: The outcome for each task.
     """
-    return await create_task(TASK, SESSION)
+    return await delete_tasks(TASKS.ids, SESSION)
 
 
-@router.get("/", response_model=list[TaskResponseModel], 
-            summary="Get all tasks", 
-            description="Retrieve a list of all tasks currently stored in the database.",
+@router.get("/", response_model=TaskPageModel, 
+            summary="Get a page of tasks", 
+            description="Retrieve a page of tasks ordered by due date, optionally filtered by status and due date. "
+                        "Pass the returned 'next_cursor' back as 'cursor' to fetch the following page.",
              responses={
                  HTTPStatus.OK: {"description": "Successful Response",
                         "content": {
                             "application/json": {
-                                "example": [{"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z"}]
+                                "example": {"items": [{"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z", "version": 1}],
+                                            "next_cursor": "WyIyMDI1LTA0LTIzVDE2OjE5OjM1LjczMDAwMCswMDowMCIsMV0"}
                                 }
                             }},
+                            HTTPStatus.NOT_MODIFIED: {"description": "The page matches the ETag sent in 'If-None-Match'"},
+                            HTTPStatus.BAD_REQUEST: {"description": "The provided 'cursor' is invalid"},
                             HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
              }
             )
-async def get_all_tasks(SESSION: AsyncSession = Depends(get_async_session)) -> TaskResponseModel:
+async def get_all_tasks(LIMIT: int = Query(SETTINGS.PAGE_SIZE_DEFAULT, alias="limit", ge=1, le=SETTINGS.PAGE_SIZE_MAX),
+                        CURSOR: str | None = Query(None, alias="cursor"),
+                        STATUS: StatusTypes | None = Query(None, alias="status"),
+                        DUE_BEFORE: datetime | None = Query(None, alias="due_before"),
+                        DUE_AFTER: datetime | None = Query(None, alias="due_after"),
+                        IF_NONE_MATCH: str | None = Header(None, alias="If-None-Match"),
+                        SESSION: AsyncSession = Depends(get_async_read_session)) -> FastJSONResponse:
     """
-    Endpoint to retrieve all tasks.
+    Endpoint to retrieve a page of tasks.
 
     Args:
+        LIMIT (int): Maximum number of tasks to return.
+        CURSOR (str | None): Cursor returned with the previous page.
+        STATUS (StatusTypes | None): Only return tasks with this status.
+        DUE_BEFORE (datetime | None): Only return tasks due before this time.
+        DUE_AFTER (datetime | None): Only return tasks due after this time.
+        IF_NONE_MATCH (str | None): ETag(s) of the client's cached copy of the page.
         SESSION (AsyncSession): Injected SQLAlchemy async session.
 
     Returns:
-        list[TaskResponseModel]: A list of all tasks.
+        FastJSONResponse: The requested page of tasks and the cursor for the next page, serialised straight
+                          from the selected rows, or an empty 304 (Not Modified) response if the client's
+                          copy is current.
+
+    Raises:
+        HTTPException: 400 (Bad Request) error if the cursor is invalid.
+    """
+    try:
+        PAGE = await read_all_tasks(SESSION, LIMIT, CURSOR, STATUS, DUE_BEFORE, DUE_AFTER)
+    except ValueError as EXCEPTION:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=str(EXCEPTION))
+
+    ETAG = page_etag(((TASK["id"], TASK["version"]) for TASK in PAGE["items"]), PAGE["next_cursor"])
+    if etag_matches(IF_NONE_MATCH, ETAG):
+        return not_modified(ETAG)
+
+    return FastJSONResponse(PAGE, headers={"ETag": ETAG, "Cache-Control": "no-cache"})
+
+
+@router.get("/export",
+            response_class=StreamingResponse,
+            summary="Export all tasks",
+            description="Stream every task as newline delimited JSON (default) or CSV.",
+             responses={
+                 HTTPStatus.OK: {"description": "Successful Response",
+                        "content": {
+                            "application/x-ndjson": {
+                                "example": '{"id":1,"title":"string","description":"string","status":"Pending","due_date":"2025-04-23T16:19:35.730000+00:00","version":1}\n'
+                                },
+                            "text/csv": {
+                                "example": "id,title,description,status,due_date,version\r\n1,string,string,Pending,2025-04-23T16:19:35.730000+00:00,1\r\n"
+                                }
+                            }},
+                            HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
+             })
+async def export_tasks(FORMAT: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+                       SESSION_FACTORY: sessionmaker = Depends(get_async_read_session_factory)) -> StreamingResponse:
+    """
+    Endpoint to export every task.
+
+    The export is read through a server-side cursor and written in chunks, so memory use stays flat
+    and the first bytes are sent before the whole table has been read.
+
+    Args:
+        FORMAT (Literal["ndjson", "csv"]): The export format.
+        SESSION_FACTORY (sessionmaker): Injected SQLAlchemy async session factory.
+
+    Returns:
+        StreamingResponse: The streamed export.
+    """
+    MEDIA_TYPE = "text/csv" if FORMAT == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        generate_export(SESSION_FACTORY, FORMAT),
+        media_type=MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{FORMAT}"'}
+    )
+
+
+@router.get("/search", response_model=TaskPageModel,
+            summary="Search tasks",
+            description="Retrieve a page of tasks whose title or description matches 'q', most relevant first. "
+                        "Whole words are matched by full-text search and partial words by substring. "
+                        "Pass the returned 'next_cursor' back as 'cursor' to fetch the following page.",
+             responses={
+                 HTTPStatus.OK: {"description": "Successful Response",
+                        "content": {
+                            "application/json": {
+                                "example": {"items": [{"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z", "version": 1}],
+                                            "next_cursor": "WzAuMDYwNzk2NzksMV0"}
+                                }
+                            }},
+                            HTTPStatus.BAD_REQUEST: {"description": "The provided 'cursor' is invalid"},
+                            HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
+             }
+            )
+async def search_all_tasks(QUERY: str = Query(..., alias="q", min_length=1, max_length=200),
+                           LIMIT: int = Query(SETTINGS.PAGE_SIZE_DEFAULT, alias="limit", ge=1, le=SETTINGS.PAGE_SIZE_MAX),
+                           CURSOR: str | None = Query(None, alias="cursor"),
+                           STATUS: StatusTypes | None = Query(None, alias="status"),
+                           SESSION: AsyncSession = Depends(get_async_read_session)) -> FastJSONResponse:
     """
-    return await read_all_tasks(SESSION)
+    Endpoint to search tasks by the words in their title and description.
+
+    Args:
+        QUERY (str): The search query.
+        LIMIT (int): Maximum number of tasks to return.
+        CURSOR (str | None): Cursor returned with the previous page of results.
+        STATUS (StatusTypes | None): Only return tasks with this status.
+        SESSION (AsyncSession): Injected SQLAlchemy async session.
+
+    Returns:
+        FastJSONResponse: The requested page of matching tasks and the cursor for the next page.
+
+    Raises:
+        HTTPException: 400 (Bad Request) error if the cursor is invalid.
+    """
+    try:
+        PAGE = await search_tasks(SESSION, QUERY, LIMIT, CURSOR, STATUS)
+    except ValueError as EXCEPTION:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=str(EXCEPTION))
+    return FastJSONResponse(PAGE)
+
+
+@router.get("/stats", response_model=TaskStatsModel,
+            summary="Get task counts",
+            description="Retrieve the number of tasks with each status, and the number of unfinished tasks that are overdue or due within the next 7 days.",
+             responses={
+                 HTTPStatus.OK: {"description": "Successful Response",
+                        "content": {
+                            "application/json": {
+                                "example": {"total": 12, "by_status": {"Pending": 5, "In Progress": 4, "Done": 3}, "overdue": 2, "due_within_week": 6}
+                                }
+                            }},
+                            HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
+             })
+async def get_task_stats(SESSION: AsyncSession = Depends(get_async_read_session)) -> TaskStatsModel:
+    """
+    Endpoint to retrieve summary counts of the tasks.
+
+    Args:
+        SESSION (AsyncSession): Injected SQLAlchemy async session.
+
+    Returns:
+        TaskStatsModel: The task counts.
+    """
+    return await read_task_stats(SESSION)
+
+
+@router.get("/events",
+            response_class=StreamingResponse,
+            summary="Subscribe to task changes",
+            description="Server-Sent Events stream of 'created', 'updated' and 'deleted' task deltas. "
+                        "A 'resync' event means the client should re-fetch the task list.",
+             responses={
+                 HTTPStatus.OK: {"description": "Successful Response",
+                        "content": {
+                            "text/event-stream": {
+                                "example": 'event: updated\ndata: {"type":"updated","id":1,"task":{"id":1,"title":"string","description":"string","status":"Done","due_date":"2025-04-23T16:19:35.730000Z","version":2}}\n\n'
+                                }
+                            }},
+                            HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
+             })
+async def get_task_events(BROKER: TaskEventBroker = Depends(get_task_event_broker)) -> StreamingResponse:
+    """
+    Endpoint to subscribe to task changes.
+
+    Args:
+        BROKER (TaskEventBroker): Injected task event broker.
+
+    Returns:
+        StreamingResponse: The event stream.
+    """
+    return StreamingResponse(
+        generate_task_events(BROKER),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/{ID}/", 
@@ -83,22 +438,27 @@ async def get_all_tasks(SESSION: AsyncSession = Depends(get_async_session)) -> T
                  HTTPStatus.OK: {"description": "Successful Response",
                         "content": {
                             "application/json": {
-                                "example": {"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z"}
+                                "example": {"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z", "version": 1}
                                 }
                             }},
+                            HTTPStatus.NOT_MODIFIED: {"description": "The task matches the ETag sent in 'If-None-Match'"},
                             HTTPStatus.BAD_REQUEST: {"description": "No task exists with the provided 'id'"},
                             HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
              })
-async def get_task(ID: int, SESSION: AsyncSession = Depends(get_async_session)) -> TaskResponseModel:
+async def get_task(ID: int,
+                   IF_NONE_MATCH: str | None = Header(None, alias="If-None-Match"),
+                   SESSION: AsyncSession = Depends(get_async_read_session)) -> FastJSONResponse:
     """
     Endpoint to retrieve a task by ID.
 
     Args:
         ID (int): Task ID.
+        IF_NONE_MATCH (str | None): ETag(s) of the client's cached copy of the task.
         SESSION (AsyncSession): Injected SQLAlchemy async session.
 
     Returns:
-        TaskResponseModel: The task with the specified ID.
+        FastJSONResponse: The task with the specified ID, or an empty 304 (Not Modified)
+                          response if the client's copy is current.
 
     Raises:
         HTTPException: 400 (Bad Request) error if the task does not exist.
@@ -106,42 +466,79 @@ async def get_task(ID: int, SESSION: AsyncSession = Depends(get_async_session))
     TASK = await read_task(ID, SESSION)
     
     if TASK:
-        return TASK
+        ETAG = task_etag(TASK.id, TASK.version)
+        if etag_matches(IF_NONE_MATCH, ETAG):
+            return not_modified(ETAG)
+
+        return FastJSONResponse(TASK.model_dump(), headers={"ETag": ETAG, "Cache-Control": "no-cache"})
     raise_bad_request(ID)
 
 
 @router.patch("/{ID}/", 
               response_model=TaskResponseModel,
               summary="Update a task's status",
-              description="Update the status of an existing task using its ID. Other fields remain unchanged.",
+              description="Update the status of an existing task using its ID. Other fields remain unchanged. "
+                          "Send the task's ETag in 'If-Match', or its version as 'expected_version', to only apply "
+                          "the update if nobody else has changed the task since it was read. Otherwise the last "
+                          "update wins, and may be written in a batch with other updates.",
              responses={
                  HTTPStatus.OK: {"description": "Successful Response",
                         "content": {
                             "application/json": {
-                                "example": {"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z"}
+                                "example": {"id": 1, "title": "string", "description": "string", "status": "Pending", "due_date": "2025-04-23T16:19:35.730Z", "version": 1}
                                 }
                             }},
                             HTTPStatus.BAD_REQUEST: {"description": "No task exists with the provided 'id'"},
+                            HTTPStatus.CONFLICT: {"description": "The task is not at 'expected_version'"},
+                            HTTPStatus.PRECONDITION_FAILED: {"description": "The task does not match the ETag sent in 'If-Match'"},
                             HTTPStatus.INTERNAL_SERVER_ERROR: {"description": "Internal Server Error"}
              })
-async def patch_status(ID: int, TASK: TaskUpdateModel, SESSION: AsyncSession = Depends(get_async_session)) -> dict:
+async def patch_status(ID: int,
+                       TASK: TaskUpdateModel,
+                       RESPONSE: Response,
+                       IF_MATCH: str | None = Header(None, alias="If-Match"),
+                       EXPECTED_VERSION: int | None = Query(None, alias="expected_version", ge=1),
+                       SESSION: AsyncSession = Depends(get_async_session)) -> dict:
     """
     Endpoint to update the status of a task.
 
+    When status batching is enabled, unconditional updates are written in batches with other
+    updates (see StatusUpdateBatcher). Conditional updates are always written on their own, as
+    their version check must see the task as it is at that moment.
+
     Args:
         ID (int): ID of the task to be updated.
         TASK (TaskUpdateModel): The new status to apply.
+        RESPONSE (Response): The outgoing response, used to set the updated task's ETag header.
+        IF_MATCH (str | None): ETag(s) the task must currently match for the update to be applied.
+        EXPECTED_VERSION (int | None): Version the task must currently be at for the update to be applied.
         SESSION (AsyncSession): Injected SQLAlchemy async session.
 
     Returns:
         TaskResponseModel: The updated task.
 
     Raises:
-        HTTPException: 400 (Bad Request) error if the task does not exist.
+        HTTPException: 400 (Bad Request) error if the task does not exist, 412 (Precondition Failed) if it
+                       does not match 'If-Match', or 409 (Conflict) if it is not at 'expected_version'.
     """
-    UPDATED_TASK = await update_task(ID, TASK, SESSION)
+    EXPECTED_VERSIONS = if_match_versions(IF_MATCH, ID)
+    if EXPECTED_VERSION is not None:
+        EXPECTED_VERSIONS = [EXPECTED_VERSION] if EXPECTED_VERSIONS is None else \
+            [VERSION for VERSION in EXPECTED_VERSIONS if VERSION == EXPECTED_VERSION]
+
+    BATCHER = get_status_update_batcher()
+    try:
+        if BATCHER is not None and EXPECTED_VERSIONS is None:
+            UPDATED_TASK = await BATCHER.submit(ID, TASK)
+        else:
+            UPDATED_TASK = await update_task(ID, TASK, SESSION, EXPECTED_VERSIONS)
+    except TaskVersionConflictError as EXCEPTION:
+        STATUS_CODE = HTTPStatus.PRECONDITION_FAILED if IF_MATCH is not None else HTTPStatus.CONFLICT
+        raise HTTPException(status_code=STATUS_CODE, detail=str(EXCEPTION),
+                            headers={"ETag": task_etag(ID, EXCEPTION.CURRENT_VERSION)})
 
     if UPDATED_TASK:
+        RESPONSE.headers["ETag"] = task_etag(UPDATED_TASK.id, UPDATED_TASK.version)
         return UPDATED_TASK
     raise_bad_request(ID)
 
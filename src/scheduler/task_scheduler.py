@@ -0,0 +1,259 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+from sqlalchemy import text, tuple_, literal_column
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from db.crud.crud import batched
+from db.crud.idempotency import purge_idempotency_keys
+from db.tables.task import Task
+from events.task_events import publish_task_events
+from logger import LOGGER
+from models.tasks import TaskResponseModel
+from settings import SETTINGS
+from utils.global_constants import SchedulerConstants
+
+# A scheduled job receives the window (SINCE, UNTIL] elapsed since its previous run
+ScheduledJob = Callable[[datetime, datetime], Awaitable[None]]
+
+# Matches the predicate of the partial index over open tasks. The status is compared with a literal
+# rather than a bound parameter, so PostgreSQL can prove a prepared statement may use the index.
+OPEN_TASKS = Task.status != literal_column("'DONE'")
+
+
+class TaskScheduler:
+    """
+    Runs periodic jobs in a single worker process.
+
+    Every worker starts a scheduler, but only the one holding a PostgreSQL session-level advisory
+    lock runs the jobs. The lock is held on a dedicated connection, opened outside the app's
+    connection pool, for as long as the leader is alive; if the leader dies, its connection closes,
+    the lock is released and another worker takes over on its next tick. Other databases are assumed to be served by a single process, which
+    always leads.
+
+    Jobs are given the window of time elapsed since the previous tick, so each run only handles
+    what changed within it. A worker that becomes leader starts one interval back, so a handover
+    repeats (rather than misses) at most one interval.
+
+    Methods:
+        start(): Start running the jobs in the background.
+        stop(): Stop running the jobs and give up leadership.
+        tick(NOW): Run every job once, if this worker is the leader.
+    """
+    def __init__(self, ENGINE: AsyncEngine, JOBS: list[ScheduledJob],
+                 INTERVAL_SECONDS: float = SETTINGS.SCHEDULER_INTERVAL_SECONDS,
+                 LOCK_KEY: int = SchedulerConstants.LOCK_KEY):
+        """
+        Args:
+            ENGINE (AsyncEngine): The primary database's engine, used for leader election.
+            JOBS (list[ScheduledJob]): The jobs to run on every tick, in order.
+            INTERVAL_SECONDS (float): The time between ticks.
+            LOCK_KEY (int): The advisory lock identifying the leader.
+        """
+        self.ENGINE = ENGINE
+        self.JOBS = JOBS
+        self.INTERVAL = timedelta(seconds=INTERVAL_SECONDS)
+        self.LOCK_KEY = LOCK_KEY
+        # The leader holds its lock connection indefinitely, so it is not taken from the pool serving
+        # requests. Connections from this engine are closed, rather than pooled, when released.
+        self.LOCK_ENGINE = create_async_engine(ENGINE.url, poolclass=NullPool)
+        self.LOCK_CONNECTION: AsyncConnection | None = None
+        self.LAST_RUN: datetime | None = None
+        self.TASK: asyncio.Task | None = None
+
+    async def is_leader(self) -> bool:
+        """
+        Retrieve whether this worker should run the jobs, trying to become the leader if there is none.
+
+        Returns:
+            bool: True if this worker holds the advisory lock (or the database is not PostgreSQL).
+        """
+        if self.ENGINE.dialect.name != "postgresql":
+            return True
+
+        if self.LOCK_CONNECTION is not None:
+            try:
+                await self.LOCK_CONNECTION.execute(text("SELECT 1"))
+                await self.LOCK_CONNECTION.commit()
+                return True
+            except DBAPIError as EXCEPTION:
+                # The lock went with the connection
+                LOGGER.warning(f"Scheduler lost its leader lock: {EXCEPTION}")
+                await self.LOCK_CONNECTION.invalidate()
+                await self.LOCK_CONNECTION.close()
+                self.LOCK_CONNECTION = None
+                self.LAST_RUN = None
+
+        CONNECTION = await self.LOCK_ENGINE.connect()
+        LOCKED = (await CONNECTION.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.LOCK_KEY})).scalar()
+        # Session-level locks outlive the transaction, so the connection is not left idle in one
+        await CONNECTION.commit()
+        if not LOCKED:
+            await CONNECTION.close()
+            return False
+        self.LOCK_CONNECTION = CONNECTION
+        return True
+
+    async def tick(self, NOW: datetime | None = None) -> None:
+        """
+        Run every job once, if this worker is the leader.
+
+        A failing job is logged and does not stop the jobs after it, or later ticks.
+
+        Args:
+            NOW (datetime | None): The current time. Defaults to the system clock.
+        """
+        if not await self.is_leader():
+            self.LAST_RUN = None
+            return
+
+        NOW = NOW or datetime.now(timezone.utc)
+        SINCE = self.LAST_RUN or NOW - self.INTERVAL
+        for JOB in self.JOBS:
+            try:
+                await JOB(SINCE, NOW)
+            except Exception as EXCEPTION:
+                LOGGER.exception(f"Scheduled job {getattr(JOB, '__name__', type(JOB).__name__)} failed: {EXCEPTION}")
+        self.LAST_RUN = NOW
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as EXCEPTION:
+                # e.g. the database is unreachable. Try again on the next tick.
+                LOGGER.warning(f"Scheduler tick failed: {EXCEPTION}")
+            await asyncio.sleep(self.INTERVAL.total_seconds())
+
+    def start(self) -> None:
+        """
+        Start running the jobs in the background.
+        """
+        self.TASK = asyncio.create_task(self.run(), name="task-scheduler")
+
+    async def stop(self) -> None:
+        """
+        Stop running the jobs and release the advisory lock, so another worker can take over at once.
+
+        Failing to close the lock's connection is logged rather than raised, so it never interrupts shutdown.
+        """
+        if self.TASK is not None:
+            self.TASK.cancel()
+            try:
+                await self.TASK
+            except asyncio.CancelledError:
+                pass
+            self.TASK = None
+
+        if self.LOCK_CONNECTION is not None:
+            # Closing the connection ends its session, which releases the lock
+            try:
+                await self.LOCK_CONNECTION.close()
+            except Exception as EXCEPTION:
+                # e.g. the database already dropped the connection, and the lock with it
+                LOGGER.warning(f"Scheduler could not close its leader lock connection: {EXCEPTION}")
+            self.LOCK_CONNECTION = None
+        await self.LOCK_ENGINE.dispose()
+
+
+class DueDateScanner:
+    """
+    Scheduled job publishing an event for each open task whose due date has passed, or is approaching.
+
+    Each run only reads the tasks whose due date (or due soon time) fell within the window since
+    the previous run, in keyset batches over the partial index on open tasks' (due_date, id). The
+    cost of tracking deadlines is therefore proportional to the tasks crossing them, rather than to
+    every client comparing every task's due date.
+
+    Tasks created or moved to a due date already in the past are not reported, as their change
+    events already carry the due date.
+    """
+    def __init__(self, SESSION_FACTORY: sessionmaker, BATCH_SIZE: int = SETTINGS.SCHEDULER_BATCH_SIZE,
+                 DUE_SOON_SECONDS: float = SETTINGS.DUE_SOON_SECONDS):
+        """
+        Args:
+            SESSION_FACTORY (sessionmaker): Creates sessions on the primary database.
+            BATCH_SIZE (int): The number of tasks read (and published) per query.
+            DUE_SOON_SECONDS (float): How long before its due date a task is reported as due soon. 0 disables them.
+        """
+        self.SESSION_FACTORY = SESSION_FACTORY
+        self.BATCH_SIZE = BATCH_SIZE
+        self.DUE_SOON = timedelta(seconds=DUE_SOON_SECONDS)
+
+    async def __call__(self, SINCE: datetime, UNTIL: datetime) -> None:
+        await self.publish_due(SINCE, UNTIL, "overdue")
+        if self.DUE_SOON:
+            await self.publish_due(SINCE + self.DUE_SOON, UNTIL + self.DUE_SOON, "due_soon")
+
+    async def publish_due(self, AFTER: datetime, UNTIL: datetime, TYPE: str) -> int:
+        """
+        Publish an event for each open task due within (AFTER, UNTIL].
+
+        Each batch is published in chunks of at most EVENT_MAX_BULK_EVENTS tasks, so a busy window is
+        sent as individual events rather than collapsed into a single 'resync'.
+
+        Args:
+            AFTER (datetime): The start of the window, exclusive.
+            UNTIL (datetime): The end of the window, inclusive.
+            TYPE (str): The event type, 'overdue' or 'due_soon'.
+
+        Returns:
+            int: The number of tasks published.
+        """
+        PUBLISHED = 0
+        async for TASKS in self.scan(AFTER, UNTIL):
+            for CHUNK in batched(TASKS, max(1, SETTINGS.EVENT_MAX_BULK_EVENTS)):
+                await publish_task_events(TYPE, CHUNK)
+            PUBLISHED += len(TASKS)
+        return PUBLISHED
+
+    async def scan(self, AFTER: datetime, UNTIL: datetime):
+        """
+        Read the open tasks due within (AFTER, UNTIL] in keyset batches ordered by (due_date, id).
+
+        Args:
+            AFTER (datetime): The start of the window, exclusive.
+            UNTIL (datetime): The end of the window, inclusive.
+
+        Yields:
+            list[TaskResponseModel]: The next batch of tasks.
+        """
+        QUERY = (select(Task).where(OPEN_TASKS, Task.due_date <= UNTIL)
+                 .order_by(Task.due_date, Task.id).limit(self.BATCH_SIZE))
+        CONDITION = Task.due_date > AFTER
+        while True:
+            async with self.SESSION_FACTORY() as SESSION:
+                ROWS = (await SESSION.execute(QUERY.where(CONDITION))).scalars().all()
+            if not ROWS:
+                return
+            yield [TaskResponseModel.model_validate(ROW.to_dict()) for ROW in ROWS]
+            if len(ROWS) < self.BATCH_SIZE:
+                return
+            CONDITION = tuple_(Task.due_date, Task.id) > (ROWS[-1].due_date, ROWS[-1].id)
+
+
+class IdempotencyKeyPurger:
+    """
+    Scheduled job deleting the idempotency keys that have expired, in batches.
+
+    Each batch is deleted in its own transaction, so a large backlog of expired keys never holds
+    locks for long. Expired keys are already ignored by task creation, so purging only reclaims space.
+    """
+    def __init__(self, SESSION_FACTORY: sessionmaker, BATCH_SIZE: int = SETTINGS.SCHEDULER_BATCH_SIZE):
+        """
+        Args:
+            SESSION_FACTORY (sessionmaker): Creates sessions on the primary database.
+            BATCH_SIZE (int): The number of keys deleted per query.
+        """
+        self.SESSION_FACTORY = SESSION_FACTORY
+        self.BATCH_SIZE = BATCH_SIZE
+
+    async def __call__(self, SINCE: datetime, UNTIL: datetime) -> None:
+        while True:
+            async with self.SESSION_FACTORY() as SESSION:
+                DELETED = await purge_idempotency_keys(SESSION, UNTIL, self.BATCH_SIZE)
+            if DELETED < self.BATCH_SIZE:
+                return
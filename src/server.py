@@ -0,0 +1,264 @@
+"""
+Production entry point for the HMCTS Task Manager.
+
+Imports the app once, binds the listening socket, then forks one uvicorn worker per available CPU
+(or WEB_CONCURRENCY workers). The workers inherit the already imported app, so they start quickly,
+and share the socket, so the kernel spreads connections across them. Workers that die are replaced.
+
+On SIGTERM or SIGINT every worker stops accepting connections, waits up to
+SERVER_GRACEFUL_TIMEOUT_SECONDS for in-flight requests to finish, then runs the app's lifespan
+teardown (which disposes of its connection pool) before exiting.
+
+Run from the src/ directory, for example:
+
+    python -m server
+    python -m server --workers 4 --port 8080
+
+uvloop and httptools are used when they are installed.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+import uvicorn
+from settings import SETTINGS
+
+# uvicorn's exit status when the app's lifespan startup fails
+STARTUP_FAILURE = 3
+
+# Seconds to wait, after the graceful timeout, for a worker's lifespan teardown before it is killed
+TEARDOWN_SECONDS = 10.0
+
+
+def available_cpus(CGROUP_CPU_MAX: Path = Path("/sys/fs/cgroup/cpu.max")) -> int:
+    """
+    Retrieve the number of CPUs this process may use.
+
+    Unlike os.cpu_count(), this respects the process's CPU affinity and any CPU quota applied to
+    its container through cgroups v2.
+
+    Args:
+        CGROUP_CPU_MAX (Path): The cgroup's CPU quota file.
+
+    Returns:
+        int: The number of CPUs, at least 1.
+    """
+    try:
+        CPUS = len(os.sched_getaffinity(0))
+    except AttributeError:
+        CPUS = os.cpu_count() or 1
+
+    try:
+        QUOTA, PERIOD = CGROUP_CPU_MAX.read_text().split()
+        if QUOTA != "max":
+            CPUS = min(CPUS, math.ceil(int(QUOTA) / int(PERIOD)))
+    except (OSError, ValueError):
+        pass
+    return max(1, CPUS)
+
+
+def build_config(ARGS: argparse.Namespace) -> uvicorn.Config:
+    """
+    Build the uvicorn configuration shared by every worker.
+
+    Args:
+        ARGS (argparse.Namespace): The parsed command line.
+
+    Returns:
+        uvicorn.Config: The configuration.
+    """
+    return uvicorn.Config(
+        "main:app",
+        host=ARGS.host,
+        port=ARGS.port,
+        # uvloop and httptools when installed, otherwise asyncio and h11
+        loop="auto",
+        http="auto",
+        lifespan="on",
+        backlog=ARGS.backlog,
+        timeout_keep_alive=ARGS.keep_alive,
+        timeout_graceful_shutdown=ARGS.graceful_timeout,
+        log_level=SETTINGS.LOG_LEVEL.lower()
+    )
+
+
+def run_worker(CONFIG: uvicorn.Config, SOCKET: socket.socket) -> None:
+    """
+    Serve requests from the shared socket until the worker is told to stop.
+
+    Args:
+        CONFIG (uvicorn.Config): The loaded configuration, inherited from the supervisor.
+        SOCKET (socket.socket): The listening socket, inherited from the supervisor.
+    """
+    from logger import LISTENER
+
+    SERVER = uvicorn.Server(CONFIG)
+    try:
+        SERVER.run(sockets=[SOCKET])
+    finally:
+        # Forked workers exit without running atexit handlers, so flush the log queue here
+        LISTENER.stop()
+    if not SERVER.started:
+        sys.exit(STARTUP_FAILURE)
+
+
+class WorkerSupervisor:
+    """
+    Pre-forking process manager that keeps a fixed number of uvicorn workers running.
+
+    Attributes:
+        CONFIG (uvicorn.Config): The worker configuration.
+        WORKERS (int): The number of workers to keep running.
+        PROCESSES (list[multiprocessing.Process]): The running workers.
+        SHOULD_EXIT (threading.Event): Set when the supervisor receives SIGTERM or SIGINT.
+
+    Methods:
+        run(): Start the workers and supervise them until told to stop.
+    """
+    def __init__(self, CONFIG: uvicorn.Config, WORKERS: int):
+        """
+        Args:
+            CONFIG (uvicorn.Config): The worker configuration.
+            WORKERS (int): The number of workers to keep running.
+        """
+        self.CONFIG = CONFIG
+        self.WORKERS = WORKERS
+        self.PROCESSES = []
+        self.SHOULD_EXIT = threading.Event()
+        self.SOCKET = None
+        # Forking shares the imported app with every worker
+        self.CONTEXT = multiprocessing.get_context("fork")
+
+    def spawn(self) -> None:
+        """
+        Fork a new worker serving the shared socket, and add it to PROCESSES.
+        """
+        PROCESS = self.CONTEXT.Process(target=run_worker, args=(self.CONFIG, self.SOCKET), name="uvicorn-worker")
+        PROCESS.start()
+        self.PROCESSES.append(PROCESS)
+
+    def handle_exit(self, SIGNAL: int, FRAME) -> None:
+        """
+        SIGTERM and SIGINT handler. Tells the supervisor loop to stop the workers.
+
+        Args:
+            SIGNAL (int): The signal received.
+            FRAME: The stack frame interrupted by the signal.
+        """
+        self.SHOULD_EXIT.set()
+
+    def run(self) -> int:
+        """
+        Start the workers and supervise them until told to stop.
+
+        Returns:
+            int: The exit status: 0 after a graceful shutdown, or STARTUP_FAILURE if a worker could not start the app.
+        """
+        # Preload the app before forking, so import errors surface once and workers start instantly
+        self.CONFIG.load()
+        self.SOCKET = self.CONFIG.bind_socket()
+        for SIGNAL in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(SIGNAL, self.handle_exit)
+
+        STATUS = 0
+        for _ in range(self.WORKERS):
+            self.spawn()
+
+        while not self.SHOULD_EXIT.wait(0.5):
+            for PROCESS in [PROCESS for PROCESS in self.PROCESSES if not PROCESS.is_alive()]:
+                self.PROCESSES.remove(PROCESS)
+                if PROCESS.exitcode == STARTUP_FAILURE:
+                    # Replacing the worker would fail the same way, e.g. on an outdated schema
+                    STATUS = STARTUP_FAILURE
+                    self.SHOULD_EXIT.set()
+                    break
+                self.spawn()
+
+        self.stop()
+        self.SOCKET.close()
+        return STATUS
+
+    def stop(self) -> None:
+        """
+        Ask every worker to shut down gracefully, killing any that do not exit in time.
+        """
+        for PROCESS in self.PROCESSES:
+            if PROCESS.is_alive():
+                PROCESS.terminate()
+
+        DEADLINE = time.monotonic() + self.CONFIG.timeout_graceful_shutdown + TEARDOWN_SECONDS
+        for PROCESS in self.PROCESSES:
+            PROCESS.join(max(0.0, DEADLINE - time.monotonic()))
+            if PROCESS.is_alive():
+                PROCESS.kill()
+                PROCESS.join()
+
+
+def parse_args(ARGV: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse the command line, defaulting each option to its setting.
+
+    Args:
+        ARGV (list[str] | None): The arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed command line.
+    """
+    PARSER = argparse.ArgumentParser(description="Run the HMCTS Task Manager with multiple uvicorn workers.")
+    PARSER.add_argument("--workers", type=int, default=SETTINGS.WEB_CONCURRENCY,
+                        help="Number of worker processes (default: WEB_CONCURRENCY, or one per available CPU).")
+    PARSER.add_argument("--host", default=SETTINGS.SERVER_HOST, help="Interface to listen on.")
+    PARSER.add_argument("--port", type=int, default=SETTINGS.SERVER_PORT, help="Port to listen on.")
+    PARSER.add_argument("--backlog", type=int, default=SETTINGS.SERVER_BACKLOG,
+                        help="Maximum number of connections waiting to be accepted.")
+    PARSER.add_argument("--keep-alive", type=int, default=SETTINGS.SERVER_KEEP_ALIVE_SECONDS,
+                        help="Seconds an idle keep-alive connection is held open.")
+    PARSER.add_argument("--graceful-timeout", type=float, default=SETTINGS.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+                        help="Seconds a stopping worker waits for in-flight requests.")
+    return PARSER.parse_args(ARGV)
+
+
+def main(ARGV: list[str] | None = None) -> int:
+    """
+    Run the server until it is told to stop.
+
+    With a single worker, or where fork is unavailable, uvicorn serves requests in this process.
+    Otherwise a WorkerSupervisor forks the workers, which share a temporary Prometheus multiprocess
+    directory unless PROMETHEUS_MULTIPROC_DIR is already set.
+
+    Args:
+        ARGV (list[str] | None): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit status: 0 after a graceful shutdown, or STARTUP_FAILURE if the app could not start.
+    """
+    ARGS = parse_args(ARGV)
+    WORKERS = ARGS.workers or available_cpus()
+
+    if WORKERS == 1 or not hasattr(os, "fork"):
+        SERVER = uvicorn.Server(build_config(ARGS))
+        SERVER.run()
+        return 0 if SERVER.started else STARTUP_FAILURE
+
+    # Metrics from every worker are aggregated through files in a shared directory, which must be
+    # chosen before the app (and prometheus_client) is imported
+    METRICS_DIRECTORY = None
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        METRICS_DIRECTORY = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+    try:
+        return WorkerSupervisor(build_config(ARGS), WORKERS).run()
+    finally:
+        if METRICS_DIRECTORY:
+            shutil.rmtree(METRICS_DIRECTORY, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
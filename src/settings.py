@@ -0,0 +1,232 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Literal, Optional
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Environment variables always take precedence. The .env files are optional and are only read for
+# variables that are not already set: the repository root's .env when running from a checkout,
+# then a .env in the working directory.
+ENV_FILES = (Path(__file__).resolve().parent.parent / ".env", Path(".env"))
+
+
+class Settings(BaseSettings):
+    """
+    Validated application settings, read once from the environment (and optional .env files).
+
+    Attributes:
+        DATABASE_URL (Optional[str]): Full SQLAlchemy database URL. Overrides the POSTGRES_* settings when set.
+        POSTGRES_URI_PREFIX (str): SQLAlchemy dialect/driver prefix of the database URL.
+        POSTGRES_USER (str): Database user.
+        POSTGRES_PASSWORD (str): Database password.
+        POSTGRES_HOST (str): Database host.
+        POSTGRES_CONTAINER_PORT (int): Database port.
+        POSTGRES_DB (str): Database name.
+        DATABASE_READ_URL (Optional[str]): SQLAlchemy URL of a read replica. When set, read-only endpoints
+                                           query the replica instead of the primary database.
+        READ_YOUR_WRITES_SECONDS (float): How long a client's reads are sent to the primary after it writes,
+                                          so it sees its own writes despite replication lag.
+
+        DB_POOL_SIZE (int): The number of connections kept open in each worker's pool.
+        DB_MAX_OVERFLOW (int): The number of extra connections a worker may open when its pool is exhausted.
+        DB_POOL_TIMEOUT (float): Seconds to wait for a connection before giving up.
+        DB_POOL_RECYCLE (int): Seconds after which a connection is replaced. -1 disables recycling.
+        DB_POOL_PRE_PING (bool): Whether to test connections for liveness when they are checked out.
+        DB_STATEMENT_CACHE_SIZE (int): The number of prepared statements cached per asyncpg connection.
+                                       Set to 0 when connecting through PgBouncer in transaction mode.
+        DB_ECHO (Literal["false", "true", "debug"]): SQL statement logging. Logging every statement is
+                                                    expensive, so this should stay 'false' outside of debugging.
+        SCHEMA_VERSION_CHECK (Literal["error", "warn", "off"]): What happens at startup when the database
+                                                              schema is not at the latest migration.
+
+        PAGE_SIZE_DEFAULT (int): The page size used when a client does not request one.
+        PAGE_SIZE_MAX (int): The largest page size a client may request.
+        EXPORT_BATCH_SIZE (int): The number of rows fetched from the server-side cursor per export chunk.
+        BULK_BATCH_SIZE (int): The maximum number of rows written by a single bulk SQL statement.
+        BULK_MAX_ITEMS (int): The maximum number of tasks or IDs accepted by a single bulk request.
+        STATUS_BATCH_ENABLED (bool): Whether unconditional status updates are queued and written in batches,
+                                     rather than each in its own transaction.
+        STATUS_BATCH_DELAY_SECONDS (float): How long status updates are accumulated before a batch is written.
+        STATUS_BATCH_MAX_SIZE (int): The maximum number of status updates written per transaction.
+
+        TASK_CACHE_BACKEND (Literal["memory", "redis"]): The task cache backend.
+        TASK_CACHE_MAX_SIZE (int): The maximum number of tasks held by the in-process cache.
+        TASK_CACHE_TTL_SECONDS (float): How long a cached task may be served before it is re-read.
+        TASK_CACHE_KEY_PREFIX (str): Prefix applied to task keys in the Redis cache.
+        REDIS_URL (Optional[str]): Redis connection URL, required by the 'redis' cache backend.
+        SINGLE_FLIGHT_TTL_SECONDS (float): How long the result of a task or page read is shared with identical
+                                           reads that follow it. 0 only shares reads that overlap.
+
+        EVENT_QUEUE_SIZE (int): The number of undelivered change events buffered per subscriber.
+        EVENT_HEARTBEAT_SECONDS (float): How often an idle event stream sends a keep-alive comment.
+        EVENT_MAX_BULK_EVENTS (int): Bulk writes touching more tasks than this publish a single 'resync' event.
+
+        SCHEDULER_ENABLED (bool): Whether background jobs, such as the due date scan, are run.
+        SCHEDULER_INTERVAL_SECONDS (float): The time between runs of the background jobs.
+        SCHEDULER_BATCH_SIZE (int): The number of rows read or deleted per query by the background jobs.
+        DUE_SOON_SECONDS (float): How long before its due date an open task is reported as due soon. 0 disables it.
+        IDEMPOTENCY_KEY_TTL_SECONDS (float): How long the response to a request made with an Idempotency-Key is
+                                             replayed to retries of it.
+
+        LOG_LEVEL (str): The application log level.
+        LOG_FILE (str): The file application logs are written to.
+        LOG_FORMAT (Literal["json", "text"]): Whether log lines are written as JSON objects or plain text.
+        LOG_MAX_BYTES (int): The size at which the log file is rotated.
+        LOG_BACKUP_COUNT (int): The number of rotated log files kept.
+
+        RATE_LIMIT_ENABLED (bool): Whether each client's request rate is limited per route.
+        RATE_LIMIT_BACKEND (Literal["memory", "redis"]): Where rate limit buckets are held. 'memory' limits each
+                                                         worker separately; 'redis' shares the limits through REDIS_URL.
+        RATE_LIMIT_PER_SECOND (float): The sustained number of requests per second a client may make to each route.
+        RATE_LIMIT_BURST (int): The number of requests a client may make to a route in a burst.
+        RATE_LIMIT_ROUTES (dict[str, tuple[float, int]]): Per second rate and burst overrides keyed by method and
+                                                          route template, e.g. '{"GET /tasks/": [10, 20]}'.
+        RATE_LIMIT_MAX_KEYS (int): The maximum number of client/route buckets held by the 'memory' backend.
+        RATE_LIMIT_KEY_PREFIX (str): Prefix applied to rate limit keys in Redis.
+        SHED_MAX_IN_FLIGHT (int): New requests are refused with 503 while a worker is handling this many. 0 disables it.
+        SHED_POOL_WAIT_SECONDS (float): New requests are refused with 503 while a request has been waiting this long
+                                        for a database connection. 0 disables it.
+
+        GZIP_MINIMUM_SIZE (int): Responses smaller than this many bytes are sent uncompressed.
+        GZIP_COMPRESS_LEVEL (int): The gzip level (1-9) responses are compressed with on the fly.
+
+        WEB_CONCURRENCY (Optional[int]): The number of worker processes started by server.py. Defaults to one
+                                         per CPU available to the container. Each worker has its own
+                                         connection pool, so the pools must fit within max_connections.
+        SERVER_HOST (str): The interface server.py listens on.
+        SERVER_PORT (int): The port server.py listens on.
+        SERVER_BACKLOG (int): The maximum number of connections waiting to be accepted.
+        SERVER_KEEP_ALIVE_SECONDS (int): How long an idle keep-alive connection is held open.
+        SERVER_GRACEFUL_TIMEOUT_SECONDS (float): How long a stopping worker waits for in-flight requests
+                                                 before closing their connections.
+
+    Methods:
+        get_database_url(): Retrieve the SQLAlchemy database URL.
+    """
+    model_config = SettingsConfigDict(env_file=ENV_FILES, env_file_encoding="utf-8", extra="ignore", frozen=True)
+
+    # Database
+    DATABASE_URL: Optional[str] = None
+    POSTGRES_URI_PREFIX: str = "postgresql+asyncpg://"
+    POSTGRES_USER: str = "postgres"
+    POSTGRES_PASSWORD: str = ""
+    POSTGRES_HOST: str = "localhost"
+    POSTGRES_CONTAINER_PORT: int = 5432
+    POSTGRES_DB: str = "HmctsTasksDB"
+    DATABASE_READ_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = Field(5.0, ge=0)
+
+    # Connection pool
+    DB_POOL_SIZE: int = Field(5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(10, ge=0)
+    DB_POOL_TIMEOUT: float = Field(30.0, gt=0)
+    DB_POOL_RECYCLE: int = Field(1800, ge=-1)
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = Field(100, ge=0)
+    DB_ECHO: Literal["false", "true", "debug"] = "false"
+    SCHEMA_VERSION_CHECK: Literal["error", "warn", "off"] = "error"
+
+    # Pagination, export and bulk operations
+    PAGE_SIZE_DEFAULT: int = Field(100, ge=1)
+    PAGE_SIZE_MAX: int = Field(500, ge=1)
+    EXPORT_BATCH_SIZE: int = Field(1000, ge=1)
+    BULK_BATCH_SIZE: int = Field(1000, ge=1)
+    BULK_MAX_ITEMS: int = Field(100000, ge=1)
+    STATUS_BATCH_ENABLED: bool = False
+    STATUS_BATCH_DELAY_SECONDS: float = Field(0.005, gt=0)
+    STATUS_BATCH_MAX_SIZE: int = Field(500, ge=1)
+
+    # Task cache
+    TASK_CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    TASK_CACHE_MAX_SIZE: int = Field(10000, ge=1)
+    TASK_CACHE_TTL_SECONDS: float = Field(30.0, gt=0)
+    TASK_CACHE_KEY_PREFIX: str = "hmcts:task:"
+    REDIS_URL: Optional[str] = None
+    SINGLE_FLIGHT_TTL_SECONDS: float = Field(0.05, ge=0)
+
+    # Change feed
+    EVENT_QUEUE_SIZE: int = Field(1000, ge=1)
+    EVENT_HEARTBEAT_SECONDS: float = Field(15.0, gt=0)
+    EVENT_MAX_BULK_EVENTS: int = Field(100, ge=0)
+
+    # Background jobs
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_INTERVAL_SECONDS: float = Field(60.0, gt=0)
+    SCHEDULER_BATCH_SIZE: int = Field(500, ge=1)
+    DUE_SOON_SECONDS: float = Field(24 * 60 * 60, ge=0)
+    IDEMPOTENCY_KEY_TTL_SECONDS: float = Field(24 * 60 * 60, gt=0)
+
+    # Logging
+    LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+    LOG_FILE: str = "app.log"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_MAX_BYTES: int = Field(10 * 1024 * 1024, ge=1)
+    LOG_BACKUP_COUNT: int = Field(5, ge=0)
+
+    # Rate limiting and load shedding
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    RATE_LIMIT_PER_SECOND: float = Field(50.0, gt=0)
+    RATE_LIMIT_BURST: int = Field(200, ge=1)
+    RATE_LIMIT_ROUTES: dict[str, tuple[float, int]] = {}
+    RATE_LIMIT_MAX_KEYS: int = Field(100000, ge=1)
+    RATE_LIMIT_KEY_PREFIX: str = "hmcts:rate:"
+    SHED_MAX_IN_FLIGHT: int = Field(1000, ge=0)
+    SHED_POOL_WAIT_SECONDS: float = Field(1.0, ge=0)
+
+    # Response compression
+    GZIP_MINIMUM_SIZE: int = Field(1024, ge=0)
+    GZIP_COMPRESS_LEVEL: int = Field(5, ge=1, le=9)
+
+    # Server
+    WEB_CONCURRENCY: Optional[int] = Field(None, ge=1)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = Field(8000, ge=1, le=65535)
+    SERVER_BACKLOG: int = Field(2048, ge=1)
+    SERVER_KEEP_ALIVE_SECONDS: int = Field(5, ge=1)
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: float = Field(30.0, gt=0)
+
+    @model_validator(mode="after")
+    def validate_settings(self) -> "Settings":
+        """
+        Validates settings that depend on one another.
+
+        Returns:
+            Settings: The validated settings.
+
+        Raises:
+            ValueError: If the settings are inconsistent.
+        """
+        if self.PAGE_SIZE_DEFAULT > self.PAGE_SIZE_MAX:
+            raise ValueError("PAGE_SIZE_DEFAULT must not be greater than PAGE_SIZE_MAX.")
+        if self.TASK_CACHE_BACKEND == "redis" and not self.REDIS_URL:
+            raise ValueError("REDIS_URL must be set to use the 'redis' task cache backend.")
+        if self.RATE_LIMIT_BACKEND == "redis" and not self.REDIS_URL:
+            raise ValueError("REDIS_URL must be set to use the 'redis' rate limit backend.")
+        return self
+
+    def get_database_url(self) -> str:
+        """
+        Retrieve the SQLAlchemy database URL.
+
+        Returns:
+            str: DATABASE_URL if set, otherwise a URL built from the POSTGRES_* settings.
+        """
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
+        return (f"{self.POSTGRES_URI_PREFIX}{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+                f"@{self.POSTGRES_HOST}:{self.POSTGRES_CONTAINER_PORT}/{self.POSTGRES_DB}")
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Load the application settings. They are read and validated once, on first use.
+
+    Returns:
+        Settings: The application settings.
+    """
+    return Settings()
+
+
+SETTINGS = get_settings()
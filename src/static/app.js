@@ -7,17 +7,83 @@ const closeModalBtn = document.getElementById('closeModalBtn');
 const cancelBtn = document.getElementById('cancelBtn');
 const taskForm = document.getElementById('taskForm');
 
-/* Fetch tasks from the backend */
+const pageSize = 100;   // Well below any sensible server maximum; further pages are followed via next_cursor
+const pageCache = new Map();   // Page URL -> { etag, page }, used to revalidate pages with If-None-Match
+let idempotencyKey = crypto.randomUUID();   // Sent with every submission of the create task form until it succeeds
+
+/* Fetch a single page of tasks, reusing the cached copy when the backend reports it is unchanged */
+async function fetchPage(url) {
+    const cached = pageCache.get(url);
+    const response = await fetch(url, { headers: cached ? { 'If-None-Match': cached.etag } : {} });
+
+    if (response.status === 304) return { page: cached.page, changed: false };
+
+    const page = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) pageCache.set(url, { etag, page });
+    return { page, changed: true };
+}
+
+/* Fetch tasks from the backend, following the pagination cursor until every page has been read.
+   'changed' is false when every page matched the copy fetched previously. */
 async function fetchTasks() {
+    const tasks = [];
+    let changed = false;
+    let cursor = null;
+
     try {
-        const response = await fetch(apiUrl);
-        return await response.json();
+        do {
+            const params = new URLSearchParams({ limit: pageSize });
+            if (cursor) params.set('cursor', cursor);
+
+            const result = await fetchPage(`${apiUrl}/?${params}`);
+            tasks.push(...result.page.items);
+            changed = changed || result.changed;
+            cursor = result.page.next_cursor;
+        } while (cursor);
+        return { tasks, changed };
     } catch (error) {
         alert('An error occurred while fetching tasks.');
-        return [];
+        return { tasks, changed: false };
     }
 }
 
+/* Clear every status column and display the given tasks */
+function renderTasks(tasks) {
+    document.querySelectorAll('.task-list').forEach(taskList => taskList.replaceChildren());
+    tasks.forEach(task => displayTask(task));
+}
+
+/* Re-fetch tasks and redraw the board only if the backend reports a change */
+async function refreshTasks() {
+    const { tasks, changed } = await fetchTasks();
+    if (changed) renderTasks(tasks);
+}
+
+/* Apply a single task change pushed by the backend to the board */
+async function applyTaskEvent(event) {
+    // The backend could not describe the change incrementally (e.g. a large bulk write)
+    if (event.type === 'resync') return refreshTasks();
+
+    document.getElementById(`task-${event.id}`)?.remove();
+    if (event.type === 'deleted') return;
+
+    // Very large tasks are sent without their body, so fetch them instead
+    const task = event.task ?? await (await fetch(`${apiUrl}/${event.id}/`)).json();
+    displayTask(task);
+}
+
+/* Subscribe to the backend's change feed so the board stays current without polling */
+function subscribeToTaskEvents() {
+    const source = new EventSource(`${apiUrl}/events`);
+    // 'overdue' and 'due_soon' are sent as tasks reach their due date, or come within a day of it
+    ['created', 'updated', 'deleted', 'resync', 'overdue', 'due_soon'].forEach(type =>
+        source.addEventListener(type, message => applyTaskEvent(JSON.parse(message.data)))
+    );
+    // Changes may have been missed while disconnected (cheap when nothing changed, as unchanged pages return 304)
+    source.onopen = () => refreshTasks();
+}
+
 /* Update task due date colours based on their status */
 function updateTaskCards() {
     const taskCards = document.querySelectorAll('.task-card');
@@ -131,17 +197,20 @@ async function drop(event) {
         const taskData = await task.json();
         const newStatus = event.target.closest('.column').id.replace('-list', '').replace('pending', 'Pending').replace('in-progress', 'In Progress').replace('done', 'Done');
   
-        // Update task status
+        // Update task status, but only if nobody else has changed the task since it was fetched
         const response = await fetch(`${apiUrl}/${taskId}/`, {
             method: 'PATCH',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'If-Match': task.headers.get('ETag') ?? '*' },
             body: JSON.stringify({ status: newStatus })
         });
 
         if (response.ok) {
-            taskData.status = newStatus;
-            document.getElementById(`task-${taskId}`).remove();  // Remove the task from the current column
-            displayTask(taskData);  // Add the task to the new column
+            const updatedTask = await response.json();
+            document.getElementById(`task-${taskId}`)?.remove();  // Remove the task from the current column
+            displayTask(updatedTask);  // Add the task to the new column
+        } else if (response.status === 412) {
+            alert('This task was changed by someone else. The task list has been refreshed, please try again.');
+            refreshTasks();
         } else {
             alert('Error updating task status');
         }
@@ -157,7 +226,7 @@ async function deleteTask(taskId) {
 
         if (response.ok) {
             showToast('Task deleted successfully!');
-            document.getElementById(`task-${taskId}`).remove();
+            document.getElementById(`task-${taskId}`)?.remove();
         } else {
             alert('Error deleting task');
         }
@@ -188,17 +257,19 @@ taskForm.addEventListener('submit', async (event) => {
 
     const newTask = { title, description, status, due_date: new Date(dueDate).toISOString() };
 
-    // Submit the task
+    // Submit the task. Resubmitting the form after a failure or timeout reuses the key, so it never creates a duplicate.
     const response = await fetch(apiUrl, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: { 'Content-Type': 'application/json', 'Idempotency-Key': idempotencyKey },
         body: JSON.stringify(newTask)
     });
 
     if (response.ok) {
         const task = await response.json();
-        // Add the newly created task to the appropriate status column
+        // Add the newly created task to the appropriate status column (replacing it if the change feed got there first)
+        document.getElementById(`task-${task.id}`)?.remove();
         displayTask(task);
+        idempotencyKey = crypto.randomUUID();
         closeCreateTaskForm();
         showToast('Task created successfully!');
     } else {
@@ -228,8 +299,9 @@ function startMinuteUpdates() {
 
 /* Run when the page loads */
 window.onload = async () => {
-    const tasks = await fetchTasks();  // Fetch tasks from the backend
-    tasks.forEach(task => displayTask(task));  // Display each task in the appropriate status column
+    const { tasks } = await fetchTasks();  // Fetch tasks from the backend
+    renderTasks(tasks);  // Display each task in the appropriate status column
     setMinDueDate();    // Set minimum due date/time that can be assigned to a new task
     startMinuteUpdates();   // Carry out subsequent state updates for time-reliant elements on the minute every minute
+    subscribeToTaskEvents();    // Apply changes made elsewhere as they happen
 };
\ No newline at end of file
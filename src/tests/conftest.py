@@ -1,11 +1,15 @@
 import pytest
+from sqlalchemy import event
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from main import app
-from db.tables.task import Base
-from db.get_async_session import get_async_session
+from db.schema_version import upgrade_schema
+from db.get_async_session import get_async_session, get_async_read_session, get_async_read_session_factory
+from cache.task_cache import configure_task_cache, LRUTaskCache
+from cache.single_flight import TASK_READS, PAGE_READS
+from middleware.rate_limit import configure_rate_limiter, InMemoryRateLimiter
 
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"  # In-memory test DB
 
@@ -20,28 +24,73 @@ async def async_test_engine():
         connect_args={"check_same_thread": False},
         poolclass=StaticPool
     )
-    async with ENGINE.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # The schema is built by the migrations, as in production
+    async with ENGINE.connect() as conn:
+        await conn.run_sync(upgrade_schema)
+        await conn.commit()
     yield ENGINE
     await ENGINE.dispose()
 
+@pytest.fixture(autouse=True)
+def task_cache():
+    # Give every test an empty task cache
+    CACHE = LRUTaskCache()
+    configure_task_cache(CACHE)
+    return CACHE
+
+@pytest.fixture(autouse=True)
+def rate_limiter():
+    # Give every test full rate limit buckets
+    LIMITER = InMemoryRateLimiter()
+    configure_rate_limiter(LIMITER)
+    return LIMITER
+
+@pytest.fixture(autouse=True)
+def clear_single_flights():
+    # Never share a read made by a previous test
+    TASK_READS.forget_all()
+    PAGE_READS.forget_all()
+
 @pytest.fixture()
-async def async_session(async_test_engine):
-    AsyncSessionLocal = sessionmaker(
+def async_session_factory(async_test_engine):
+    return sessionmaker(
         bind=async_test_engine,
         class_=AsyncSession,
         expire_on_commit=False,
     )
-    async with AsyncSessionLocal() as session:
+
+@pytest.fixture()
+async def async_session(async_session_factory):
+    async with async_session_factory() as session:
         yield session
 
 @pytest.fixture()
-async def CLIENT(async_session):
-    # Dependency override
+async def CLIENT(async_session, async_session_factory):
+    # Dependency overrides
     app.dependency_overrides[get_async_session] = lambda: async_session
+    app.dependency_overrides[get_async_read_session] = lambda: async_session
+    app.dependency_overrides[get_async_read_session_factory] = lambda: async_session_factory
 
     # Use ASGITransport to allow AsyncClient to talk directly to the FastAPI app
     TRANSPORT = ASGITransport(app=app)
 
     async with AsyncClient(transport=TRANSPORT, base_url="http://testserver") as c:
-        yield c
\ No newline at end of file
+        yield c
+
+@pytest.fixture()
+def QUERY_COUNTER(async_test_engine):
+    """
+    Records every SQL statement sent to the test database while the fixture is active.
+
+    Yields:
+        list[str]: The executed statements, in order. Clear it before the request under test
+                   to assert on the number of statements that request issues.
+    """
+    STATEMENTS = []
+
+    def record_statement(CONNECTION, CURSOR, STATEMENT, PARAMETERS, CONTEXT, EXECUTEMANY):
+        STATEMENTS.append(STATEMENT)
+
+    event.listen(async_test_engine.sync_engine, "before_cursor_execute", record_statement)
+    yield STATEMENTS
+    event.remove(async_test_engine.sync_engine, "before_cursor_execute", record_statement)
@@ -1,7 +1,11 @@
 from http import HTTPStatus
+import csv
+import io
+import json
 import pytest
 from datetime import datetime, timedelta, timezone
 from utils.global_constants import StatusTypes
+from db.tables.task import Task
 
 
 # create_task accepts task with 'Pending' status
@@ -105,12 +109,118 @@ async def test_create_task_valid_with_no_description(CLIENT):
     assert DATA["description"] == None
     assert DATA["due_date"] == f"{DUE_DATE}Z"
 
-# Test get_all_tasks returns a list of tasks
+# Test get_all_tasks returns a page of tasks
 @pytest.mark.anyio
 async def test_get_all_tasks(CLIENT):
     RESPONSE = await CLIENT.get("/tasks/")
     assert RESPONSE.status_code == HTTPStatus.OK
-    assert isinstance(RESPONSE.json(), list)
+    assert isinstance(RESPONSE.json()["items"], list)
+    assert "next_cursor" in RESPONSE.json()
+
+# get_all_tasks pages through tasks in due date order using the returned cursor
+@pytest.mark.anyio
+async def test_get_all_tasks_keyset_pagination(CLIENT):
+    BASE_DATE = datetime.now(timezone.utc) + timedelta(days=3000)
+    CREATED_IDS = []
+    for OFFSET in (2, 0, 1):
+        RESPONSE = await CLIENT.post("/tasks/", json={
+            "title": f"Page Task {OFFSET}",
+            "status": StatusTypes.PENDING,
+            "due_date": (BASE_DATE + timedelta(minutes=OFFSET)).isoformat()
+        })
+        CREATED_IDS.append(RESPONSE.json()["id"])
+
+    PARAMS = {"limit": 2, "due_after": (BASE_DATE - timedelta(seconds=1)).isoformat()}
+    FIRST_PAGE = (await CLIENT.get("/tasks/", params=PARAMS)).json()
+    assert [TASK["title"] for TASK in FIRST_PAGE["items"]] == ["Page Task 0", "Page Task 1"]
+    assert FIRST_PAGE["next_cursor"] is not None
+
+    SECOND_PAGE = (await CLIENT.get("/tasks/", params={**PARAMS, "cursor": FIRST_PAGE["next_cursor"]})).json()
+    assert [TASK["title"] for TASK in SECOND_PAGE["items"]] == ["Page Task 2"]
+    assert SECOND_PAGE["next_cursor"] is None
+
+# get_all_tasks serialises pages exactly as the single task endpoints do
+@pytest.mark.anyio
+async def test_get_all_tasks_matches_task_schema(CLIENT):
+    DUE_DATE = datetime.now(timezone.utc) + timedelta(days=4000)
+    CREATED = (await CLIENT.post("/tasks/", json={
+        "title": "Schema Task",
+        "status": StatusTypes.IN_PROGRESS,
+        "due_date": DUE_DATE.isoformat()
+    })).json()
+
+    PAGE = (await CLIENT.get("/tasks/", params={"due_after": (DUE_DATE - timedelta(seconds=1)).isoformat()})).json()
+
+    assert PAGE["items"] == [CREATED]
+    assert PAGE["items"][0]["due_date"] == DUE_DATE.isoformat().replace("+00:00", "Z")
+
+# get_all_tasks only returns tasks matching the status and due date filters
+@pytest.mark.anyio
+async def test_get_all_tasks_filters(CLIENT):
+    BASE_DATE = datetime.now(timezone.utc) + timedelta(days=4000)
+    for STATUS in (StatusTypes.PENDING, StatusTypes.DONE):
+        await CLIENT.post("/tasks/", json={
+            "title": f"Filter Task {STATUS}",
+            "status": STATUS,
+            "due_date": BASE_DATE.isoformat()
+        })
+
+    RESPONSE = await CLIENT.get("/tasks/", params={
+        "status": StatusTypes.DONE.value,
+        "due_after": (BASE_DATE - timedelta(minutes=1)).isoformat(),
+        "due_before": (BASE_DATE + timedelta(minutes=1)).isoformat()
+    })
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert [TASK["title"] for TASK in RESPONSE.json()["items"]] == [f"Filter Task {StatusTypes.DONE}"]
+
+# INVALID: get_all_tasks rejects a malformed cursor
+@pytest.mark.anyio
+async def test_get_all_tasks_invalid_cursor(CLIENT):
+    RESPONSE = await CLIENT.get("/tasks/", params={"cursor": "not-a-cursor"})
+    assert RESPONSE.status_code == HTTPStatus.BAD_REQUEST
+
+# INVALID: get_all_tasks rejects a page size above the maximum
+@pytest.mark.anyio
+async def test_get_all_tasks_invalid_limit(CLIENT):
+    RESPONSE = await CLIENT.get("/tasks/", params={"limit": 100000})
+    assert RESPONSE.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+# export_tasks streams every task as newline delimited JSON
+@pytest.mark.anyio
+async def test_export_tasks_ndjson(CLIENT):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Export Me",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+
+    RESPONSE = await CLIENT.get("/tasks/export")
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert RESPONSE.headers["content-type"].startswith("application/x-ndjson")
+    RECORDS = [json.loads(LINE) for LINE in RESPONSE.text.splitlines()]
+    assert any(RECORD["id"] == TASK_ID and RECORD["title"] == "Export Me" for RECORD in RECORDS)
+
+# export_tasks streams every task as CSV with a header row
+@pytest.mark.anyio
+async def test_export_tasks_csv(CLIENT):
+    await CLIENT.post("/tasks/", json={
+        "title": "Export Me, As CSV",
+        "status": StatusTypes.DONE,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+
+    RESPONSE = await CLIENT.get("/tasks/export", params={"format": "csv"})
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert RESPONSE.headers["content-type"].startswith("text/csv")
+    ROWS = list(csv.DictReader(io.StringIO(RESPONSE.text)))
+    assert any(ROW["title"] == "Export Me, As CSV" and ROW["status"] == StatusTypes.DONE.value for ROW in ROWS)
+
+# INVALID: export_tasks rejects an unknown format
+@pytest.mark.anyio
+async def test_export_tasks_invalid_format(CLIENT):
+    RESPONSE = await CLIENT.get("/tasks/export", params={"format": "xml"})
+    assert RESPONSE.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 # INVALID: Test create_task doesn't accept task with missing title
 @pytest.mark.anyio
@@ -247,4 +357,176 @@ async def test_remove_task_valid_success(CLIENT):
 async def test_remove_task_invalid_not_found(CLIENT):
     RESPONSE = await CLIENT.delete("/tasks/999999/")
     assert RESPONSE.status_code == HTTPStatus.BAD_REQUEST
-    assert "No task exists with an id of '999999'." in RESPONSE.json()["detail"]
\ No newline at end of file
+    assert "No task exists with an id of '999999'." in RESPONSE.json()["detail"]
+
+# post_tasks creates every submitted task and returns them in order
+@pytest.mark.anyio
+async def test_post_tasks_bulk_valid(CLIENT):
+    DUE_DATE = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    RESPONSE = await CLIENT.post("/tasks/bulk", json=[
+        {"title": f"Bulk Task {INDEX}", "status": StatusTypes.PENDING, "due_date": DUE_DATE} for INDEX in range(3)
+    ])
+    assert RESPONSE.status_code == HTTPStatus.OK
+    DATA = RESPONSE.json()
+    assert [TASK["title"] for TASK in DATA] == ["Bulk Task 0", "Bulk Task 1", "Bulk Task 2"]
+    assert len({TASK["id"] for TASK in DATA}) == 3
+
+# INVALID: post_tasks rejects the whole request if any task is invalid
+@pytest.mark.anyio
+async def test_post_tasks_bulk_invalid_task(CLIENT):
+    RESPONSE = await CLIENT.post("/tasks/bulk", json=[
+        {"title": "Valid", "status": StatusTypes.PENDING, "due_date": (datetime.now() + timedelta(days=1)).isoformat()},
+        {"title": "Past", "status": StatusTypes.PENDING, "due_date": (datetime.now() - timedelta(days=1)).isoformat()}
+    ])
+    assert RESPONSE.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+# patch_statuses updates existing tasks and reports missing ones per item
+@pytest.mark.anyio
+async def test_patch_statuses_bulk(CLIENT):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/bulk", json=[
+        {"title": f"Bulk Patch {INDEX}", "status": StatusTypes.PENDING, "due_date": (datetime.now() + timedelta(days=1)).isoformat()}
+        for INDEX in range(2)
+    ])
+    TASK_IDS = [TASK["id"] for TASK in CREATE_RESPONSE.json()]
+
+    RESPONSE = await CLIENT.patch("/tasks/bulk", json={"ids": [*TASK_IDS, 999999], "status": StatusTypes.DONE})
+    assert RESPONSE.status_code == HTTPStatus.OK
+    RESULTS = RESPONSE.json()
+    assert [RESULT["id"] for RESULT in RESULTS] == [*TASK_IDS, 999999]
+    assert all(RESULT["success"] and RESULT["task"]["status"] == StatusTypes.DONE for RESULT in RESULTS[:2])
+    assert not RESULTS[2]["success"]
+    assert "No task exists with an id of '999999'." in RESULTS[2]["detail"]
+
+# remove_tasks deletes existing tasks and reports missing ones per item
+@pytest.mark.anyio
+async def test_remove_tasks_bulk(CLIENT):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/bulk", json=[
+        {"title": f"Bulk Delete {INDEX}", "status": StatusTypes.PENDING, "due_date": (datetime.now() + timedelta(days=1)).isoformat()}
+        for INDEX in range(2)
+    ])
+    TASK_IDS = [TASK["id"] for TASK in CREATE_RESPONSE.json()]
+
+    RESPONSE = await CLIENT.request("DELETE", "/tasks/bulk", json={"ids": [*TASK_IDS, 999999]})
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert [RESULT["success"] for RESULT in RESPONSE.json()] == [True, True, False]
+
+    for TASK_ID in TASK_IDS:
+        FETCH_RESPONSE = await CLIENT.get(f"/tasks/{TASK_ID}/")
+        assert FETCH_RESPONSE.status_code == HTTPStatus.BAD_REQUEST
+
+# get_task returns a 304 when the client's ETag is current, and a new ETag once the task changes
+@pytest.mark.anyio
+async def test_get_task_conditional(CLIENT):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "ETag Me",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+    assert CREATE_RESPONSE.json()["version"] == 1
+
+    RESPONSE = await CLIENT.get(f"/tasks/{TASK_ID}/")
+    ETAG = RESPONSE.headers["ETag"]
+    NOT_MODIFIED_RESPONSE = await CLIENT.get(f"/tasks/{TASK_ID}/", headers={"If-None-Match": ETAG})
+    assert NOT_MODIFIED_RESPONSE.status_code == HTTPStatus.NOT_MODIFIED
+    assert NOT_MODIFIED_RESPONSE.content == b""
+
+    PATCH_RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE})
+    assert PATCH_RESPONSE.json()["version"] == 2
+    MODIFIED_RESPONSE = await CLIENT.get(f"/tasks/{TASK_ID}/", headers={"If-None-Match": ETAG})
+    assert MODIFIED_RESPONSE.status_code == HTTPStatus.OK
+    assert MODIFIED_RESPONSE.headers["ETag"] != ETAG
+
+# get_all_tasks returns a 304 when the client's ETag for the page is current
+@pytest.mark.anyio
+async def test_get_all_tasks_conditional(CLIENT):
+    BASE_DATE = datetime.now(timezone.utc) + timedelta(days=5000)
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "ETag Page",
+        "status": StatusTypes.PENDING,
+        "due_date": BASE_DATE.isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+    PARAMS = {"due_after": (BASE_DATE - timedelta(minutes=1)).isoformat()}
+
+    ETAG = (await CLIENT.get("/tasks/", params=PARAMS)).headers["ETag"]
+    RESPONSE = await CLIENT.get("/tasks/", params=PARAMS, headers={"If-None-Match": ETAG})
+    assert RESPONSE.status_code == HTTPStatus.NOT_MODIFIED
+
+    await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.IN_PROGRESS})
+    RESPONSE = await CLIENT.get("/tasks/", params=PARAMS, headers={"If-None-Match": ETAG})
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert RESPONSE.json()["items"][0]["status"] == StatusTypes.IN_PROGRESS
+
+# get_task_stats counts tasks by status, and unfinished tasks that are overdue or due within a week
+@pytest.mark.anyio
+async def test_get_task_stats(CLIENT, async_session):
+    BEFORE = (await CLIENT.get("/tasks/stats")).json()
+
+    NOW = datetime.now(timezone.utc)
+    async_session.add_all([
+        Task(title="Overdue", status=StatusTypes.PENDING, due_date=NOW - timedelta(days=1)),
+        Task(title="Overdue but done", status=StatusTypes.DONE, due_date=NOW - timedelta(days=1)),
+        Task(title="Due soon", status=StatusTypes.IN_PROGRESS, due_date=NOW + timedelta(days=2)),
+        Task(title="Due later", status=StatusTypes.PENDING, due_date=NOW + timedelta(days=30)),
+    ])
+    await async_session.commit()
+
+    RESPONSE = await CLIENT.get("/tasks/stats")
+    assert RESPONSE.status_code == HTTPStatus.OK
+    AFTER = RESPONSE.json()
+
+    assert AFTER["total"] - BEFORE["total"] == 4
+    assert AFTER["by_status"][StatusTypes.PENDING.value] - BEFORE["by_status"][StatusTypes.PENDING.value] == 2
+    assert AFTER["by_status"][StatusTypes.IN_PROGRESS.value] - BEFORE["by_status"][StatusTypes.IN_PROGRESS.value] == 1
+    assert AFTER["by_status"][StatusTypes.DONE.value] - BEFORE["by_status"][StatusTypes.DONE.value] == 1
+    assert AFTER["overdue"] - BEFORE["overdue"] == 1
+    assert AFTER["due_within_week"] - BEFORE["due_within_week"] == 1
+
+# patch_status only applies a conditional update when the task is at the version the client read
+@pytest.mark.anyio
+async def test_patch_task_if_match(CLIENT):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Optimistic",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+    ETAG = (await CLIENT.get(f"/tasks/{TASK_ID}/")).headers["ETag"]
+
+    FIRST_RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.IN_PROGRESS}, headers={"If-Match": ETAG})
+    assert FIRST_RESPONSE.status_code == HTTPStatus.OK
+    assert FIRST_RESPONSE.json()["version"] == 2
+    assert FIRST_RESPONSE.headers["ETag"] == f'"{TASK_ID}-2"'
+
+    # A second writer still holding the original ETag is rejected rather than overwriting the first
+    STALE_RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE}, headers={"If-Match": ETAG})
+    assert STALE_RESPONSE.status_code == HTTPStatus.PRECONDITION_FAILED
+    assert STALE_RESPONSE.headers["ETag"] == f'"{TASK_ID}-2"'
+    assert (await CLIENT.get(f"/tasks/{TASK_ID}/")).json()["status"] == StatusTypes.IN_PROGRESS
+
+    # Weak ETags never match, and '*' matches any version
+    WEAK_RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE}, headers={"If-Match": f'W/"{TASK_ID}-2"'})
+    assert WEAK_RESPONSE.status_code == HTTPStatus.PRECONDITION_FAILED
+    ANY_RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE}, headers={"If-Match": "*"})
+    assert ANY_RESPONSE.status_code == HTTPStatus.OK
+
+# patch_status returns a 409 when the task is not at the expected version
+@pytest.mark.anyio
+async def test_patch_task_expected_version(CLIENT):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Expected Version",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+
+    RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", params={"expected_version": 1}, json={"status": StatusTypes.DONE})
+    assert RESPONSE.status_code == HTTPStatus.OK
+
+    CONFLICT_RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", params={"expected_version": 1}, json={"status": StatusTypes.PENDING})
+    assert CONFLICT_RESPONSE.status_code == HTTPStatus.CONFLICT
+    assert "current version is 2" in CONFLICT_RESPONSE.json()["detail"]
+
+    MISSING_RESPONSE = await CLIENT.patch("/tasks/999999/", params={"expected_version": 1}, json={"status": StatusTypes.DONE})
+    assert MISSING_RESPONSE.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,36 @@
+from benchmarks.report import percentile, summarise, compare
+
+
+def test_percentile_nearest_rank():
+    VALUES = [float(VALUE) for VALUE in range(1, 101)]
+    assert percentile(VALUES, 50) == 50.0
+    assert percentile(VALUES, 95) == 95.0
+    assert percentile(VALUES, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summarise():
+    SUMMARY = summarise([0.01, 0.02, 0.03, 0.04], ERRORS=1, WALL_SECONDS=2.0)
+    assert SUMMARY["requests"] == 4
+    assert SUMMARY["errors"] == 1
+    assert SUMMARY["p50_ms"] == 20.0
+    assert SUMMARY["throughput_rps"] == 2.0
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    BASELINE = {"results": {"asgi": {
+        "get_task": {"p95_ms": 10.0, "throughput_rps": 100.0},
+        "list_tasks": {"p95_ms": 10.0, "throughput_rps": 100.0}
+    }}}
+    CURRENT = {"results": {"asgi": {
+        "get_task": {"p95_ms": 10.5, "throughput_rps": 98.0},
+        "list_tasks": {"p95_ms": 15.0, "throughput_rps": 100.0},
+        "create_task": {"p95_ms": 50.0, "throughput_rps": 20.0}
+    }}}
+
+    COMPARISON = {ENTRY["scenario"]: ENTRY for ENTRY in compare(BASELINE, CURRENT, THRESHOLD_PERCENT=10.0)}
+
+    assert set(COMPARISON) == {"get_task", "list_tasks"}
+    assert not COMPARISON["get_task"]["regressed"]
+    assert COMPARISON["list_tasks"]["regressed"]
+    assert COMPARISON["list_tasks"]["p95_change_percent"] == 50.0
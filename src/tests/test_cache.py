@@ -0,0 +1,241 @@
+from http import HTTPStatus
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from cache.task_cache import LRUTaskCache, RedisTaskCache
+from cache.single_flight import SingleFlight
+from db.crud.crud import read_task, update_task
+from models.tasks import TaskResponseModel, TaskUpdateModel
+from utils.global_constants import StatusTypes
+
+
+class FakeRedis:
+    """
+    Local stand-in for the subset of the async Redis client used by RedisTaskCache.
+    """
+    def __init__(self):
+        self.STORE = {}
+
+    async def get(self, KEY):
+        return self.STORE.get(KEY)
+
+    async def set(self, KEY, VALUE, ex=None, nx=False):
+        if not (nx and KEY in self.STORE):
+            self.STORE[KEY] = VALUE
+
+    async def delete(self, *KEYS):
+        for KEY in KEYS:
+            self.STORE.pop(KEY, None)
+
+
+def make_task(ID: int) -> TaskResponseModel:
+    return TaskResponseModel(id=ID, title=f"Task {ID}", status=StatusTypes.PENDING, version=1,
+                             due_date=datetime.now(timezone.utc) + timedelta(days=1))
+
+# LRUTaskCache evicts the least recently used task once full
+@pytest.mark.anyio
+async def test_lru_cache_evicts_least_recently_used():
+    CACHE = LRUTaskCache(MAX_SIZE=2)
+    await CACHE.set(make_task(1))
+    await CACHE.set(make_task(2))
+    await CACHE.get(1)
+    await CACHE.set(make_task(3))
+
+    assert await CACHE.get(2) is None
+    assert (await CACHE.get(1)).id == 1
+    assert (await CACHE.get(3)).id == 3
+    assert len(CACHE) == 2
+
+# Reads are only cached if their task has not been written since they began, and never replace a newer version
+@pytest.mark.anyio
+async def test_lru_cache_fill_skips_stale_reads():
+    CACHE = LRUTaskCache(MAX_SIZE=2)
+    STALE = make_task(1)
+    SINCE = CACHE.read_started()
+    await CACHE.set(STALE.model_copy(update={"version": 2}))
+    await CACHE.fill(STALE, SINCE)
+    assert (await CACHE.get(1)).version == 2
+
+    SINCE = CACHE.read_started()
+    await CACHE.invalidate(1)
+    await CACHE.fill(STALE, SINCE)
+    assert await CACHE.get(1) is None
+
+    # Once the record of a write has been dropped, reads that began before it are not cached
+    SINCE = CACHE.read_started()
+    for ID in (2, 3, 4):
+        await CACHE.invalidate(ID)
+    await CACHE.fill(make_task(5), SINCE)
+    assert await CACHE.get(5) is None
+
+    await CACHE.fill(STALE, CACHE.read_started())
+    assert await CACHE.get(1) == STALE
+    await CACHE.set(STALE.model_copy(update={"version": 0}))
+    assert await CACHE.get(1) == STALE
+
+# LRUTaskCache treats entries older than the TTL as misses
+@pytest.mark.anyio
+async def test_lru_cache_expires_entries():
+    NOW = [0.0]
+    CACHE = LRUTaskCache(TTL_SECONDS=5, CLOCK=lambda: NOW[0])
+    await CACHE.set(make_task(1))
+
+    NOW[0] = 4.9
+    assert await CACHE.get(1) is not None
+    NOW[0] = 5.0
+    assert await CACHE.get(1) is None
+    assert CACHE.stats()["hits"] == 1
+    assert CACHE.stats()["misses"] == 1
+
+# RedisTaskCache round trips tasks through the store and honours invalidation
+@pytest.mark.anyio
+async def test_redis_cache_round_trip():
+    CACHE = RedisTaskCache(FakeRedis())
+    TASK = make_task(7)
+    await CACHE.set(TASK)
+    assert await CACHE.get(7) == TASK
+
+    await CACHE.invalidate_many([7])
+    assert await CACHE.get(7) is None
+    assert CACHE.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+# get_task serves repeat reads from the cache without querying the database
+@pytest.mark.anyio
+async def test_get_task_served_from_cache(CLIENT, QUERY_COUNTER, task_cache):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Cache Me",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+    await task_cache.invalidate(TASK_ID)
+    QUERY_COUNTER.clear()
+
+    for _ in range(3):
+        RESPONSE = await CLIENT.get(f"/tasks/{TASK_ID}/")
+        assert RESPONSE.status_code == HTTPStatus.OK
+    assert len(QUERY_COUNTER) == 1
+    assert task_cache.stats()["hits"] == 2
+
+# patch_status and remove_task keep the cache consistent with the database
+@pytest.mark.anyio
+async def test_writes_invalidate_cache(CLIENT):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Invalidate Me",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+    await CLIENT.get(f"/tasks/{TASK_ID}/")
+
+    await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE})
+    assert (await CLIENT.get(f"/tasks/{TASK_ID}/")).json()["status"] == StatusTypes.DONE
+
+    await CLIENT.patch("/tasks/bulk", json={"ids": [TASK_ID], "status": StatusTypes.IN_PROGRESS})
+    assert (await CLIENT.get(f"/tasks/{TASK_ID}/")).json()["status"] == StatusTypes.IN_PROGRESS
+
+    await CLIENT.delete(f"/tasks/{TASK_ID}/")
+    assert (await CLIENT.get(f"/tasks/{TASK_ID}/")).status_code == HTTPStatus.BAD_REQUEST
+
+# Concurrent identical reads share one in-flight read, and the caller running it may be cancelled
+@pytest.mark.anyio
+async def test_single_flight_shares_concurrent_reads():
+    FLIGHTS = SingleFlight(TTL_SECONDS=0)
+    RELEASE = asyncio.Event()
+    CALLS = []
+
+    async def read():
+        CALLS.append(1)
+        await RELEASE.wait()
+        return len(CALLS)
+
+    LEADER = asyncio.create_task(FLIGHTS.do("key", read))
+    FOLLOWERS = [asyncio.create_task(FLIGHTS.do("key", read)) for _ in range(5)]
+    await asyncio.sleep(0)
+    LEADER.cancel()
+    while len(CALLS) < 2:
+        await asyncio.sleep(0)
+    RELEASE.set()
+
+    # One of the followers takes over the abandoned read, and the rest share it
+    assert await asyncio.gather(*FOLLOWERS) == [2] * 5
+    assert len(CALLS) == 2
+    assert len(FLIGHTS) == 0
+
+# Completed reads are shared for the TTL unless forgotten, and failed reads are never kept
+@pytest.mark.anyio
+async def test_single_flight_ttl_and_forget():
+    FLIGHTS = SingleFlight(TTL_SECONDS=60)
+    CALLS = []
+
+    async def read():
+        CALLS.append(1)
+        return len(CALLS)
+
+    async def failing_read():
+        raise ValueError("Read failed")
+
+    assert await FLIGHTS.do("key", read) == 1
+    assert await FLIGHTS.do("key", read) == 1
+    FLIGHTS.forget("key")
+    assert await FLIGHTS.do("key", read) == 2
+    assert FLIGHTS.stats() == {"led": 2, "shared": 1}
+
+    with pytest.raises(ValueError):
+        await FLIGHTS.do("failing", failing_read)
+    assert "failing" not in FLIGHTS.FLIGHTS
+
+# A burst of requests for a task that is not cached costs a single query, and writes are never hidden by it
+@pytest.mark.anyio
+async def test_concurrent_gets_share_one_query(CLIENT, QUERY_COUNTER, task_cache):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Herd Me",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+    await task_cache.invalidate(TASK_ID)
+    QUERY_COUNTER.clear()
+
+    RESPONSES = await asyncio.gather(*(CLIENT.get(f"/tasks/{TASK_ID}/") for _ in range(20)))
+    assert {RESPONSE.json()["title"] for RESPONSE in RESPONSES} == {"Herd Me"}
+    assert len(QUERY_COUNTER) == 1
+
+    await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE})
+    await task_cache.invalidate(TASK_ID)
+    assert (await CLIENT.get(f"/tasks/{TASK_ID}/")).json()["status"] == StatusTypes.DONE
+    assert [ITEM["status"] for ITEM in (await CLIENT.get("/tasks/", params={"limit": 500})).json()["items"]
+            if ITEM["id"] == TASK_ID] == [StatusTypes.DONE]
+
+# A read that finishes after a concurrent update does not replace the updated task in the cache
+@pytest.mark.anyio
+async def test_read_overlapping_an_update_is_not_cached(CLIENT, async_session, async_session_factory, task_cache):
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Race Me",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+    await task_cache.invalidate(TASK_ID)
+
+    # Hold the read between its query and caching its row
+    QUERIED, RELEASE = asyncio.Event(), asyncio.Event()
+    EXECUTE = async_session.execute
+
+    async def paused_execute(*args, **kwargs):
+        RESULT = await EXECUTE(*args, **kwargs)
+        QUERIED.set()
+        await RELEASE.wait()
+        return RESULT
+    async_session.execute = paused_execute
+
+    READ = asyncio.create_task(read_task(TASK_ID, async_session))
+    await QUERIED.wait()
+    async with async_session_factory() as SESSION:
+        UPDATED_TASK = await update_task(TASK_ID, TaskUpdateModel(status=StatusTypes.DONE), SESSION)
+    RELEASE.set()
+
+    assert (await READ).status == StatusTypes.PENDING
+    assert await task_cache.get(TASK_ID) == UPDATED_TASK
+    RESPONSE = await CLIENT.get(f"/tasks/{TASK_ID}/")
+    assert (RESPONSE.json()["status"], RESPONSE.json()["version"]) == (StatusTypes.DONE, UPDATED_TASK.version)
@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+import json
+from sqlalchemy import text
+from datetime import datetime, timedelta
+from events.task_events import TaskEventBroker, PostgresTaskEventBroker, configure_task_event_broker, publish_task_events
+from routers.tasks import generate_task_events
+from utils.global_constants import StatusTypes
+
+
+@pytest.fixture()
+def BROKER():
+    BROKER = TaskEventBroker(QUEUE_SIZE=2)
+    configure_task_event_broker(BROKER)
+    yield BROKER
+    configure_task_event_broker(TaskEventBroker())
+
+# Writes through the API publish created, updated and deleted events
+@pytest.mark.anyio
+async def test_writes_publish_events(CLIENT, BROKER):
+    QUEUE = BROKER.subscribe()
+    CREATE_RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Watch Me",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    TASK_ID = CREATE_RESPONSE.json()["id"]
+    await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE})
+
+    CREATED, UPDATED = QUEUE.get_nowait(), QUEUE.get_nowait()
+    assert (CREATED["type"], CREATED["id"], CREATED["task"]["title"]) == ("created", TASK_ID, "Watch Me")
+    assert (UPDATED["type"], UPDATED["task"]["status"]) == ("updated", StatusTypes.DONE)
+
+    await CLIENT.delete(f"/tasks/{TASK_ID}/")
+    assert QUEUE.get_nowait() == {"type": "deleted", "id": TASK_ID}
+
+# Events published with a write are delivered when it commits, in one publish per write, and never if it rolls back
+@pytest.mark.anyio
+async def test_events_are_published_with_the_write(CLIENT, BROKER, async_session, monkeypatch):
+    PUBLISHED = []
+    PUBLISH = BROKER.publish
+
+    async def recording_publish(EVENTS, SESSION=None):
+        PUBLISHED.append(len(EVENTS))
+        await PUBLISH(EVENTS, SESSION)
+    monkeypatch.setattr(BROKER, "publish", recording_publish)
+    QUEUE = BROKER.subscribe()
+
+    # Writes publish within their transaction, begun by their first statement
+    await async_session.execute(text("SELECT 1"))
+    await publish_task_events("deleted", IDS=[1], SESSION=async_session)
+    await async_session.rollback()
+    await async_session.execute(text("SELECT 1"))
+    await publish_task_events("deleted", IDS=[2], SESSION=async_session)
+    assert QUEUE.empty()
+    await async_session.commit()
+    assert QUEUE.get_nowait() == {"type": "deleted", "id": 2}
+    assert QUEUE.empty()
+
+    PUBLISHED.clear()
+    DUE_DATE = (datetime.now() + timedelta(days=1)).isoformat()
+    RESPONSE = await CLIENT.post("/tasks/bulk", json=[{"title": "Bulk", "status": StatusTypes.PENDING, "due_date": DUE_DATE}] * 2)
+    assert PUBLISHED == [2]
+    assert [QUEUE.get_nowait()["id"] for _ in range(2)] == [TASK["id"] for TASK in RESPONSE.json()]
+
+# A subscriber that falls behind is told to resync instead of blocking publishers
+@pytest.mark.anyio
+async def test_slow_subscriber_receives_resync(BROKER):
+    QUEUE = BROKER.subscribe()
+    for ID in range(3):
+        await BROKER.publish([{"type": "deleted", "id": ID}])
+
+    assert QUEUE.get_nowait() == {"type": "resync"}
+    assert QUEUE.empty()
+
+# The event stream frames published events as Server-Sent Events and unsubscribes when closed
+@pytest.mark.anyio
+async def test_event_stream_frames_events(BROKER):
+    STREAM = generate_task_events(BROKER)
+    assert await STREAM.__anext__() == "retry: 5000\n\n"
+    assert len(BROKER.SUBSCRIBERS) == 1
+
+    await BROKER.publish([{"type": "deleted", "id": 1}])
+    FRAME = await STREAM.__anext__()
+    assert FRAME.startswith("event: deleted\ndata: ")
+    assert json.loads(FRAME.split("data: ", 1)[1]) == {"type": "deleted", "id": 1}
+
+    await STREAM.aclose()
+    assert len(BROKER.SUBSCRIBERS) == 0
+
+# A dropped LISTEN connection is re-established with backoff, and subscribers are told to resync
+@pytest.mark.anyio
+@pytest.mark.parametrize("CHECK_FAILS", [False, True])
+async def test_listen_connection_is_re_established(CHECK_FAILS, async_test_engine):
+    ATTEMPTS = []
+
+    class FlakyBroker(PostgresTaskEventBroker):
+        async def connect(self):
+            ATTEMPTS.append(len(ATTEMPTS))
+            if len(ATTEMPTS) in (2, 3):
+                raise ConnectionError("The database is starting up")
+            self.CONNECTION_LOST.clear()
+
+        async def disconnect(self, CONNECTION):
+            pass
+
+        async def check(self):
+            if CHECK_FAILS:
+                raise ConnectionError("The connection timed out")
+
+    BROKER = FlakyBroker(async_test_engine, CHECK_SECONDS=0.05 if CHECK_FAILS else 60,
+                         RECONNECT_MIN_SECONDS=0.01, RECONNECT_MAX_SECONDS=0.02)
+    await BROKER.start()
+    QUEUE = BROKER.subscribe()
+    if not CHECK_FAILS:
+        # As called by asyncpg when the database closes the connection
+        BROKER.on_termination(None)
+
+    assert await asyncio.wait_for(QUEUE.get(), 5) == {"type": "resync"}
+    assert len(ATTEMPTS) == 4
+    await BROKER.stop()
@@ -0,0 +1,89 @@
+import pytest
+from http import HTTPStatus
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func
+from sqlalchemy.future import select
+import db.crud.idempotency as idempotency
+from db.crud.idempotency import create_task_idempotently
+from db.tables.idempotency_key import IdempotencyKey
+from db.tables.task import Task
+from models.tasks import TaskCreationModel
+from scheduler.task_scheduler import IdempotencyKeyPurger
+from utils.global_constants import StatusTypes, IdempotencyConstants
+
+
+def new_task(TITLE: str) -> dict:
+    return {"title": TITLE, "status": StatusTypes.PENDING,
+            "due_date": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()}
+
+
+async def count_tasks(SESSION, TITLE: str) -> int:
+    return (await SESSION.execute(select(func.count()).where(Task.title == TITLE))).scalar_one()
+
+
+# A retry with the same key and body replays the original response instead of creating another task
+@pytest.mark.anyio
+async def test_retried_requests_are_replayed(CLIENT, async_session):
+    TASK = new_task("Idempotent task")
+    HEADERS = {IdempotencyConstants.KEY_HEADER: "retried-request"}
+
+    FIRST = await CLIENT.post("/tasks/", json=TASK, headers=HEADERS)
+    RETRY = await CLIENT.post("/tasks/", json=TASK, headers=HEADERS)
+
+    assert FIRST.status_code == RETRY.status_code == HTTPStatus.OK
+    assert RETRY.json() == FIRST.json()
+    assert IdempotencyConstants.REPLAYED_HEADER not in FIRST.headers
+    assert RETRY.headers[IdempotencyConstants.REPLAYED_HEADER] == "true"
+    assert await count_tasks(async_session, "Idempotent task") == 1
+
+
+# A key cannot be reused for a different request, and must fit in the key column
+@pytest.mark.anyio
+async def test_invalid_keys_are_refused(CLIENT):
+    HEADERS = {IdempotencyConstants.KEY_HEADER: "reused-key"}
+    assert (await CLIENT.post("/tasks/", json=new_task("First request"), headers=HEADERS)).status_code == HTTPStatus.OK
+
+    RESPONSE = await CLIENT.post("/tasks/", json=new_task("Second request"), headers=HEADERS)
+    assert RESPONSE.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert "reused-key" in RESPONSE.json()["detail"]
+
+    HEADERS = {IdempotencyConstants.KEY_HEADER: "k" * (IdempotencyConstants.MAX_KEY_LENGTH + 1)}
+    assert (await CLIENT.post("/tasks/", json=new_task("Long key"), headers=HEADERS)).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+# A request racing another with the same key loses on the unique constraint, and replays the winner's response
+@pytest.mark.anyio
+async def test_concurrent_duplicates_are_settled_by_the_unique_constraint(async_session, monkeypatch):
+    TASK = TaskCreationModel(**new_task("Concurrent task"))
+    CREATED_TASK, REPLAYED = await create_task_idempotently(TASK, "concurrent-request", async_session)
+    assert not REPLAYED
+
+    # Simulate the duplicate having checked for the key before the first request committed
+    READ = idempotency.read_idempotency_key
+    CALLS = []
+
+    async def read_before_commit(KEY, SESSION):
+        CALLS.append(KEY)
+        return None if len(CALLS) == 1 else await READ(KEY, SESSION)
+    monkeypatch.setattr(idempotency, "read_idempotency_key", read_before_commit)
+
+    assert await create_task_idempotently(TASK, "concurrent-request", async_session) == (CREATED_TASK, True)
+    assert len(CALLS) == 2
+    assert await count_tasks(async_session, "Concurrent task") == 1
+
+
+# Expired keys can be reused, and are purged by the scheduled job
+@pytest.mark.anyio
+async def test_expired_keys_are_reused_and_purged(async_session, async_session_factory):
+    TASK = TaskCreationModel(**new_task("Expiring task"))
+    FIRST, _ = await create_task_idempotently(TASK, "expiring-request", async_session, TTL_SECONDS=-1)
+    SECOND, REPLAYED = await create_task_idempotently(TASK, "expiring-request", async_session, TTL_SECONDS=-1)
+    assert not REPLAYED and SECOND.id != FIRST.id
+    await create_task_idempotently(TASK, "live-request", async_session)
+
+    NOW = datetime.now(timezone.utc)
+    await IdempotencyKeyPurger(async_session_factory, BATCH_SIZE=1)(NOW - timedelta(minutes=1), NOW)
+
+    KEYS = (await async_session.execute(select(IdempotencyKey.key)
+                                        .where(IdempotencyKey.key.in_(["expiring-request", "live-request"])))).scalars().all()
+    assert KEYS == ["live-request"]
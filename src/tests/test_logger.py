@@ -0,0 +1,49 @@
+import json
+import logging
+import queue
+import sys
+from logger import JsonFormatter, DeferredQueueHandler, log_internal_server_error, LOGGER
+
+
+def test_json_formatter_writes_one_json_object_per_line():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        RECORD = logging.LogRecord("test", logging.ERROR, __file__, 1, "Task %s failed", (7,), sys.exc_info())
+
+    LINE = JsonFormatter().format(RECORD)
+
+    assert "\n" not in LINE
+    ENTRY = json.loads(LINE)
+    assert ENTRY["level"] == "ERROR"
+    assert ENTRY["message"] == "Task 7 failed"
+    assert "ValueError: boom" in ENTRY["exception"]
+
+
+def test_queue_handler_defers_traceback_formatting():
+    QUEUE = queue.SimpleQueue()
+    EXCEPTION = ValueError("boom")
+    RECORD = logging.LogRecord("test", logging.ERROR, __file__, 1, "Task %s failed", (7,),
+                               (ValueError, EXCEPTION, None))
+
+    DeferredQueueHandler(QUEUE).handle(RECORD)
+
+    QUEUED = QUEUE.get_nowait()
+    assert QUEUED.getMessage() == "Task 7 failed"
+    assert QUEUED.exc_info[1] is EXCEPTION
+    assert QUEUED.exc_text is None
+
+
+def test_log_internal_server_error_names_caller(monkeypatch):
+    RECORDS = []
+    monkeypatch.setattr(LOGGER, "handle", RECORDS.append)
+
+    def failing_endpoint():
+        log_internal_server_error(RuntimeError("database unavailable"))
+
+    failing_endpoint()
+
+    assert len(RECORDS) == 1
+    assert '"failing_endpoint"' in RECORDS[0].getMessage()
+    assert RECORDS[0].funcName == "failing_endpoint"
+    assert isinstance(RECORDS[0].exc_info[1], RuntimeError)
@@ -0,0 +1,107 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from http import HTTPStatus
+from prometheus_client import REGISTRY
+from metrics.prometheus import PrometheusMiddleware, instrument_engine, timed_crud, record_query_start, record_query_duration
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from utils.global_constants import StatusTypes
+
+
+def sample(NAME: str, LABELS: dict) -> float:
+    return REGISTRY.get_sample_value(NAME, LABELS) or 0.0
+
+
+@pytest.mark.anyio
+async def test_requests_labelled_by_route_template(CLIENT):
+    LABELS = {"method": "GET", "route": "/tasks/{ID}/", "status": "400"}
+    BEFORE = sample("hmcts_http_requests_total", LABELS)
+
+    RESPONSE = await CLIENT.get("/tasks/987654/")
+    assert RESPONSE.status_code == HTTPStatus.BAD_REQUEST
+
+    assert sample("hmcts_http_requests_total", LABELS) == BEFORE + 1
+    assert sample("hmcts_http_request_duration_seconds_count", {"method": "GET", "route": "/tasks/{ID}/"}) >= 1
+    assert sample("hmcts_http_requests_in_progress", {"method": "GET"}) == 0
+
+
+@pytest.mark.anyio
+async def test_unmatched_paths_share_a_label(CLIENT):
+    LABELS = {"method": "GET", "route": "<unmatched>", "status": "404"}
+    BEFORE = sample("hmcts_http_requests_total", LABELS)
+
+    await CLIENT.get("/no/such/path/1")
+    await CLIENT.get("/no/such/path/2")
+
+    assert sample("hmcts_http_requests_total", LABELS) == BEFORE + 2
+
+
+# Event streams stay open for as long as the client is connected, so they are kept out of the latency metrics
+@pytest.mark.anyio
+async def test_streams_are_tracked_apart_from_request_latency():
+    STREAM = {"method": "GET", "route": "/tasks/events"}
+    BEFORE = (sample("hmcts_http_requests_total", {**STREAM, "status": "200"}),
+              sample("hmcts_http_requests_in_progress", {"method": "GET"}))
+    OPEN = []
+
+    async def stream(SCOPE, RECEIVE, SEND):
+        SCOPE["route"] = type("Route", (), {"path": "/tasks/events"})()
+        OPEN.append((sample("hmcts_http_streams_open", {"route": "/tasks/events"}),
+                     sample("hmcts_http_requests_in_progress", {"method": "GET"})))
+        await SEND({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(MESSAGE):
+        pass
+
+    await PrometheusMiddleware(stream)({"type": "http", "method": "GET", "path": "/tasks/events"}, None, send)
+
+    assert OPEN == [(1, BEFORE[1])]
+    assert sample("hmcts_http_streams_open", {"route": "/tasks/events"}) == 0
+    assert sample("hmcts_http_requests_total", {**STREAM, "status": "200"}) == BEFORE[0] + 1
+    assert sample("hmcts_http_request_duration_seconds_count", STREAM) == 0
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint(CLIENT):
+    await CLIENT.post("/tasks/", json={
+        "title": "Metrics task",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    })
+    await CLIENT.get("/tasks/")
+
+    RESPONSE = await CLIENT.get("/metrics")
+
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert RESPONSE.headers["content-type"].startswith("text/plain")
+    assert 'hmcts_http_requests_total{method="POST",route="/tasks/",status="200"}' in RESPONSE.text
+    assert "hmcts_task_cache_hits_total" in RESPONSE.text
+    assert 'hmcts_single_flight_led_total{read="page"}' in RESPONSE.text
+
+
+@pytest.mark.anyio
+async def test_query_time_labelled_by_crud_function(async_test_engine):
+    instrument_engine(async_test_engine)
+
+    INFO = []
+
+    @timed_crud
+    async def count_rows():
+        async with async_test_engine.connect() as CONNECTION:
+            # A failing statement is not timed, and leaves nothing behind on the pooled connection
+            INFO.append(dict((await CONNECTION.get_raw_connection()).info))
+            with pytest.raises(DBAPIError):
+                await CONNECTION.execute(text('SELECT * FROM "NoSuchTable"'))
+            await CONNECTION.rollback()
+            COUNT = (await CONNECTION.execute(text('SELECT count(*) FROM "Tasks"'))).scalar()
+            INFO.append(dict((await CONNECTION.get_raw_connection()).info))
+            return COUNT
+
+    BEFORE = sample("hmcts_db_query_duration_seconds_count", {"function": "count_rows"})
+    try:
+        await count_rows()
+        assert sample("hmcts_db_query_duration_seconds_count", {"function": "count_rows"}) == BEFORE + 1
+        assert INFO[0] == INFO[1]
+    finally:
+        event.remove(async_test_engine.sync_engine, "before_cursor_execute", record_query_start)
+        event.remove(async_test_engine.sync_engine, "after_cursor_execute", record_query_duration)
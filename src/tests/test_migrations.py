@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+import sqlalchemy as sa
+from datetime import datetime, timezone
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy.ext.asyncio import create_async_engine
+from db.schema_version import SchemaVersionError, check_schema_version, get_alembic_config
+from db.tables.task import Base
+from migrations.helpers import include_object
+
+
+@pytest.fixture()
+def database_path(tmp_path):
+    return tmp_path / "migrations.db"
+
+
+def test_migrations_match_models(database_path):
+    # Running every migration must produce the schema declared by the models
+    command.upgrade(get_alembic_config(f"sqlite+aiosqlite:///{database_path}"), "head")
+
+    ENGINE = sa.create_engine(f"sqlite:///{database_path}")
+    with ENGINE.connect() as CONNECTION:
+        CONTEXT = MigrationContext.configure(CONNECTION, opts={"include_object": include_object})
+        assert compare_metadata(CONTEXT, Base.metadata) == []
+        assert sa.inspect(CONNECTION).has_table("Tasks_fts")
+    ENGINE.dispose()
+
+
+def test_migrations_backfill_existing_tasks(database_path):
+    # Tasks created before the version column existed are backfilled with version 1
+    CONFIG = get_alembic_config(f"sqlite+aiosqlite:///{database_path}")
+    command.upgrade(CONFIG, "0002")
+
+    ENGINE = sa.create_engine(f"sqlite:///{database_path}")
+    with ENGINE.begin() as CONNECTION:
+        CONNECTION.execute(sa.text('INSERT INTO "Tasks" (title, status, due_date) VALUES (:title, \'PENDING\', :due_date)'),
+                           [{"title": f"Task {INDEX}", "due_date": datetime.now(timezone.utc)} for INDEX in range(2500)])
+        # The backfill walks the table in ranges of IDs, which must carry on past a gap wider than a batch
+        CONNECTION.execute(sa.text('DELETE FROM "Tasks" WHERE id BETWEEN 500 AND 1700'))
+
+    command.upgrade(CONFIG, "head")
+    with ENGINE.connect() as CONNECTION:
+        assert CONNECTION.execute(sa.text('SELECT count(*) FROM "Tasks" WHERE version = 1')).scalar_one() == 1299
+        # Existing tasks are indexed for search
+        assert CONNECTION.execute(sa.text('SELECT count(*) FROM "Tasks_fts" WHERE "Tasks_fts" MATCH \'task\'')).scalar_one() == 1299
+    ENGINE.dispose()
+
+    command.downgrade(CONFIG, "base")
+
+
+@pytest.mark.anyio
+async def test_schema_version_check(database_path):
+    ENGINE = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    try:
+        # A database that has not been migrated is refused, unless the check is relaxed
+        with pytest.raises(SchemaVersionError):
+            await check_schema_version(ENGINE, "error")
+        await check_schema_version(ENGINE, "warn")
+        await check_schema_version(ENGINE, "off")
+
+        # Migrations run their own event loop, so they are run from another thread
+        await asyncio.to_thread(command.upgrade, get_alembic_config(f"sqlite+aiosqlite:///{database_path}"), "head")
+        await check_schema_version(ENGINE, "error")
+    finally:
+        await ENGINE.dispose()
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from db.engine import create_database_engine, parse_echo
+from db.pool_metrics import PoolMetrics
+
+
+def create_test_engine(METRICS: PoolMetrics, POOL_SIZE: int = 2, MAX_OVERFLOW: int = 0, POOL_TIMEOUT: float = 30):
+    return create_database_engine("sqlite+aiosqlite://", METRICS, POOL_SIZE=POOL_SIZE, MAX_OVERFLOW=MAX_OVERFLOW,
+                                  POOL_TIMEOUT=POOL_TIMEOUT, POOL_RECYCLE=-1, POOL_PRE_PING=False,
+                                  STATEMENT_CACHE_SIZE=100, ECHO=False)
+
+# The instrumented pool records every checkout and checkin
+@pytest.mark.anyio
+async def test_pool_metrics_record_checkouts():
+    METRICS = PoolMetrics()
+    ENGINE = create_test_engine(METRICS, MAX_OVERFLOW=1)
+
+    for _ in range(3):
+        async with ENGINE.connect() as CONNECTION:
+            await CONNECTION.execute(text("SELECT 1"))
+
+    SNAPSHOT = METRICS.snapshot(ENGINE.pool)
+    assert SNAPSHOT["checkouts"] == 3
+    assert SNAPSHOT["checkins"] == 3
+    assert SNAPSHOT["checked_out"] == 0
+    assert SNAPSHOT["timeouts"] == 0
+    await ENGINE.dispose()
+
+# The instrumented pool records checkouts that time out waiting for a connection
+@pytest.mark.anyio
+async def test_pool_metrics_record_timeouts():
+    METRICS = PoolMetrics()
+    ENGINE = create_test_engine(METRICS, POOL_SIZE=1, POOL_TIMEOUT=0.05)
+
+    async with ENGINE.connect() as CONNECTION:
+        await CONNECTION.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            async with ENGINE.connect() as SECOND_CONNECTION:
+                await SECOND_CONNECTION.execute(text("SELECT 1"))
+
+    SNAPSHOT = METRICS.snapshot(ENGINE.pool)
+    assert SNAPSHOT["timeouts"] == 1
+    assert SNAPSHOT["wait_seconds_max"] >= 0.05
+    await ENGINE.dispose()
+
+# parse_echo maps the DB_ECHO setting onto the engine's echo argument
+def test_parse_echo():
+    assert parse_echo("false") is False
+    assert parse_echo("True") is True
+    assert parse_echo("debug") == "debug"
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+import pytest
+from datetime import datetime, timedelta
+from utils.global_constants import StatusTypes
+
+
+async def create_test_task(CLIENT) -> int:
+    RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": "Count My Queries",
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    return RESPONSE.json()["id"]
+
+# get_task issues a single statement on a cache miss
+@pytest.mark.anyio
+async def test_get_task_query_count(CLIENT, QUERY_COUNTER, task_cache):
+    TASK_ID = await create_test_task(CLIENT)
+    await task_cache.invalidate(TASK_ID)
+    QUERY_COUNTER.clear()
+
+    RESPONSE = await CLIENT.get(f"/tasks/{TASK_ID}/")
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert len(QUERY_COUNTER) == 1
+
+# patch_status updates and returns the task with a single statement
+@pytest.mark.anyio
+async def test_patch_status_query_count(CLIENT, QUERY_COUNTER):
+    TASK_ID = await create_test_task(CLIENT)
+    QUERY_COUNTER.clear()
+
+    RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE})
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert len(QUERY_COUNTER) == 1
+    assert QUERY_COUNTER[0].lstrip().upper().startswith("UPDATE")
+
+# remove_task deletes the task with a single statement
+@pytest.mark.anyio
+async def test_remove_task_query_count(CLIENT, QUERY_COUNTER):
+    TASK_ID = await create_test_task(CLIENT)
+    QUERY_COUNTER.clear()
+
+    RESPONSE = await CLIENT.delete(f"/tasks/{TASK_ID}/")
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert len(QUERY_COUNTER) == 1
+    assert QUERY_COUNTER[0].lstrip().upper().startswith("DELETE")
+
+# INVALID: patch_status and remove_task still issue a single statement for a missing task
+@pytest.mark.anyio
+async def test_missing_task_write_query_count(CLIENT, QUERY_COUNTER):
+    await CLIENT.patch("/tasks/999999/", json={"status": StatusTypes.DONE})
+    await CLIENT.delete("/tasks/999999/")
+    assert len(QUERY_COUNTER) == 2
+
+# A conditional patch_status is still a single statement when the version matches
+@pytest.mark.anyio
+async def test_conditional_patch_status_query_count(CLIENT, QUERY_COUNTER):
+    TASK_ID = await create_test_task(CLIENT)
+    QUERY_COUNTER.clear()
+
+    RESPONSE = await CLIENT.patch(f"/tasks/{TASK_ID}/", json={"status": StatusTypes.DONE}, headers={"If-Match": f'"{TASK_ID}-1"'})
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert len(QUERY_COUNTER) == 1
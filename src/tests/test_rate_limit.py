@@ -0,0 +1,142 @@
+import asyncio
+import time
+import pytest
+from http import HTTPStatus
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+import middleware.rate_limit as rate_limit
+from db.pool_metrics import PoolMetrics
+from main import app
+from middleware.rate_limit import InMemoryRateLimiter, RateLimitMiddleware, SharedStoreRateLimiter
+from settings import SETTINGS
+
+
+class FakeStore:
+    """
+    Local stand-in for the subset of the async Redis client used by SharedStoreRateLimiter.
+    """
+    def __init__(self):
+        self.COUNTS = {}
+        self.EXPIRES = {}
+
+    async def incr(self, KEY):
+        self.COUNTS[KEY] = self.COUNTS.get(KEY, 0) + 1
+        return self.COUNTS[KEY]
+
+    async def expire(self, KEY, SECONDS):
+        self.EXPIRES[KEY] = SECONDS
+
+
+class BrokenStore:
+    async def incr(self, KEY):
+        raise ConnectionError("Store unavailable")
+
+
+@pytest.fixture()
+def configure_settings(monkeypatch):
+    # SETTINGS is frozen, so the middleware is given an updated copy instead
+    return lambda **VALUES: monkeypatch.setattr(rate_limit, "SETTINGS", SETTINGS.model_copy(update=VALUES))
+
+
+# A bucket allows a burst, then refills at the configured rate
+@pytest.mark.anyio
+async def test_in_memory_token_bucket():
+    NOW = [0.0]
+    LIMITER = InMemoryRateLimiter(CLOCK=lambda: NOW[0])
+
+    assert [await LIMITER.acquire("client", 1, 2) for _ in range(3)] == [0.0, 0.0, 1.0]
+    NOW[0] = 0.5
+    assert await LIMITER.acquire("client", 1, 2) == pytest.approx(0.5)
+    assert await LIMITER.acquire("other client", 1, 2) == 0.0
+    NOW[0] = 1.5
+    assert await LIMITER.acquire("client", 1, 2) == 0.0
+
+
+# The shared store counts requests per window, and lets requests through when it is unavailable
+@pytest.mark.anyio
+async def test_shared_store_rate_limiter():
+    NOW = [100.5]
+    STORE = FakeStore()
+    LIMITER = SharedStoreRateLimiter(STORE, KEY_PREFIX="test:", CLOCK=lambda: NOW[0])
+
+    assert [await LIMITER.acquire("client", 1, 2) for _ in range(3)] == [0.0, 0.0, 1.5]
+    assert STORE.EXPIRES == {"test:client:50": 2}
+    NOW[0] = 102.0
+    assert await LIMITER.acquire("client", 1, 2) == 0.0
+
+    assert await SharedStoreRateLimiter(BrokenStore()).acquire("client", 1, 2) == 0.0
+
+
+# Clients over a route's limit are refused with the standard error body, without affecting other routes
+@pytest.mark.anyio
+async def test_rate_limited_requests_receive_429(CLIENT, configure_settings):
+    configure_settings(RATE_LIMIT_ROUTES={"GET /tasks/stats": (1, 2)})
+
+    RESPONSES = [await CLIENT.get("/tasks/stats") for _ in range(3)]
+    assert [RESPONSE.status_code for RESPONSE in RESPONSES] == [HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.TOO_MANY_REQUESTS]
+    assert RESPONSES[2].headers["Retry-After"] == "1"
+    assert RESPONSES[2].json()["status_code"] == HTTPStatus.TOO_MANY_REQUESTS
+    assert "GET /tasks/stats" in RESPONSES[2].json()["detail"]
+
+    assert (await CLIENT.get("/tasks/")).status_code == HTTPStatus.OK
+    assert (await CLIENT.get("/metrics")).status_code == HTTPStatus.OK
+
+
+# Refusals pass through CORS, so a cross-origin browser client can read them and their Retry-After
+@pytest.mark.anyio
+async def test_rate_limited_responses_carry_cors_headers(CLIENT, configure_settings):
+    configure_settings(RATE_LIMIT_ROUTES={"GET /tasks/stats": (1, 1)})
+    ORIGIN = {"Origin": "http://localhost:3000"}
+
+    assert (await CLIENT.get("/tasks/stats", headers=ORIGIN)).status_code == HTTPStatus.OK
+    RESPONSE = await CLIENT.get("/tasks/stats", headers=ORIGIN)
+    assert RESPONSE.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert RESPONSE.headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+    assert "Retry-After" in RESPONSE.headers["Access-Control-Expose-Headers"]
+
+
+# Requests for the same route template share a bucket, whatever the IDs in their paths
+@pytest.mark.anyio
+async def test_rate_limits_are_per_route_template(CLIENT, configure_settings):
+    configure_settings(RATE_LIMIT_ROUTES={"GET /tasks/{ID}/": (1, 1)})
+
+    assert (await CLIENT.get("/tasks/999991/")).status_code == HTTPStatus.BAD_REQUEST
+    assert (await CLIENT.get("/tasks/999992/")).status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+# New requests are shed while requests are queueing for a database connection
+@pytest.mark.anyio
+async def test_requests_are_shed_while_the_pool_is_saturated(CLIENT, monkeypatch):
+    POOL_METRICS = PoolMetrics()
+    monkeypatch.setattr(app.state, "POOL_METRICS", POOL_METRICS, raising=False)
+    TOKEN = POOL_METRICS.start_wait()
+    POOL_METRICS.WAITING[TOKEN] = time.perf_counter() - SETTINGS.SHED_POOL_WAIT_SECONDS - 1
+
+    RESPONSE = await CLIENT.get("/tasks/")
+    assert RESPONSE.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert RESPONSE.headers["Retry-After"] == "1"
+    assert RESPONSE.json()["description"] == HTTPStatus.SERVICE_UNAVAILABLE.phrase
+
+    POOL_METRICS.end_wait(TOKEN)
+    assert (await CLIENT.get("/tasks/")).status_code == HTTPStatus.OK
+
+
+# New requests are shed while too many requests are in flight
+@pytest.mark.anyio
+async def test_requests_are_shed_over_the_in_flight_limit(configure_settings):
+    configure_settings(SHED_MAX_IN_FLIGHT=1)
+    RELEASE = asyncio.Event()
+    APP = FastAPI()
+    APP.add_middleware(RateLimitMiddleware)
+
+    @APP.get("/slow")
+    async def slow() -> dict:
+        await RELEASE.wait()
+        return {}
+
+    async with AsyncClient(transport=ASGITransport(app=APP), base_url="http://testserver") as CLIENT:
+        FIRST = asyncio.create_task(CLIENT.get("/slow"))
+        await asyncio.sleep(0.05)
+        assert (await CLIENT.get("/slow")).status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        RELEASE.set()
+        assert (await FIRST).status_code == HTTPStatus.OK
@@ -0,0 +1,101 @@
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from main import app
+from db.schema_version import upgrade_schema
+from db.tables.task import Task
+from utils.global_constants import StatusTypes, ReplicaConstants
+
+
+@pytest.fixture()
+async def engines(tmp_path):
+    # Two separate databases standing in for the primary and a replica that has not caught up
+    PRIMARY = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    REPLICA = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for ENGINE in (PRIMARY, REPLICA):
+        async with ENGINE.connect() as CONNECTION:
+            await CONNECTION.run_sync(upgrade_schema)
+            await CONNECTION.commit()
+    yield PRIMARY, REPLICA
+    await PRIMARY.dispose()
+    await REPLICA.dispose()
+
+
+@pytest.fixture()
+def REPLICA_CLIENT_FACTORY(engines, monkeypatch):
+    PRIMARY, REPLICA = engines
+    # Use the real session dependencies rather than the single test session
+    monkeypatch.setattr(app, "dependency_overrides", {})
+    monkeypatch.setattr(app.state, "ASYNC_SESSION",
+                        sessionmaker(bind=PRIMARY, class_=AsyncSession, expire_on_commit=False), raising=False)
+    monkeypatch.setattr(app.state, "ASYNC_READ_SESSION",
+                        sessionmaker(bind=REPLICA, class_=AsyncSession, expire_on_commit=False, info={"replica": True}),
+                        raising=False)
+    return lambda: AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver")
+
+
+async def insert_task(ENGINE, TITLE: str) -> int:
+    async with ENGINE.begin() as CONNECTION:
+        RESULT = await CONNECTION.execute(insert(Task).returning(Task.id), {
+            "title": TITLE, "status": StatusTypes.PENDING, "due_date": datetime.now(timezone.utc) + timedelta(days=1)
+        })
+        return RESULT.scalar_one()
+
+
+@pytest.mark.anyio
+async def test_reads_are_served_by_the_replica(engines, REPLICA_CLIENT_FACTORY):
+    _, REPLICA = engines
+    ID = await insert_task(REPLICA, "Replicated task")
+
+    async with REPLICA_CLIENT_FACTORY() as CLIENT:
+        assert (await CLIENT.get(f"/tasks/{ID}/")).json()["title"] == "Replicated task"
+        assert [TASK["id"] for TASK in (await CLIENT.get("/tasks/")).json()["items"]] == [ID]
+        assert (await CLIENT.get("/tasks/stats")).json()["total"] == 1
+        assert ReplicaConstants.PRIMARY_COOKIE not in CLIENT.cookies
+
+
+@pytest.mark.anyio
+async def test_writes_go_to_the_primary_and_are_read_back_by_the_writer(engines, REPLICA_CLIENT_FACTORY):
+    TASK = {"title": "Fresh task", "status": StatusTypes.PENDING, "due_date": "2030-01-01T00:00:00Z"}
+
+    async with REPLICA_CLIENT_FACTORY() as WRITER, REPLICA_CLIENT_FACTORY() as OTHER_CLIENT:
+        RESPONSE = await WRITER.post("/tasks/", json=TASK)
+        assert RESPONSE.status_code == HTTPStatus.OK
+        assert ReplicaConstants.PRIMARY_COOKIE in WRITER.cookies
+
+        # The writer reads from the primary until its cookie expires, so it sees its own write
+        assert [ITEM["title"] for ITEM in (await WRITER.get("/tasks/")).json()["items"]] == ["Fresh task"]
+
+        # Other clients read from the replica, which has not caught up yet
+        assert (await OTHER_CLIENT.get("/tasks/")).json()["items"] == []
+
+
+@pytest.mark.anyio
+async def test_expired_read_your_writes_cookie_reads_from_the_replica(engines, REPLICA_CLIENT_FACTORY):
+    PRIMARY, _ = engines
+    await insert_task(PRIMARY, "Unreplicated task")
+
+    async with REPLICA_CLIENT_FACTORY() as CLIENT:
+        CLIENT.cookies.set(ReplicaConstants.PRIMARY_COOKIE, str(time.time() - 1))
+        assert (await CLIENT.get("/tasks/")).json()["items"] == []
+
+        CLIENT.cookies.set(ReplicaConstants.PRIMARY_COOKIE, "not-a-time")
+        assert (await CLIENT.get("/tasks/")).json()["items"] == []
+
+        CLIENT.cookies.set(ReplicaConstants.PRIMARY_COOKIE, str(time.time() + 60))
+        assert len((await CLIENT.get("/tasks/")).json()["items"]) == 1
+
+
+@pytest.mark.anyio
+async def test_replica_reads_are_not_cached(engines, REPLICA_CLIENT_FACTORY, task_cache):
+    _, REPLICA = engines
+    ID = await insert_task(REPLICA, "Replicated task")
+
+    async with REPLICA_CLIENT_FACTORY() as CLIENT:
+        assert (await CLIENT.get(f"/tasks/{ID}/")).status_code == HTTPStatus.OK
+    assert await task_cache.get(ID) is None
@@ -0,0 +1,189 @@
+import asyncio
+import pytest
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from fastapi import FastAPI
+from sqlalchemy import insert, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.future import select
+import main
+from db.crud.status_batcher import StatusUpdateBatcher, get_status_update_batcher
+from db.schema_version import upgrade_schema
+from db.tables.task import Task
+from events.task_events import TaskEventBroker, configure_task_event_broker
+from models.tasks import TaskUpdateModel
+from settings import SETTINGS
+from scheduler.task_scheduler import OPEN_TASKS, TaskScheduler, DueDateScanner
+from utils.global_constants import StatusTypes
+
+# Far enough ahead that tasks created by other tests never fall within the scanned windows
+START = datetime(2091, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def BROKER():
+    BROKER = TaskEventBroker()
+    configure_task_event_broker(BROKER)
+    yield BROKER
+    configure_task_event_broker(TaskEventBroker())
+
+
+async def insert_tasks(SESSION, TASKS: list[tuple[timedelta, StatusTypes]]) -> list[int]:
+    IDS = []
+    for DUE_IN, STATUS in TASKS:
+        RESULT = await SESSION.execute(insert(Task).returning(Task.id),
+                                       {"title": "Scheduled task", "status": STATUS, "due_date": START + DUE_IN})
+        IDS.append(RESULT.scalar_one())
+    await SESSION.commit()
+    return IDS
+
+
+def drain(QUEUE) -> list[dict]:
+    EVENTS = []
+    while not QUEUE.empty():
+        EVENTS.append(QUEUE.get_nowait())
+    return EVENTS
+
+
+@pytest.mark.anyio
+async def test_scanner_publishes_open_tasks_crossing_their_due_date(async_session, async_session_factory, BROKER):
+    OVERDUE, DONE, LATER, DUE_SOON = await insert_tasks(async_session, [
+        (timedelta(minutes=5), StatusTypes.PENDING),
+        (timedelta(minutes=6), StatusTypes.DONE),
+        (timedelta(hours=2), StatusTypes.IN_PROGRESS),
+        (timedelta(days=1, minutes=7), StatusTypes.IN_PROGRESS),
+    ])
+    QUEUE = BROKER.subscribe()
+
+    await DueDateScanner(async_session_factory, DUE_SOON_SECONDS=24 * 60 * 60)(START, START + timedelta(minutes=10))
+
+    EVENTS = drain(QUEUE)
+    assert [(EVENT["type"], EVENT["id"]) for EVENT in EVENTS] == [("overdue", OVERDUE), ("due_soon", DUE_SOON)]
+    assert EVENTS[0]["task"]["status"] == StatusTypes.PENDING
+
+
+@pytest.mark.anyio
+async def test_scanner_reads_in_keyset_batches(async_session, async_session_factory, BROKER, QUERY_COUNTER):
+    # Several tasks share a due date, so batches must be split on (due_date, id)
+    IDS = await insert_tasks(async_session, [(timedelta(days=10, minutes=INDEX // 2), StatusTypes.PENDING)
+                                             for INDEX in range(5)])
+    QUEUE = BROKER.subscribe()
+    QUERY_COUNTER.clear()
+
+    SCANNER = DueDateScanner(async_session_factory, BATCH_SIZE=2, DUE_SOON_SECONDS=0)
+    await SCANNER(START + timedelta(days=9), START + timedelta(days=11))
+
+    assert [EVENT["id"] for EVENT in drain(QUEUE)] == IDS
+    assert len([STATEMENT for STATEMENT in QUERY_COUNTER if STATEMENT.lstrip().upper().startswith("SELECT")]) == 3
+
+
+
+# Busy windows are published as individual events, rather than collapsed into a single 'resync'
+@pytest.mark.anyio
+async def test_scanner_publishes_more_tasks_than_the_bulk_event_limit(async_session, async_session_factory, BROKER):
+    COUNT = SETTINGS.EVENT_MAX_BULK_EVENTS + 50
+    IDS = await insert_tasks(async_session, [(timedelta(days=20, seconds=INDEX), StatusTypes.PENDING) for INDEX in range(COUNT)])
+    BROKER.QUEUE_SIZE = COUNT
+    QUEUE = BROKER.subscribe()
+
+    await DueDateScanner(async_session_factory, DUE_SOON_SECONDS=0)(START + timedelta(days=19), START + timedelta(days=21))
+
+    EVENTS = drain(QUEUE)
+    assert {EVENT["type"] for EVENT in EVENTS} == {"overdue"}
+    assert [EVENT["id"] for EVENT in EVENTS] == IDS
+
+@pytest.mark.anyio
+async def test_scan_uses_the_partial_index(async_session):
+    QUERY = (select(Task).where(OPEN_TASKS, Task.due_date > START, Task.due_date <= START + timedelta(minutes=1))
+             .order_by(Task.due_date, Task.id))
+    SQL = str(QUERY.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    PLAN = (await async_session.execute(text(f"EXPLAIN QUERY PLAN {SQL}"))).all()
+    assert any("ix_Tasks_open_due_date_id" in ROW[-1] for ROW in PLAN)
+
+
+@pytest.mark.anyio
+async def test_scheduler_passes_each_job_the_window_since_its_last_run(async_test_engine):
+    WINDOWS = []
+
+    async def failing_job(SINCE, UNTIL):
+        raise RuntimeError("Job failed")
+
+    async def recording_job(SINCE, UNTIL):
+        WINDOWS.append((SINCE, UNTIL))
+
+    SCHEDULER = TaskScheduler(async_test_engine, [failing_job, recording_job], INTERVAL_SECONDS=60)
+    await SCHEDULER.tick(START)
+    await SCHEDULER.tick(START + timedelta(seconds=90))
+
+    # A failing job does not stop the jobs after it. SQLite is served by one process, which always leads.
+    assert WINDOWS == [(START - timedelta(seconds=60), START), (START, START + timedelta(seconds=90))]
+
+
+class DroppedConnection:
+    """
+    A leader lock connection the database has dropped.
+    """
+    def __init__(self):
+        self.CLOSED = False
+
+    async def close(self):
+        self.CLOSED = True
+        raise DBAPIError("ROLLBACK", None, ConnectionError("connection is closed"))
+
+
+@pytest.mark.anyio
+async def test_stop_discards_a_dropped_lock_connection(async_test_engine):
+    SCHEDULER = TaskScheduler(async_test_engine, [])
+    CONNECTION = SCHEDULER.LOCK_CONNECTION = DroppedConnection()
+
+    await SCHEDULER.stop()
+
+    assert CONNECTION.CLOSED
+    assert SCHEDULER.LOCK_CONNECTION is None
+
+
+# Neither a lock connection that cannot be closed, nor a scheduler that fails to stop, loses queued status updates
+@pytest.mark.anyio
+@pytest.mark.parametrize("STOP_FAILS", [False, True])
+async def test_shutdown_writes_queued_status_updates_when_the_scheduler_fails_to_stop(STOP_FAILS, tmp_path, monkeypatch, BROKER):
+    URL = f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}"
+    ENGINE = create_async_engine(URL)
+    async with ENGINE.connect() as CONNECTION:
+        await CONNECTION.run_sync(upgrade_schema)
+        await CONNECTION.commit()
+    await ENGINE.dispose()
+
+    CONNECTIONS = []
+
+    class LeaderScheduler(TaskScheduler):
+        def start(self):
+            super().start()
+            self.LOCK_CONNECTION = DroppedConnection()
+            CONNECTIONS.append(self.LOCK_CONNECTION)
+
+        async def stop(self):
+            await super().stop()
+            if STOP_FAILS:
+                raise RuntimeError("Scheduler failed to stop")
+
+    monkeypatch.setattr(main, "SETTINGS", SETTINGS.model_copy(update={
+        "DATABASE_URL": URL, "DATABASE_READ_URL": None, "STATUS_BATCH_ENABLED": True, "SCHEDULER_ENABLED": True
+    }))
+    monkeypatch.setattr(main, "TaskScheduler", LeaderScheduler)
+    # Updates are only written when the batcher stops
+    monkeypatch.setattr(main, "StatusUpdateBatcher", partial(StatusUpdateBatcher, DELAY_SECONDS=60))
+
+    APP = FastAPI()
+    with pytest.raises(RuntimeError) if STOP_FAILS else nullcontext():
+        async with main.lifespan(APP):
+            async with APP.state.ASYNC_SESSION() as SESSION:
+                ID, = await insert_tasks(SESSION, [(timedelta(days=30), StatusTypes.PENDING)])
+            PENDING = asyncio.create_task(get_status_update_batcher().submit(ID, TaskUpdateModel(status=StatusTypes.DONE)))
+            await asyncio.sleep(0)
+
+    assert (await PENDING).status == StatusTypes.DONE
+    assert CONNECTIONS[0].CLOSED
+    assert get_status_update_batcher() is None
@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from http import HTTPStatus
+from utils.global_constants import StatusTypes
+
+
+async def create_task(CLIENT, TITLE: str, DESCRIPTION: str | None = None, STATUS: StatusTypes = StatusTypes.PENDING) -> int:
+    RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": TITLE,
+        "description": DESCRIPTION,
+        "status": STATUS,
+        "due_date": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    })
+    return RESPONSE.json()["id"]
+
+
+@pytest.mark.anyio
+async def test_search_matches_title_and_description(CLIENT):
+    TITLE_ID = await create_task(CLIENT, "Review zebrafish hearing bundle")
+    DESCRIPTION_ID = await create_task(CLIENT, "Prepare bundle", "Chase the zebrafish witness statement")
+    await create_task(CLIENT, "Unrelated task", "Nothing to see here")
+
+    RESPONSE = await CLIENT.get("/tasks/search", params={"q": "zebrafish"})
+
+    assert RESPONSE.status_code == HTTPStatus.OK
+    IDS = [TASK["id"] for TASK in RESPONSE.json()["items"]]
+    # Title matches are weighted above description matches
+    assert IDS == [TITLE_ID, DESCRIPTION_ID]
+    assert RESPONSE.json()["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_search_matches_partial_words(CLIENT):
+    TASK_ID = await create_task(CLIENT, "Adjournment request for quokkaville hearing")
+
+    PREFIX = (await CLIENT.get("/tasks/search", params={"q": "quokka"})).json()
+    SUBSTRING = (await CLIENT.get("/tasks/search", params={"q": "okkavil"})).json()
+
+    assert [TASK["id"] for TASK in PREFIX["items"]] == [TASK_ID]
+    assert [TASK["id"] for TASK in SUBSTRING["items"]] == [TASK_ID]
+
+
+@pytest.mark.anyio
+async def test_search_keyset_pagination_and_status_filter(CLIENT):
+    CREATED_IDS = [await create_task(CLIENT, f"Wombat file {INDEX}", STATUS=StatusTypes.DONE) for INDEX in range(3)]
+    await create_task(CLIENT, "Wombat file pending", STATUS=StatusTypes.PENDING)
+
+    PARAMS = {"q": "wombat", "status": StatusTypes.DONE.value, "limit": 2}
+    FIRST_PAGE = (await CLIENT.get("/tasks/search", params=PARAMS)).json()
+    SECOND_PAGE = (await CLIENT.get("/tasks/search", params={**PARAMS, "cursor": FIRST_PAGE["next_cursor"]})).json()
+
+    assert len(FIRST_PAGE["items"]) == 2
+    assert SECOND_PAGE["next_cursor"] is None
+    assert sorted(TASK["id"] for TASK in FIRST_PAGE["items"] + SECOND_PAGE["items"]) == CREATED_IDS
+
+
+@pytest.mark.anyio
+async def test_search_ignores_query_syntax(CLIENT):
+    TASK_ID = await create_task(CLIENT, 'Platypus "appeal" (urgent) 100%')
+
+    for QUERY in ['"appeal" (urgent', "platypus AND OR NOT", "100%", "*"]:
+        RESPONSE = await CLIENT.get("/tasks/search", params={"q": QUERY})
+        assert RESPONSE.status_code == HTTPStatus.OK
+
+    assert [TASK["id"] for TASK in (await CLIENT.get("/tasks/search", params={"q": "100%"})).json()["items"]] == [TASK_ID]
+
+
+@pytest.mark.anyio
+async def test_search_deleted_tasks_are_not_returned(CLIENT):
+    TASK_ID = await create_task(CLIENT, "Narwhal disclosure")
+    await CLIENT.delete(f"/tasks/{TASK_ID}/")
+
+    RESPONSE = await CLIENT.get("/tasks/search", params={"q": "narwhal"})
+
+    assert RESPONSE.json()["items"] == []
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("PARAMS", [{}, {"q": ""}, {"q": "x", "cursor": "not-a-cursor"}])
+async def test_search_invalid_parameters(CLIENT, PARAMS):
+    RESPONSE = await CLIENT.get("/tasks/search", params=PARAMS)
+    assert RESPONSE.status_code in (HTTPStatus.BAD_REQUEST, HTTPStatus.UNPROCESSABLE_ENTITY)
@@ -0,0 +1,80 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import httpx
+import pytest
+from alembic import command
+from pathlib import Path
+from db.schema_version import get_alembic_config
+from server import STARTUP_FAILURE, available_cpus
+
+SRC_DIRECTORY = Path(__file__).resolve().parent.parent
+CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+# Multiple workers are forked from the supervisor, which is not possible on Windows
+requires_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+
+
+def free_port() -> int:
+    with socket.socket() as SOCKET:
+        SOCKET.bind(("127.0.0.1", 0))
+        return SOCKET.getsockname()[1]
+
+
+def start_server(DATABASE_PATH: Path, PORT: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "server", "--workers", "2", "--host", "127.0.0.1", "--port", str(PORT), "--graceful-timeout", "5"],
+        cwd=SRC_DIRECTORY, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env={**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{DATABASE_PATH}", "LOG_FILE": os.devnull}
+    )
+
+
+def test_available_cpus_respects_cgroup_quota(tmp_path):
+    CPU_MAX = tmp_path / "cpu.max"
+
+    CPU_MAX.write_text("150000 100000\n")
+    assert available_cpus(CPU_MAX) == min(2, CPUS)
+
+    CPU_MAX.write_text("max 100000\n")
+    assert available_cpus(CPU_MAX) == CPUS
+
+    assert available_cpus(tmp_path / "missing") == CPUS
+
+
+@requires_fork
+def test_workers_serve_requests_and_shut_down_gracefully(tmp_path):
+    DATABASE_PATH = tmp_path / "server.db"
+    command.upgrade(get_alembic_config(f"sqlite+aiosqlite:///{DATABASE_PATH}"), "head")
+    PORT = free_port()
+    PROCESS = start_server(DATABASE_PATH, PORT)
+    try:
+        DEADLINE = time.monotonic() + 30
+        while True:
+            assert PROCESS.poll() is None, "The server exited before it was ready"
+            try:
+                RESPONSE = httpx.get(f"http://127.0.0.1:{PORT}/tasks/stats")
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < DEADLINE, "The server did not become ready in time"
+                time.sleep(0.2)
+        assert RESPONSE.json()["total"] == 0
+
+        PROCESS.send_signal(signal.SIGTERM)
+        assert PROCESS.wait(timeout=30) == 0
+    finally:
+        if PROCESS.poll() is None:
+            PROCESS.kill()
+
+
+@requires_fork
+def test_startup_failure_stops_the_server(tmp_path):
+    # The database has not been migrated, so every worker fails its startup schema check
+    PROCESS = start_server(tmp_path / "unmigrated.db", free_port())
+    try:
+        assert PROCESS.wait(timeout=30) == STARTUP_FAILURE
+    finally:
+        if PROCESS.poll() is None:
+            PROCESS.kill()
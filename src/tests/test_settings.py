@@ -0,0 +1,33 @@
+import pytest
+from pydantic import ValidationError
+from settings import Settings
+
+
+def test_database_url_built_from_postgres_settings():
+    SETTINGS = Settings(_env_file=None, POSTGRES_USER="user", POSTGRES_PASSWORD="secret", POSTGRES_HOST="db",
+                        POSTGRES_CONTAINER_PORT=5432, POSTGRES_DB="tasks")
+    assert SETTINGS.get_database_url() == "postgresql+asyncpg://user:secret@db:5432/tasks"
+
+
+def test_database_url_override(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    assert Settings(_env_file=None).get_database_url() == "sqlite+aiosqlite:///:memory:"
+
+
+def test_settings_read_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    SETTINGS = Settings(_env_file=None)
+    assert SETTINGS.DB_POOL_SIZE == 20
+    assert SETTINGS.DB_POOL_PRE_PING is False
+
+
+@pytest.mark.parametrize("VALUES", [
+    {"PAGE_SIZE_DEFAULT": 600, "PAGE_SIZE_MAX": 500},
+    {"DB_POOL_SIZE": 0},
+    {"DB_ECHO": "verbose"},
+    {"TASK_CACHE_BACKEND": "redis"},
+])
+def test_invalid_settings_rejected(VALUES):
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None, **VALUES)
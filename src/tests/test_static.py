@@ -0,0 +1,117 @@
+import os
+import pytest
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from main import STATIC_ASSETS
+from utils.global_constants import StatusTypes, StaticConstants
+from utils.static_assets import StaticAssets, accepted_encodings, choose_encoding, precompress
+
+
+@pytest.fixture()
+def static_directory(tmp_path):
+    (tmp_path / "app.js").write_text("console.log('hello');\n" * 200)
+    (tmp_path / "tiny.css").write_text("a{}")
+    return tmp_path
+
+
+def static_client(DIRECTORY) -> AsyncClient:
+    APP = FastAPI()
+    APP.mount("/static", StaticAssets(DIRECTORY), name="static")
+    return AsyncClient(transport=ASGITransport(app=APP), base_url="http://testserver")
+
+
+@pytest.mark.anyio
+async def test_index_links_fingerprinted_assets(CLIENT):
+    RESPONSE = await CLIENT.get("/")
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert RESPONSE.headers["Cache-Control"] == "no-cache"
+    assert f'"{STATIC_ASSETS.url("app.js")}"' in RESPONSE.text
+    assert f'"{STATIC_ASSETS.url("style.css")}"' in RESPONSE.text
+    assert '"/static/app.js"' not in RESPONSE.text
+
+
+@pytest.mark.anyio
+async def test_index_is_compressed_and_revalidated(CLIENT):
+    RESPONSE = await CLIENT.get("/", headers={"Accept-Encoding": "gzip"})
+    assert RESPONSE.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in RESPONSE.headers["Vary"]
+
+    NOT_MODIFIED = await CLIENT.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": RESPONSE.headers["ETag"]})
+    assert NOT_MODIFIED.status_code == HTTPStatus.NOT_MODIFIED
+
+    # Each encoding is a different representation, with its own ETag
+    IDENTITY = await CLIENT.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": RESPONSE.headers["ETag"]})
+    assert IDENTITY.status_code == HTTPStatus.OK
+    assert "Content-Encoding" not in IDENTITY.headers
+
+
+@pytest.mark.anyio
+async def test_fingerprinted_assets_are_cached_for_a_year(CLIENT):
+    RESPONSE = await CLIENT.get(STATIC_ASSETS.url("style.css"))
+    assert RESPONSE.status_code == HTTPStatus.OK
+    assert RESPONSE.headers["Cache-Control"] == StaticConstants.IMMUTABLE_CACHE_CONTROL
+
+    PLAIN = await CLIENT.get("/static/style.css")
+    assert PLAIN.text == RESPONSE.text
+    assert PLAIN.headers["Cache-Control"] == "no-cache"
+
+    assert (await CLIENT.get("/static/style.000000000000.css")).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_precompressed_assets_are_served(static_directory):
+    WRITTEN = {PATH.name for PATH in precompress(static_directory)}
+    assert "app.js.gz" in WRITTEN
+    # Compressing tiny files would make them larger
+    assert "tiny.css.gz" not in WRITTEN
+
+    async with static_client(static_directory) as CLIENT:
+        RESPONSE = await CLIENT.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+        assert RESPONSE.headers["Content-Encoding"] == "gzip"
+        assert RESPONSE.headers["Content-Type"].startswith("text/javascript")
+        assert RESPONSE.text == (static_directory / "app.js").read_text()
+
+        IDENTITY = await CLIENT.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in IDENTITY.headers
+        assert IDENTITY.text == RESPONSE.text
+
+
+@pytest.mark.anyio
+async def test_stale_precompressed_assets_are_ignored(static_directory):
+    precompress(static_directory)
+    # Edit the asset after it was compressed
+    SOURCE = static_directory / "app.js"
+    SOURCE.write_text("console.log('changed');\n" * 200)
+    os.utime(SOURCE, (SOURCE.stat().st_atime, (static_directory / "app.js.gz").stat().st_mtime + 10))
+
+    async with static_client(static_directory) as CLIENT:
+        RESPONSE = await CLIENT.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+        assert "changed" in RESPONSE.text
+        assert "Content-Encoding" not in RESPONSE.headers
+
+
+def test_choose_encoding():
+    assert accepted_encodings("gzip, br;q=0.5, deflate;q=0") == {"gzip", "br"}
+    assert choose_encoding("gzip, br", {"br", "gzip"}) == "br"
+    assert choose_encoding("gzip, br;q=0", {"br", "gzip"}) == "gzip"
+    assert choose_encoding("br", {"gzip"}) is None
+    assert choose_encoding(None, {"gzip"}) is None
+
+
+@pytest.mark.anyio
+async def test_large_task_pages_are_gzipped(CLIENT):
+    DUE_DATE = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    await CLIENT.post("/tasks/bulk", json=[
+        {"title": f"Compressed task {INDEX}", "status": StatusTypes.PENDING, "due_date": DUE_DATE} for INDEX in range(50)
+    ])
+
+    RESPONSE = await CLIENT.get("/tasks/", params={"limit": 50}, headers={"Accept-Encoding": "gzip"})
+    assert RESPONSE.headers["Content-Encoding"] == "gzip"
+    assert len(RESPONSE.json()["items"]) == 50
+
+    # Small responses are not worth compressing
+    SMALL = await CLIENT.get("/tasks/", params={"limit": 1}, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in SMALL.headers
+
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from sqlalchemy.dialects import postgresql
+from db.crud.crud import status_update_statement
+from db.crud.status_batcher import StatusUpdateBatcher, configure_status_update_batcher
+from models.tasks import TaskUpdateModel
+from utils.global_constants import StatusTypes
+
+
+@pytest.fixture()
+async def batcher(async_session_factory):
+    BATCHER = StatusUpdateBatcher(async_session_factory, DELAY_SECONDS=0.01)
+    BATCHER.start()
+    configure_status_update_batcher(BATCHER)
+    yield BATCHER
+    configure_status_update_batcher(None)
+    await BATCHER.stop()
+
+
+async def create_task(CLIENT, TITLE: str) -> dict:
+    RESPONSE = await CLIENT.post("/tasks/", json={
+        "title": TITLE,
+        "status": StatusTypes.PENDING,
+        "due_date": (datetime.now() + timedelta(days=1)).isoformat()
+    })
+    return RESPONSE.json()
+
+
+def count_updates(STATEMENTS: list[str]) -> int:
+    return len([STATEMENT for STATEMENT in STATEMENTS if STATEMENT.lstrip().upper().startswith("UPDATE")])
+
+
+# Concurrent status updates are written by one statement, and each caller receives its own result
+@pytest.mark.anyio
+async def test_concurrent_status_updates_share_one_write(CLIENT, batcher, QUERY_COUNTER):
+    FIRST, SECOND = await create_task(CLIENT, "Toggle Me"), await create_task(CLIENT, "Leave Me")
+    QUERY_COUNTER.clear()
+
+    RESPONSES = await asyncio.gather(
+        CLIENT.patch(f"/tasks/{FIRST['id']}/", json={"status": StatusTypes.IN_PROGRESS}),
+        CLIENT.patch(f"/tasks/{SECOND['id']}/", json={"status": StatusTypes.DONE}),
+        CLIENT.patch(f"/tasks/{FIRST['id']}/", json={"status": StatusTypes.DONE}),
+        CLIENT.patch("/tasks/999999/", json={"status": StatusTypes.DONE}),
+    )
+
+    assert count_updates(QUERY_COUNTER) == 1
+    assert [RESPONSE.status_code for RESPONSE in RESPONSES] == [HTTPStatus.OK] * 3 + [HTTPStatus.BAD_REQUEST]
+    assert [(RESPONSE.json()["status"], RESPONSE.json()["version"]) for RESPONSE in RESPONSES[:3]] == [
+        (StatusTypes.IN_PROGRESS, 2), (StatusTypes.DONE, 2), (StatusTypes.DONE, 3)
+    ]
+    assert RESPONSES[2].headers["ETag"] == f'"{FIRST["id"]}-3"'
+
+    # The last update to each task wins
+    STORED = (await CLIENT.get(f"/tasks/{FIRST['id']}/")).json()
+    assert (STORED["status"], STORED["version"]) == (StatusTypes.DONE, 3)
+
+
+# Conditional updates bypass the batcher, so their version check sees the task as it is
+@pytest.mark.anyio
+async def test_conditional_updates_are_not_batched(CLIENT, batcher):
+    TASK = await create_task(CLIENT, "Check Me")
+    URL = f"/tasks/{TASK['id']}/"
+
+    assert (await CLIENT.patch(URL, json={"status": StatusTypes.DONE}, headers={"If-Match": f'"{TASK["id"]}-1"'})).status_code == HTTPStatus.OK
+    assert batcher.QUEUE.empty()
+    assert (await CLIENT.patch(URL, json={"status": StatusTypes.PENDING}, headers={"If-Match": f'"{TASK["id"]}-1"'})).status_code == HTTPStatus.PRECONDITION_FAILED
+
+
+# Updates still queued when the batcher stops are written before it returns
+@pytest.mark.anyio
+async def test_stop_writes_queued_updates(CLIENT, async_session_factory):
+    TASK = await create_task(CLIENT, "Flush Me")
+    BATCHER = StatusUpdateBatcher(async_session_factory, DELAY_SECONDS=60)
+    BATCHER.start()
+
+    PENDING = asyncio.create_task(BATCHER.submit(TASK["id"], TaskUpdateModel(status=StatusTypes.DONE)))
+    await asyncio.sleep(0)
+    await BATCHER.stop()
+
+    assert (await PENDING).status == StatusTypes.DONE
+
+
+def test_postgres_status_updates_join_a_values_list():
+    class PostgresSession:
+        def get_bind(self):
+            return type("Bind", (), {"dialect": postgresql.dialect()})()
+
+    STATEMENT = status_update_statement([(1, StatusTypes.DONE, 2), (2, StatusTypes.PENDING, 1)], PostgresSession())
+    SQL = str(STATEMENT.compile(dialect=postgresql.dialect()))
+    assert "FROM (VALUES" in SQL
+    assert "version=(\"Tasks\".version + updates.increment)" in SQL
@@ -0,0 +1,81 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from utils.datetime_utils import ensure_utc
+
+
+def encode_cursor(DUE_DATE: datetime, ID: int) -> str:
+    """
+    Encode the keyset position of a task into an opaque pagination cursor.
+
+    Args:
+        DUE_DATE (datetime): The due date of the last task on the current page.
+        ID (int): The ID of the last task on the current page.
+
+    Returns:
+        str: A URL-safe cursor that can be passed back to fetch the next page.
+    """
+    PAYLOAD = json.dumps([ensure_utc(DUE_DATE).isoformat(), ID], separators=(",", ":"))
+    return base64.urlsafe_b64encode(PAYLOAD.encode()).decode().rstrip("=")
+
+
+def decode_cursor(CURSOR: str) -> tuple[datetime, int]:
+    """
+    Decode a pagination cursor produced by `encode_cursor`.
+
+    Args:
+        CURSOR (str): The opaque cursor supplied by the client.
+
+    Returns:
+        tuple[datetime, int]: The (due_date, id) keyset position encoded in the cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        PADDED = CURSOR + "=" * (-len(CURSOR) % 4)
+        DUE_DATE, ID = json.loads(base64.urlsafe_b64decode(PADDED.encode()))
+        if not isinstance(ID, int):
+            raise ValueError
+        return ensure_utc(datetime.fromisoformat(DUE_DATE)), ID
+    except (binascii.Error, json.JSONDecodeError, UnicodeDecodeError, TypeError, ValueError) as EXCEPTION:
+        raise ValueError(f"Invalid cursor '{CURSOR}'.") from EXCEPTION
+
+
+def encode_search_cursor(RANK: float, ID: int) -> str:
+    """
+    Encode the keyset position of a search result into an opaque pagination cursor.
+
+    Args:
+        RANK (float): The relevance rank of the last task on the current page.
+        ID (int): The ID of the last task on the current page.
+
+    Returns:
+        str: A URL-safe cursor that can be passed back to fetch the next page of results.
+    """
+    PAYLOAD = json.dumps([RANK, ID], separators=(",", ":"))
+    return base64.urlsafe_b64encode(PAYLOAD.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(CURSOR: str) -> tuple[float, int]:
+    """
+    Decode a search cursor produced by `encode_search_cursor`.
+
+    Args:
+        CURSOR (str): The opaque cursor supplied by the client.
+
+    Returns:
+        tuple[float, int]: The (rank, id) keyset position encoded in the cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        PADDED = CURSOR + "=" * (-len(CURSOR) % 4)
+        RANK, ID = json.loads(base64.urlsafe_b64decode(PADDED.encode()))
+        if not isinstance(RANK, (int, float)) or isinstance(RANK, bool) or not isinstance(ID, int):
+            raise ValueError
+        return float(RANK), ID
+    except (binascii.Error, json.JSONDecodeError, UnicodeDecodeError, TypeError, ValueError) as EXCEPTION:
+        raise ValueError(f"Invalid cursor '{CURSOR}'.") from EXCEPTION
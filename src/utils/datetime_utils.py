@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+
+def ensure_utc(VALUE: datetime) -> datetime:
+    """
+    Normalise a datetime to UTC.
+
+    Args:
+        VALUE (datetime): The datetime to normalise.
+
+    Returns:
+        datetime: The equivalent timezone aware datetime in UTC.
+
+    Notes:
+        - Naive datetimes are assumed to already be in UTC.
+    """
+    if VALUE.tzinfo is None or VALUE.tzinfo.utcoffset(VALUE) is None:
+        return VALUE.replace(tzinfo=timezone.utc)
+    return VALUE.astimezone(timezone.utc)
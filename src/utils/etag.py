@@ -0,0 +1,83 @@
+import hashlib
+from typing import Iterable
+
+
+def task_etag(ID: int, VERSION: int) -> str:
+    """
+    Build the strong ETag of a single task.
+
+    Every write to a task bumps its version, so the (id, version) pair identifies one exact
+    representation of the task.
+
+    Args:
+        ID (int): The task ID.
+        VERSION (int): The task's current version.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    return f'"{ID}-{VERSION}"'
+
+
+def page_etag(KEYS: Iterable[tuple[int, int]], NEXT_CURSOR: str | None) -> str:
+    """
+    Build the strong ETag of a page of tasks.
+
+    Args:
+        KEYS (Iterable[tuple[int, int]]): The (id, version) pair of every task on the page, in order.
+        NEXT_CURSOR (str | None): The cursor of the following page.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    DIGEST = hashlib.blake2b(digest_size=16)
+    for ID, VERSION in KEYS:
+        DIGEST.update(f"{ID}-{VERSION},".encode())
+    DIGEST.update((NEXT_CURSOR or "").encode())
+    return f'"{DIGEST.hexdigest()}"'
+
+
+def etag_matches(IF_NONE_MATCH: str | None, ETAG: str) -> bool:
+    """
+    Check whether an If-None-Match request header matches the current ETag of a resource.
+
+    Args:
+        IF_NONE_MATCH (str | None): The raw If-None-Match header, if the client sent one.
+        ETAG (str): The resource's current ETag.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 (Not Modified) response can be sent.
+    """
+    if not IF_NONE_MATCH:
+        return False
+    if IF_NONE_MATCH.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function, so ignore any W/ prefixes
+    return any(CANDIDATE.strip().removeprefix("W/") == ETAG for CANDIDATE in IF_NONE_MATCH.split(","))
+
+
+def if_match_versions(IF_MATCH: str | None, ID: int) -> list[int] | None:
+    """
+    Extract the versions of a task that an If-Match request header will accept.
+
+    Args:
+        IF_MATCH (str | None): The raw If-Match header, if the client sent one.
+        ID (int): The ID of the task being written.
+
+    Returns:
+        list[int] | None: The task versions named by the header, or None if any version is acceptable
+                          (no header, or '*'). An empty list means no version can match.
+
+    Notes:
+        - If-Match uses the strong comparison function, so weak (W/) ETags never match.
+    """
+    if IF_MATCH is None or IF_MATCH.strip() == "*":
+        return None
+
+    PREFIX = f'"{ID}-'
+    VERSIONS = []
+    for CANDIDATE in IF_MATCH.split(","):
+        CANDIDATE = CANDIDATE.strip()
+        if CANDIDATE.startswith(PREFIX) and CANDIDATE.endswith('"') and CANDIDATE[len(PREFIX):-1].isdigit():
+            VERSIONS.append(int(CANDIDATE[len(PREFIX):-1]))
+    return VERSIONS
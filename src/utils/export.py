@@ -0,0 +1,54 @@
+import csv
+import io
+from typing import Iterable, Mapping
+import orjson
+from utils.datetime_utils import ensure_utc
+from utils.global_constants import ExportConstants
+
+
+def export_record(ROW: Mapping) -> dict:
+    """
+    Convert a task row into a JSON compatible record.
+
+    Args:
+        ROW (Mapping): A task row keyed by column name.
+
+    Returns:
+        dict: The record, with the status and due date converted to strings.
+    """
+    RECORD = {FIELD: ROW[FIELD] for FIELD in ExportConstants.FIELDS}
+    RECORD["status"] = RECORD["status"].value
+    RECORD["due_date"] = ensure_utc(RECORD["due_date"]).isoformat()
+    return RECORD
+
+
+def encode_ndjson(ROWS: Iterable[Mapping]) -> str:
+    """
+    Encode a batch of task rows as newline delimited JSON.
+
+    Args:
+        ROWS (Iterable[Mapping]): The task rows to encode.
+
+    Returns:
+        str: One JSON object per line, each line terminated by a newline.
+    """
+    return b"".join(orjson.dumps(export_record(ROW), option=orjson.OPT_APPEND_NEWLINE) for ROW in ROWS).decode()
+
+
+def encode_csv(ROWS: Iterable[Mapping], INCLUDE_HEADER: bool = False) -> str:
+    """
+    Encode a batch of task rows as CSV.
+
+    Args:
+        ROWS (Iterable[Mapping]): The task rows to encode.
+        INCLUDE_HEADER (bool): Whether to write the header row before the rows.
+
+    Returns:
+        str: The CSV encoded rows.
+    """
+    BUFFER = io.StringIO()
+    WRITER = csv.DictWriter(BUFFER, fieldnames=ExportConstants.FIELDS)
+    if INCLUDE_HEADER:
+        WRITER.writeheader()
+    WRITER.writerows(export_record(ROW) for ROW in ROWS)
+    return BUFFER.getvalue()
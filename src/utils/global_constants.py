@@ -12,4 +12,116 @@ class StatusTypes(str, Enum):
     """
     PENDING = "Pending"
     IN_PROGRESS = "In Progress"
-    DONE = "Done"
\ No newline at end of file
+    DONE = "Done"
+
+
+class ExportConstants(metaclass=ImmutableMeta):
+    """
+    Constants controlling the streaming export of the task table.
+
+    Attributes:
+        FIELDS (tuple[str, ...]): The task fields written to each exported record, in order.
+    """
+    FIELDS = ("id", "title", "description", "status", "due_date", "version")
+
+
+class EventConstants(metaclass=ImmutableMeta):
+    """
+    Constants controlling the task change feed.
+
+    Attributes:
+        CHANNEL (str): The PostgreSQL LISTEN/NOTIFY channel events are fanned out over.
+        MAX_PAYLOAD_BYTES (int): Events larger than this are sent without the task body (NOTIFY payloads are capped at 8000 bytes).
+        LISTEN_CHECK_SECONDS (float): How often the LISTEN connection is checked, to notice a drop that closed no socket.
+        RECONNECT_MIN_SECONDS (float): The first delay before re-establishing a lost LISTEN connection.
+        RECONNECT_MAX_SECONDS (float): The longest delay between attempts. Each failed attempt doubles the delay up to this.
+    """
+    CHANNEL = "task_events"
+    MAX_PAYLOAD_BYTES = 7900
+    LISTEN_CHECK_SECONDS = 30.0
+    RECONNECT_MIN_SECONDS = 0.5
+    RECONNECT_MAX_SECONDS = 30.0
+
+
+class SearchConstants(metaclass=ImmutableMeta):
+    """
+    Constants controlling task search.
+
+    Attributes:
+        TEXT_SEARCH_CONFIG (str): The PostgreSQL text search configuration used to build and query the search vector.
+        SEARCH_VECTOR_COLUMN (str): The tsvector column indexing each task's title and description, kept up to
+                                    date by a trigger.
+        SEARCH_DOCUMENT (str): The PostgreSQL expression over each task's title and description matched by the
+                               trigram index.
+        FTS_TABLE (str): The SQLite FTS5 table indexing each task's title and description.
+    """
+    TEXT_SEARCH_CONFIG = "english"
+    SEARCH_VECTOR_COLUMN = "search_vector"
+    SEARCH_DOCUMENT = "coalesce(title, '') || ' ' || coalesce(description, '')"
+    FTS_TABLE = "Tasks_fts"
+
+
+class ReplicaConstants(metaclass=ImmutableMeta):
+    """
+    Constants controlling read replica routing.
+
+    Attributes:
+        PRIMARY_COOKIE (str): Cookie holding the time (in seconds since the epoch) until which the
+                              client's reads are sent to the primary database.
+    """
+    PRIMARY_COOKIE = "read_primary_until"
+
+
+class StaticConstants(metaclass=ImmutableMeta):
+    """
+    Constants controlling how the frontend's static files are served.
+
+    Attributes:
+        COMPRESSED_EXTENSIONS (dict[str, str]): The file extension of pre-compressed copies, keyed by content
+                                                coding in order of preference.
+        FINGERPRINT_LENGTH (int): The number of hex digits of the content hash used in fingerprinted file names.
+        IMMUTABLE_CACHE_CONTROL (str): The Cache-Control header sent with fingerprinted files, which never change.
+    """
+    COMPRESSED_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+    FINGERPRINT_LENGTH = 12
+    IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class SchedulerConstants(metaclass=ImmutableMeta):
+    """
+    Constants controlling the background scheduler.
+
+    Attributes:
+        LOCK_KEY (int): The PostgreSQL advisory lock held by the worker elected to run scheduled jobs.
+        OPEN_TASK_CONDITION (str): The predicate of the partial index over tasks that are not done.
+    """
+    LOCK_KEY = 0x484D435453
+    OPEN_TASK_CONDITION = "status <> 'DONE'"
+
+
+class RateLimitConstants(metaclass=ImmutableMeta):
+    """
+    Constants controlling rate limiting and load shedding.
+
+    Attributes:
+        EXEMPT_PATH_PREFIXES (tuple[str, ...]): Requests for paths starting with these are never limited or shed,
+                                                so monitoring keeps working and event streams are not counted
+                                                as in-flight requests.
+        SHED_RETRY_AFTER_SECONDS (int): The Retry-After sent with requests refused because the server is overloaded.
+    """
+    EXEMPT_PATH_PREFIXES = ("/metrics", "/static", "/tasks/events")
+    SHED_RETRY_AFTER_SECONDS = 1
+
+
+class IdempotencyConstants(metaclass=ImmutableMeta):
+    """
+    Constants controlling idempotent task creation.
+
+    Attributes:
+        KEY_HEADER (str): The request header carrying the client's idempotency key.
+        REPLAYED_HEADER (str): The response header marking a response replayed from an earlier request.
+        MAX_KEY_LENGTH (int): The longest idempotency key accepted.
+    """
+    KEY_HEADER = "Idempotency-Key"
+    REPLAYED_HEADER = "Idempotent-Replayed"
+    MAX_KEY_LENGTH = 255
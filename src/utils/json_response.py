@@ -0,0 +1,51 @@
+import orjson
+from typing import Any
+from fastapi.responses import JSONResponse
+
+# Serialise naive datetimes (as returned by SQLite) as UTC, and write UTC offsets as 'Z' so the
+# output matches Pydantic's serialisation of TaskResponseModel
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+def dump_json(CONTENT: Any) -> bytes:
+    """
+    Serialise a value straight to JSON bytes.
+
+    Args:
+        CONTENT (Any): Dicts, lists, strings, numbers, enums and datetimes, e.g. rows selected from the database.
+
+    Returns:
+        bytes: The JSON encoded value.
+    """
+    return orjson.dumps(CONTENT, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Endpoints return this to skip FastAPI's response model validation and jsonable_encoder pass. The
+    content must already match the endpoint's documented response model.
+    """
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def show_error(STATUS_CODE: int, DESCRIPTION: str, DETAIL: str, HEADERS: dict[str, str] | None = None) -> JSONResponse:
+    """
+    Generates a standardised error response for HTTP exceptions.
+
+    Args:
+        STATUS_CODE (int): The HTTP status code.
+        DESCRIPTION (str): A brief description of the error.
+        DETAIL (str): Detailed information about the error.
+        HEADERS (dict[str, str] | None): Headers to send with the response, such as the current ETag.
+
+    Returns:
+        JSONResponse: A formatted error response to be returned by FastAPI.
+    """
+    return JSONResponse(status_code=STATUS_CODE, headers=HEADERS, content={
+        "status_code": STATUS_CODE,
+        "description": DESCRIPTION,
+        "detail": DETAIL
+    })
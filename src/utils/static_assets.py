@@ -0,0 +1,274 @@
+import gzip
+import hashlib
+import os
+import sys
+from pathlib import Path
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.types import Scope
+from utils.etag import etag_matches
+from utils.global_constants import StaticConstants
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional. Without it, responses are only compressed with gzip.
+    brotli = None
+
+
+def accepted_encodings(ACCEPT_ENCODING: str | None) -> set[str]:
+    """
+    Parse an Accept-Encoding request header.
+
+    Args:
+        ACCEPT_ENCODING (str | None): The raw header, if the client sent one.
+
+    Returns:
+        set[str]: The content codings the client accepts, excluding any it refuses with 'q=0'.
+    """
+    ENCODINGS = set()
+    for CODING in (ACCEPT_ENCODING or "").split(","):
+        NAME, _, PARAMETERS = CODING.partition(";")
+        QUALITY = PARAMETERS.strip().removeprefix("q=").strip() if PARAMETERS else "1"
+        try:
+            if float(QUALITY) > 0:
+                ENCODINGS.add(NAME.strip().lower())
+        except ValueError:
+            continue
+    return ENCODINGS
+
+
+def choose_encoding(ACCEPT_ENCODING: str | None, AVAILABLE: set[str]) -> str | None:
+    """
+    Pick the best available content coding the client accepts, preferring Brotli over gzip.
+
+    Args:
+        ACCEPT_ENCODING (str | None): The raw Accept-Encoding header, if the client sent one.
+        AVAILABLE (set[str]): The codings the resource is available in.
+
+    Returns:
+        str | None: 'br' or 'gzip', or None to send the resource uncompressed.
+    """
+    ACCEPTED = accepted_encodings(ACCEPT_ENCODING)
+    for ENCODING in StaticConstants.COMPRESSED_EXTENSIONS:
+        if ENCODING in AVAILABLE and ENCODING in ACCEPTED:
+            return ENCODING
+    return None
+
+
+def fingerprint(PATH: Path) -> str:
+    """
+    Build a file's fingerprinted name from a hash of its contents, e.g. 'style.3f2a9c1e0b7d.css'.
+
+    Args:
+        PATH (Path): The file.
+
+    Returns:
+        str: The fingerprinted file name.
+    """
+    DIGEST = hashlib.sha256(PATH.read_bytes()).hexdigest()[:StaticConstants.FINGERPRINT_LENGTH]
+    return f"{PATH.stem}.{DIGEST}{PATH.suffix}"
+
+
+def is_asset(PATH: Path) -> bool:
+    """
+    Retrieve whether a file in the static directory is an asset, rather than a pre-compressed copy of one.
+
+    Args:
+        PATH (Path): The file.
+
+    Returns:
+        bool: True for assets.
+    """
+    return PATH.is_file() and PATH.suffix not in StaticConstants.COMPRESSED_EXTENSIONS.values()
+
+
+def compress(CONTENT: bytes, ENCODING: str) -> bytes:
+    """
+    Compress content at the highest compression level.
+
+    Args:
+        CONTENT (bytes): The content.
+        ENCODING (str): Either 'br' or 'gzip'.
+
+    Returns:
+        bytes: The compressed content.
+    """
+    if ENCODING == "br":
+        return brotli.compress(CONTENT, quality=11)
+    return gzip.compress(CONTENT, compresslevel=9, mtime=0)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """
+    Retrieve the content codings content can be compressed with in this environment.
+
+    Returns:
+        tuple[str, ...]: 'br' (if the brotli package is installed) and 'gzip'.
+    """
+    return tuple(ENCODING for ENCODING in StaticConstants.COMPRESSED_EXTENSIONS if ENCODING != "br" or brotli)
+
+
+def precompress(DIRECTORY: Path) -> list[Path]:
+    """
+    Write a Brotli and gzip compressed copy next to every asset in a directory.
+
+    Run at build time, so the assets are never compressed while serving requests.
+
+    Args:
+        DIRECTORY (Path): The static directory.
+
+    Returns:
+        list[Path]: The compressed copies written.
+    """
+    WRITTEN = []
+    for PATH in sorted(DIRECTORY.rglob("*")):
+        if not is_asset(PATH):
+            continue
+        CONTENT = PATH.read_bytes()
+        for ENCODING in available_encodings():
+            COMPRESSED = compress(CONTENT, ENCODING)
+            # Compressing tiny files can make them larger
+            if len(COMPRESSED) >= len(CONTENT):
+                continue
+            TARGET = PATH.with_name(PATH.name + StaticConstants.COMPRESSED_EXTENSIONS[ENCODING])
+            TARGET.write_bytes(COMPRESSED)
+            WRITTEN.append(TARGET)
+    return WRITTEN
+
+
+def is_fresh(SOURCE: Path, COPY: Path) -> bool:
+    """
+    Retrieve whether a compressed copy of a file exists and is at least as new as the file.
+
+    Args:
+        SOURCE (Path): The file.
+        COPY (Path): The compressed copy.
+
+    Returns:
+        bool: True if the copy can be served in place of the file.
+    """
+    return COPY.is_file() and COPY.stat().st_mtime >= SOURCE.stat().st_mtime
+
+
+class StaticAssets(StaticFiles):
+    """
+    Static files served under fingerprinted URLs, from pre-compressed copies where available.
+
+    Each asset can be requested under a fingerprinted name containing a hash of its contents (see
+    `url`). As the name changes whenever the contents do, fingerprinted responses are cached by
+    browsers for a year. Requests for an asset's plain name are revalidated on every use instead.
+
+    Pre-compressed copies written by `precompress` are sent to clients that accept their encoding.
+    Copies older than their asset are ignored, so a stale build is never served.
+
+    Attributes:
+        PREFIX (str): The URL path the static files are mounted at.
+        FINGERPRINTS (dict[str, str]): The fingerprinted name of each asset, keyed by its path in the directory.
+        ASSETS (dict[str, str]): The inverse of FINGERPRINTS.
+        PRECOMPRESSED (dict[str, set[str]]): The encodings each asset has an up to date compressed copy in.
+    """
+    def __init__(self, DIRECTORY: str | Path, PREFIX: str = "/static"):
+        super().__init__(directory=DIRECTORY)
+        self.PREFIX = PREFIX.rstrip("/")
+        self.FINGERPRINTS = {}
+        self.PRECOMPRESSED = {}
+
+        ROOT = Path(DIRECTORY)
+        for PATH in sorted(ROOT.rglob("*")):
+            if not is_asset(PATH):
+                continue
+            NAME = PATH.relative_to(ROOT).as_posix()
+            self.FINGERPRINTS[NAME] = PATH.with_name(fingerprint(PATH)).relative_to(ROOT).as_posix()
+            self.PRECOMPRESSED[NAME] = {
+                ENCODING for ENCODING, EXTENSION in StaticConstants.COMPRESSED_EXTENSIONS.items()
+                if is_fresh(PATH, PATH.with_name(PATH.name + EXTENSION))
+            }
+        self.ASSETS = {FINGERPRINTED: NAME for NAME, FINGERPRINTED in self.FINGERPRINTS.items()}
+
+    def url(self, NAME: str) -> str:
+        """
+        Retrieve the fingerprinted URL of an asset.
+
+        Args:
+            NAME (str): The asset's path in the static directory, e.g. 'app.js'.
+
+        Returns:
+            str: The URL, e.g. '/static/app.3f2a9c1e0b7d.js'.
+        """
+        return f"{self.PREFIX}/{self.FINGERPRINTS[NAME]}"
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        NAME = self.ASSETS.get(path, path)
+        ENCODING = choose_encoding(Headers(scope=scope).get("Accept-Encoding"), self.PRECOMPRESSED.get(NAME, set()))
+        if ENCODING:
+            RESPONSE = await super().get_response(NAME + StaticConstants.COMPRESSED_EXTENSIONS[ENCODING], scope)
+            if RESPONSE.status_code == 200:
+                RESPONSE.headers["Content-Encoding"] = ENCODING
+        else:
+            RESPONSE = await super().get_response(NAME, scope)
+
+        if self.PRECOMPRESSED.get(NAME):
+            RESPONSE.headers["Vary"] = "Accept-Encoding"
+        RESPONSE.headers["Cache-Control"] = StaticConstants.IMMUTABLE_CACHE_CONTROL if path in self.ASSETS else "no-cache"
+        return RESPONSE
+
+
+class CompressedPage:
+    """
+    A page held in memory, alongside a compressed copy for each supported encoding.
+
+    Attributes:
+        MEDIA_TYPE (str): The page's content type.
+        VARIANTS (dict[str | None, bytes]): The page keyed by encoding, with None for the uncompressed page.
+        ETAGS (dict[str | None, str]): The ETag of each variant.
+    """
+    def __init__(self, CONTENT: bytes, MEDIA_TYPE: str = "text/html"):
+        self.MEDIA_TYPE = MEDIA_TYPE
+        self.VARIANTS = {None: CONTENT} | {ENCODING: compress(CONTENT, ENCODING) for ENCODING in available_encodings()}
+
+        DIGEST = hashlib.sha256(CONTENT).hexdigest()[:StaticConstants.FINGERPRINT_LENGTH]
+        self.ETAGS = {ENCODING: f'"{DIGEST}-{ENCODING}"' if ENCODING else f'"{DIGEST}"' for ENCODING in self.VARIANTS}
+
+    def response(self, REQUEST: Request) -> Response:
+        """
+        Build the response for a request, compressed if the client accepts it.
+
+        Args:
+            REQUEST (Request): The incoming request.
+
+        Returns:
+            Response: The page, or an empty 304 (Not Modified) response if the client's copy is current.
+        """
+        ENCODING = choose_encoding(REQUEST.headers.get("Accept-Encoding"), set(self.VARIANTS) - {None})
+        HEADERS = {"ETag": self.ETAGS[ENCODING], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(REQUEST.headers.get("If-None-Match"), self.ETAGS[ENCODING]):
+            return Response(status_code=304, headers=HEADERS)
+        if ENCODING:
+            HEADERS["Content-Encoding"] = ENCODING
+        return Response(self.VARIANTS[ENCODING], media_type=self.MEDIA_TYPE, headers=HEADERS)
+
+
+def render_index(ASSETS: StaticAssets, PATH: Path) -> CompressedPage:
+    """
+    Load the frontend's index page, linking each asset by its fingerprinted URL.
+
+    Args:
+        ASSETS (StaticAssets): The static files the page links to.
+        PATH (Path): The index page.
+
+    Returns:
+        CompressedPage: The page, ready to be served from memory.
+    """
+    HTML = PATH.read_text(encoding="utf-8")
+    for NAME in ASSETS.FINGERPRINTS:
+        HTML = HTML.replace(f'"{ASSETS.PREFIX}/{NAME}"', f'"{ASSETS.url(NAME)}"')
+    return CompressedPage(HTML.encode("utf-8"))
+
+
+if __name__ == "__main__":
+    # Build step: python -m utils.static_assets [DIRECTORY]
+    DIRECTORY = Path(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "static"))
+    for WRITTEN in precompress(DIRECTORY):
+        print(f"Wrote {WRITTEN}")